@@ -1,21 +1,29 @@
+import atexit
 import datetime
 import json
 import time
 import connexion
-from src.core.validator import ArgumentException
+from src.core.validator import ArgumentException, OperationException
 from src.logics.reference_service import ReferenceService
+from src.logics.transaction_ingest import TransactionIngest, TransactionIngestException
 from src.logics.balances_manager import BalancesManager
 from src.core.prototype import Prototype
 from src.dtos.filter_sorting_dto import FilterSortingDto
 from src.core.filter_type import FilterType
 from src.core.common import common
 from src.data_manager import DataManager
+from src.sqlite_storage import SqliteStorage
+from src.transaction_segments import TransactionSegments
 from src.logics.report import Report
 from src.logics.factory_entities import FactoryEntities
 from src.settings_manager import SettingsManager
 from src.core.response_format import ResponseFormats
-from flask import jsonify, request, Response
+from flask import jsonify, request, Response, stream_with_context
 from src.repository import Repository
+from src.transaction_index import TransactionIndex
+from src.transaction_columns import TransactionColumns
+from src.balance_checkpoints import BalanceCheckpoints
+from src.reference_graph import ReferenceGraph
 from src.start_service import StartService
 
 # Импортируем систему логирования
@@ -44,16 +52,105 @@ start_service = StartService()
 start_service.start(manager.settings.first_start)
 Logger.debug("Main", "StartService инициализирован")
 
+# Файл данных в выбранном формате снимка
+data_filename = "data/data.bin" if manager.settings.snapshot_format == "binary" else "data/data.json"
+
+if manager.settings.persistence_mode == "journal":
+    data_manager = DataManager(
+        start_service.data,
+        data_filename,
+        journal_filename="data/journal.ndjson",
+        fsync=manager.settings.journal_fsync,
+        compact_records=manager.settings.journal_compact_records,
+        snapshot_format=manager.settings.snapshot_format
+    )
+    if manager.settings.first_start:
+        # Журнал прошлых запусков к сгенерированным данным не относится
+        data_manager.compact()
+    elif data_manager.load():
+        Logger.info("Main", "Данные восстановлены из снимка и журнала")
+elif manager.settings.persistence_mode == "sqlite":
+    # Изменения сохраняет кэш агрегатов SQLite - копия справочников в памяти, а не источник данных
+    # для них (запросы выполняются по справочникам в памяти, в базе считаются только агрегаты),
+    # data.json остается только выгрузкой для /api/data/save - DataManager не подписывается на события
+    sqlite_storage = SqliteStorage.get(start_service.data, "data/data.sqlite")
+    if manager.settings.first_start:
+        sqlite_storage.save_all()
+    elif sqlite_storage.load():
+        Logger.info("Main", "Данные загружены из SQLite")
+    atexit.register(sqlite_storage.close)
+
+    data_manager = DataManager(
+        start_service.data,
+        data_filename,
+        snapshot_format=manager.settings.snapshot_format,
+        observe=False
+    )
+else:
+    # Интервал 0 или null - файл данных сохраняется синхронно на каждое изменение
+    data_manager = DataManager(
+        start_service.data,
+        data_filename,
+        flush_interval_ms=manager.settings.save_interval_ms or None,
+        flush_max_changes=manager.settings.save_max_changes,
+        snapshot_format=manager.settings.snapshot_format
+    )
+    if not manager.settings.first_start and data_manager.load():
+        Logger.info("Main", "Данные загружены из снимка")
+# Несохраненные изменения записываются при остановке приложения
+atexit.register(data_manager.shutdown)
+Logger.debug("Main", "DataManager инициализирован")
+
+
+def seal_closed_period():
+    """Перенести транзакции до даты блокировки в сегменты и сохранить репозиторий без них"""
+    if transaction_segments is not None and transaction_segments.seal(manager.settings.block_period) > 0:
+        data_manager.compact()
+
+
+# Закрытый период хранится в отображаемых в память сегментах, в репозитории - только открытый
+transaction_segments = None
+if manager.settings.transaction_segments and TransactionSegments.available():
+    transaction_segments = TransactionSegments.get(start_service.data, "data/segments")
+    if manager.settings.first_start:
+        # Сегменты прошлых запусков к сгенерированным данным не относятся
+        transaction_segments.clear()
+    else:
+        transaction_segments.open()
+    seal_closed_period()
+    Logger.debug("Main", "Сегменты закрытого периода открыты")
+
 reference_service = ReferenceService(start_service.data)
 Logger.debug("Main", "ReferenceService инициализирован")
 
+transaction_ingest = TransactionIngest(reference_service)
+# Размер пакета потоковой загрузки NDJSON в /api/<reference_type>/bulk
+bulk_batch_size = 10000
+
+transaction_index = TransactionIndex.get(start_service.data)
+Logger.debug("Main", "Индексы транзакций построены")
+
+# Хранилища создаются до BalancesManager: событие доходит до них раньше, чем до пересчета остатков
+if TransactionColumns.available():
+    TransactionColumns.get(start_service.data)
+    Logger.debug("Main", "Колоночное хранилище транзакций построено")
+
+balance_checkpoints = BalanceCheckpoints.get(start_service.data)
+Logger.debug("Main", "Контрольные точки остатков построены")
+
+reference_graph = ReferenceGraph.get(start_service.data)
+Logger.debug("Main", "Граф ссылок между справочниками построен")
+
+# Снимок остатков сохраняется в файл данных вместе со справочниками, которым он соответствует
 balances_manager = BalancesManager(start_service.data, manager.settings.block_period)
+data_manager.attach("balances_snapshot", balances_manager.snapshot_content)
 Logger.info("Main", f"Дата блокировки установлена: {manager.settings.block_period}")
-start_service.balances = balances_manager.calculation_balances_up_blocking_date()
-Logger.debug("Main", "Балансы рассчитаны до даты блокировки")
-
-data_manager = DataManager(start_service.data)
-Logger.debug("Main", "DataManager инициализирован")
+# При первом запуске данные сгенерированы заново, сохраненный снимок к ним не относится
+if not manager.settings.first_start and balances_manager.load_snapshot(data_manager.attachment("balances_snapshot")):
+    Logger.debug("Main", "Балансы до даты блокировки загружены из снимка")
+else:
+    start_service.balances = balances_manager.calculation_balances_up_blocking_date()
+    Logger.debug("Main", "Балансы рассчитаны до даты блокировки")
 
 report = Report(start_service.data)
 Logger.debug("Main", "Report инициализирован")
@@ -68,6 +165,33 @@ def formats():
     return "SUCCESS"
 
 
+# Отдать части потокового ответа (ошибка после начала ответа только журналируется)
+def stream_chunks(first: str, chunks, data_type: str):
+    yield first
+    try:
+        yield from chunks
+    except Exception as e:
+        Logger.error("API", f"Ошибка при потоковой отдаче данных {data_type}: {str(e)}")
+        raise
+
+
+# Отдать текст частями как одну строку JSON (совпадает с json.dumps всего текста)
+def json_string_chunks(chunks):
+    yield '"'
+    for chunk in chunks:
+        yield json.dumps(chunk)[1:-1]
+    yield '"'
+
+
+# Элементы справочника для выгрузки: транзакции закрытого периода берутся и из сегментов
+def dump_items(data_type: str) -> list:
+    items = list(start_service.data[data_type].values())
+    if data_type == Repository.transaction_key and transaction_segments is not None:
+        items.extend(transaction_segments.transactions())
+
+    return items
+
+
 # Получить данные в указанном формате
 @app.route("/api/data/<data_type>/<format>", methods=['GET'])
 def get_data_formatted(data_type: str, format: str):
@@ -90,16 +214,22 @@ def get_data_formatted(data_type: str, format: str):
         )
     
     try:
-        data = list(start_service.data[data_type].values())
+        data = dump_items(data_type)
         Logger.debug("API", f"Получено {len(data)} элементов типа {data_type}")
         
         logic = factory.create(format)
-        result = logic().build(format, data)
-        
-        Logger.info("API", f"Данные типа {data_type} успешно преобразованы в формат {format}")
+
+        # Потоковая отдача: первая часть формируется до ответа, чтобы ошибки вернулись кодом 400
+        chunks = logic().stream(format, data)
+        first = next(chunks)
+        body = stream_chunks(first, chunks, data_type)
+        if format != ResponseFormats.json():
+            body = json_string_chunks(body)
+
+        Logger.info("API", f"Данные типа {data_type} отдаются потоком в формате {format}")
         return Response(
+            stream_with_context(body),
             status=200,
-            response=json.dumps(result),
             content_type="application/json"
         )
         
@@ -159,11 +289,9 @@ def get_recipes():
 @app.route("/api/data/recipes/<id>", methods=['GET'])
 def get_recipe_by_id(id: str):
     Logger.info("API", f"GET /api/data/recipes/{id}")
-    data = list(start_service.data["recipe"].values())
-    
-    recipe = list(filter(lambda recipe: recipe.id == id, data))
+    recipe = reference_service.get_by_id(Repository.recipe_key, id)
 
-    if len(recipe) == 0:
+    if recipe is None:
         Logger.warning("API", f"Рецепт с ID {id} не найден")
         return Response(
             status=404,
@@ -172,7 +300,7 @@ def get_recipe_by_id(id: str):
         )        
 
     logic = factory.create("json")
-    result = logic().build("json", recipe)
+    result = logic().build("json", [recipe])
 
     Logger.debug("API", f"Рецепт {id} успешно найден")
     return Response(
@@ -239,7 +367,7 @@ def get_data_filtered(data_type: str, format: str):
         )
     
     try:
-        data = list(start_service.data[data_type].values())
+        data = dump_items(data_type)
         
         filtersDto = FilterSortingDto(request_data.get('filters', []), [])
 
@@ -295,10 +423,9 @@ def get_report(storage_id: str, start_date: str, end_date: str):
             content_type="application/json"
         )
 
-    storages = list(start_service.storages.values())
-    storage = list(filter(lambda storage: storage.id == storage_id, storages))
+    storage = start_service.storages.get(storage_id)
 
-    if len(storage) == 0:
+    if storage is None:
         Logger.warning("API", f"Склад с ID {storage_id} не найден")
         return Response(
             status=404,
@@ -307,7 +434,7 @@ def get_report(storage_id: str, start_date: str, end_date: str):
         )       
 
     Logger.debug("API", f"Генерация отчета: склад={storage_id}, период={start_date} - {end_date}")
-    result = report.generateReport(storage[0], start_date_parsed, end_date_parsed)
+    result = report.generateReport(storage, start_date_parsed, end_date_parsed)
     
     Logger.info("API", f"Отчет сгенерирован: {len(result)} строк")
     return Response(
@@ -349,10 +476,9 @@ def get_filtered_report(storage_id: str, start_date: str, end_date: str):
             content_type="application/json"
         )
 
-    storages = list(start_service.storages.values())
-    storage = list(filter(lambda storage: storage.id == storage_id, storages))
+    storage = start_service.storages.get(storage_id)
 
-    if len(storage) == 0:
+    if storage is None:
         Logger.warning("API", f"Склад с ID {storage_id} не найден")
         return Response(
             status=404,
@@ -363,7 +489,16 @@ def get_filtered_report(storage_id: str, start_date: str, end_date: str):
     filtersDto = FilterSortingDto(filters, [])
 
     Logger.debug("API", f"Генерация фильтрованного отчета: склад={storage_id}, период={start_date} - {end_date}, модель фильтрации={filter_model}")
-    result = report.generateReport(storage[0], start_date_parsed, end_date_parsed, filtersDto, filter_model)
+    try:
+        result = report.generateReport(storage, start_date_parsed, end_date_parsed, filtersDto, filter_model)
+    except (ArgumentException, OperationException) as e:
+        # Неверный фильтр или фильтр, который нельзя применить к транзакциям закрытого периода
+        Logger.error("API", f"Ошибка фильтрации отчета: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": str(e)}),
+            content_type="application/json"
+        )
     
     Logger.info("API", f"Фильтрованный отчет сгенерирован: {len(result)} строк")
     return Response(
@@ -412,8 +547,8 @@ def change_block_date():
 
     old_date = manager.settings.block_period
     manager.settings.block_period = new_block_period_parsed
-    balances_manager.block_period = new_block_period_parsed
-    start_service.balances = balances_manager.calculation_balances_up_blocking_date()
+    start_service.balances = balances_manager.move_block_period(new_block_period_parsed)
+    seal_closed_period()
 
     Logger.info("API", f"Дата блокировки изменена: {old_date} -> {new_block_period_parsed}")
     return Response(
@@ -433,6 +568,7 @@ def get_balances_by_date():
     Logger.log_api_request("POST", "/api/data/balances", request_data)
     
     date = request_data.get('date')
+    storage_id = request_data.get('storage_id')
 
     try:
         date_parsed = datetime.datetime.strptime(date, "%Y-%m-%d").date()
@@ -443,9 +579,21 @@ def get_balances_by_date():
             response=json.dumps({"error": "Wrong date format. Must be, for example 2012-04-23."}),
             content_type="application/json"
         )
-    
-    Logger.debug("API", f"Расчет балансов на дату: {date_parsed}")
-    balances = balances_manager.calculation_balances_by_date(date_parsed)
+
+    if storage_id is not None:
+        if storage_id not in start_service.storages:
+            Logger.warning("API", f"Склад с ID {storage_id} не найден")
+            return Response(
+                status=404,
+                response=json.dumps({"error": "Storage not found"}),
+                content_type="application/json"
+            )
+
+        Logger.debug("API", f"Расчет балансов склада {storage_id} на дату: {date_parsed}")
+        balances = balances_manager.calculation_balances_by_storage(storage_id, date_parsed)
+    else:
+        Logger.debug("API", f"Расчет балансов на дату: {date_parsed}")
+        balances = balances_manager.calculation_balances_by_date(date_parsed)
 
     Logger.info("API", f"Балансы на {date_parsed} рассчитаны: {len(balances)} элементов")
     return Response(
@@ -462,7 +610,7 @@ def get_balances_by_date():
 def save_data():
     Logger.info("API", "POST /api/data/save - сохранение данных")
 
-    if data_manager.save_data_to_file():
+    if data_manager.flush():
         Logger.info("API", "Данные успешно сохранены в файл")
         return Response(
             status=200,
@@ -478,6 +626,20 @@ def save_data():
         )
 
 
+"""
+Метрики сохранения репозитория в файл
+"""
+@app.route("/api/data/save/metrics", methods=['GET'])
+def get_save_metrics():
+    Logger.info("API", "GET /api/data/save/metrics")
+
+    return Response(
+        status=200,
+        response=json.dumps(data_manager.metrics),
+        content_type="application/json"
+    )
+
+
 """
 Получить один элемент справочника по ID
 """
@@ -566,6 +728,175 @@ def add_reference_item(reference_type: str):
         )
 
 
+"""
+Пакетно добавить элементы в справочник
+Принимает JSON массив или NDJSON поток (Content-Type: application/x-ndjson).
+JSON массив добавляется целиком или не добавляется вовсе, NDJSON читается из потока
+построчно и добавляется пакетами по bulk_batch_size элементов, не держа тело в памяти
+"""
+@app.route("/api/<reference_type>/bulk", methods=['PUT'])
+def add_reference_items_bulk(reference_type: str):
+    Logger.info("API", f"PUT /api/{reference_type}/bulk")
+
+    if request.mimetype == "application/x-ndjson":
+        return add_reference_items_stream(reference_type)
+
+    try:
+        items_data = request.get_json(silent=True)
+    except ValueError as e:
+        Logger.error("API", f"PUT /api/{reference_type}/bulk - некорректный JSON: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": f"Wrong JSON: {str(e)}"}),
+            content_type="application/json"
+        )
+
+    if not isinstance(items_data, list) or len(items_data) == 0:
+        Logger.error("API", f"PUT /api/{reference_type}/bulk - нет массива элементов в запросе")
+        return Response(
+            status=400,
+            response=json.dumps({"error": "JSON array or NDJSON stream of items expected"}),
+            content_type="application/json"
+        )
+
+    try:
+        ids = reference_service.add_bulk(reference_type, items_data)
+
+        Logger.info("API", f"В справочник {reference_type} пакетно добавлено элементов: {len(ids)}")
+        return Response(
+            status=201,
+            response=json.dumps({"ids": ids, "count": len(ids), "success": True}),
+            content_type="application/json"
+        )
+
+    except ArgumentException as e:
+        Logger.error("API", f"Аргументная ошибка при пакетном добавлении в {reference_type}: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": str(e)}),
+            content_type="application/json"
+        )
+    except Exception as e:
+        Logger.error("API", f"Внутренняя ошибка при пакетном добавлении в {reference_type}: {str(e)}")
+        return Response(
+            status=500,
+            response=json.dumps({"error": f"Internal server error: {str(e)}"}),
+            content_type="application/json"
+        )
+
+
+def add_reference_items_stream(reference_type: str):
+    """Пакетное добавление из NDJSON потока: пакеты до строки с ошибкой остаются в справочнике"""
+    ids = []
+    batch = []
+    line = 0
+
+    try:
+        for line, text in enumerate(request.stream, start=1):
+            if not text.strip():
+                continue
+
+            batch.append(json.loads(text))
+            if len(batch) >= bulk_batch_size:
+                ids += reference_service.add_bulk(reference_type, batch)
+                batch = []
+
+        if len(batch) > 0:
+            ids += reference_service.add_bulk(reference_type, batch)
+
+    except ArgumentException as e:
+        # Клиент продолжает с пакета после уже добавленных элементов
+        Logger.error("API", f"Аргументная ошибка при пакетном добавлении в {reference_type}: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": str(e), "line": line, "ids": ids, "count": len(ids)}),
+            content_type="application/json"
+        )
+    except ValueError as e:
+        Logger.error("API", f"PUT /api/{reference_type}/bulk - некорректный JSON в строке {line}: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": f"Wrong JSON: {str(e)}", "line": line, "ids": ids, "count": len(ids)}),
+            content_type="application/json"
+        )
+    except Exception as e:
+        Logger.error("API", f"Внутренняя ошибка при пакетном добавлении в {reference_type}: {str(e)}")
+        return Response(
+            status=500,
+            response=json.dumps({"error": f"Internal server error: {str(e)}"}),
+            content_type="application/json"
+        )
+
+    if len(ids) == 0:
+        Logger.error("API", f"PUT /api/{reference_type}/bulk - нет элементов в потоке")
+        return Response(
+            status=400,
+            response=json.dumps({"error": "JSON array or NDJSON stream of items expected"}),
+            content_type="application/json"
+        )
+
+    Logger.info("API", f"В справочник {reference_type} пакетно добавлено элементов: {len(ids)}")
+    return Response(
+        status=201,
+        response=json.dumps({"ids": ids, "count": len(ids), "success": True}),
+        content_type="application/json"
+    )
+
+
+"""
+Потоковая загрузка транзакций
+Принимает NDJSON (Content-Type: application/x-ndjson) или CSV с заголовком (Content-Type: text/csv),
+тело читается построчно и может передаваться частями (chunked)
+"""
+@app.route("/api/transaction/ingest", methods=['PUT'])
+def ingest_transactions():
+    Logger.info("API", f"PUT /api/transaction/ingest ({request.mimetype})")
+
+    if request.mimetype not in ["application/x-ndjson", "text/csv"]:
+        Logger.error("API", f"PUT /api/transaction/ingest - неподдерживаемый формат {request.mimetype}")
+        return Response(
+            status=415,
+            response=json.dumps({"error": "Content-Type must be application/x-ndjson or text/csv"}),
+            content_type="application/json"
+        )
+
+    try:
+        if request.mimetype == "text/csv":
+            count = transaction_ingest.ingest_csv(request.stream)
+        else:
+            count = transaction_ingest.ingest_ndjson(request.stream)
+
+        Logger.info("API", f"Загружено транзакций: {count}")
+        return Response(
+            status=201,
+            response=json.dumps({"count": count, "success": True}),
+            content_type="application/json"
+        )
+
+    except TransactionIngestException as e:
+        # Пакеты до строки с ошибкой уже добавлены - клиент продолжает со следующей строки
+        Logger.error("API", f"Ошибка при загрузке транзакций: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": str(e), "line": e.line, "count": e.ingested}),
+            content_type="application/json"
+        )
+    except ArgumentException as e:
+        Logger.error("API", f"Ошибка при загрузке транзакций: {str(e)}")
+        return Response(
+            status=400,
+            response=json.dumps({"error": str(e)}),
+            content_type="application/json"
+        )
+    except Exception as e:
+        Logger.error("API", f"Внутренняя ошибка при загрузке транзакций: {str(e)}")
+        return Response(
+            status=500,
+            response=json.dumps({"error": f"Internal server error: {str(e)}"}),
+            content_type="application/json"
+        )
+
+
 """
 Изменить элемент справочника
 """
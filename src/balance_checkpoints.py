@@ -0,0 +1,333 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.validator import Validator
+from src.repository import Repository
+from src.transaction_index import TransactionIndex
+
+
+class BalanceCheckpoints(AbstractDataStore):
+    """
+    Лестница контрольных точек остатков по парам (номенклатура, склад).
+    Контрольная точка ставится на первое число каждого месяца и хранит
+    накопленные остатки по всем транзакциям строго до этой даты.
+    Остаток на произвольную дату считается от ближайшей контрольной точки
+    с добором транзакций, не попавших в нее (не больше месяца истории).
+    Для каждого месяца хранится и его оборот: оборот за период складывается
+    из оборотов целых месяцев и транзакций неполных месяцев по краям
+    """
+
+    _sources = (Repository.transaction_key,)
+
+    def __init__(self, data: dict):
+        super().__init__(data)
+        self.rebuild()
+
+    """
+    Транзакции репозитория
+    """
+    @property
+    def transactions(self) -> dict:
+        return self.data.get(Repository.transaction_key, {})
+
+    """
+    Даты контрольных точек
+    """
+    @property
+    def dates(self) -> list:
+        self.ensure_actual()
+        return list(self.__dates)
+
+    """
+    Полностью перестроить контрольные точки по данным репозитория
+    """
+    def rebuild(self):
+        super().rebuild()
+        self.__dirty = False
+        # Вклад транзакции в остатки: код транзакции -> ((номенклатура, склад), дата, количество)
+        self.__contributions = {}
+        self.__nomenclatures = {}
+        self.__dates = []
+        self.__checkpoints = []
+        # Оборот месяца, начинающегося с даты точки: (номенклатура, склад) -> количество
+        self.__increments = []
+        # Изменения вкладов последним примененным событием и номер этого события
+        # (None - точки построены заново, прежние вклады неизвестны)
+        self.__changes = None
+        self.__applied = ObserveService.version
+
+        ordered = sorted(self.transactions.values(), key=lambda transaction: transaction.date)
+        if len(ordered) == 0:
+            return
+
+        totals = {}
+        month = BalanceCheckpoints.month_start(ordered[0].date)
+        self.__dates.append(month)
+        self.__checkpoints.append({})
+        self.__increments.append({})
+
+        for transaction in ordered:
+            while transaction.date >= BalanceCheckpoints.next_month(month):
+                month = BalanceCheckpoints.next_month(month)
+                self.__dates.append(month)
+                self.__checkpoints.append(dict(totals))
+                self.__increments.append({})
+
+            key, _, quantity = self.__contribute(transaction)
+            totals[key] = totals.get(key, 0) + quantity
+            increment = self.__increments[-1]
+            increment[key] = increment.get(key, 0) + quantity
+
+        self.__dates.append(BalanceCheckpoints.next_month(month))
+        self.__checkpoints.append(totals)
+        self.__increments.append({})
+
+    """
+    Устарели ли контрольные точки: изменились единицы измерения
+    или справочник транзакций изменили в обход событий
+    """
+    def outdated(self) -> bool:
+        return self.__dirty or super().outdated()
+
+    """
+    Учесть новую или измененную транзакцию
+    """
+    def update(self, transaction):
+        previous = self.__contributions.get(transaction.id)
+        if previous is not None:
+            self.__shift(previous[0], previous[1], -previous[2])
+
+        key, transaction_date, quantity = self.__contribute(transaction)
+        self.__shift(key, transaction_date, quantity)
+
+    """
+    Учесть пакет новых или измененных транзакций
+    Вклады пакета суммируются по парам и месяцам, контрольные точки
+    сдвигаются один раз на месяц пары, а не на каждую транзакцию
+    """
+    def update_many(self, transactions: list) -> list:
+        deltas = {}
+        changes = []
+        for transaction in transactions:
+            previous = self.__contributions.get(transaction.id)
+            if previous is not None:
+                shift = (previous[0], BalanceCheckpoints.month_start(previous[1]))
+                deltas[shift] = deltas.get(shift, 0) - previous[2]
+
+            current = self.__contribute(transaction)
+            key, transaction_date, quantity = current
+            shift = (key, BalanceCheckpoints.month_start(transaction_date))
+            deltas[shift] = deltas.get(shift, 0) + quantity
+            changes.append((previous, current))
+
+        for (key, month), quantity in deltas.items():
+            self.__shift(key, month, quantity)
+
+        return changes
+
+    """
+    Убрать транзакцию из контрольных точек
+    """
+    def remove(self, transaction_id: str):
+        previous = self.__contributions.pop(transaction_id, None)
+        if previous is not None:
+            self.__shift(previous[0], previous[1], -previous[2])
+
+    """
+    Убрать пакет транзакций из контрольных точек
+    Вклады суммируются по парам и месяцам, как в update_many
+    """
+    def remove_many(self, transaction_ids: list) -> list:
+        deltas = {}
+        changes = []
+        for transaction_id in transaction_ids:
+            previous = self.__contributions.pop(transaction_id, None)
+            if previous is not None:
+                shift = (previous[0], BalanceCheckpoints.month_start(previous[1]))
+                deltas[shift] = deltas.get(shift, 0) - previous[2]
+                changes.append((previous, None))
+
+        for (key, month), quantity in deltas.items():
+            self.__shift(key, month, quantity)
+
+        return changes
+
+    """
+    Изменения вкладов транзакций событием: список (прежний вклад, новый вклад),
+    вклад - ((номенклатура, склад), дата, количество), None - вклада нет
+    Если событие еще не дошло до контрольных точек, оно применяется сейчас
+    Возвращает None, если прежние вклады неизвестны (точки перестраиваются целиком)
+    """
+    def changes(self, event: str, params):
+        if self.__dirty:
+            return None
+
+        if self.__applied != ObserveService.version:
+            self.handle(event, params)
+
+        if self.outdated() or self.__changes is None:
+            return None
+
+        return list(self.__changes)
+
+    """
+    Остатки по парам (номенклатура, склад) на дату включительно
+    Возвращает словарь: (код номенклатуры, код склада) -> количество
+    """
+    def balances(self, end_date: date, storage_id: str = None) -> dict:
+        Validator.validate(end_date, date)
+        self.ensure_actual()
+
+        position = bisect_right(self.__dates, end_date) - 1
+        if position < 0:
+            # Все транзакции позже указанной даты
+            return {}
+
+        result = {
+            key: quantity for key, quantity in self.__checkpoints[position].items()
+            if storage_id is None or key[1] == storage_id
+        }
+
+        # Добор транзакций от контрольной точки до даты
+        for transaction in TransactionIndex.get(self.data).all_between(self.__dates[position], end_date):
+            if storage_id is not None and transaction.storage.id != storage_id:
+                continue
+
+            key = (transaction.nomenclature.id, transaction.storage.id)
+            quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+            result[key] = result.get(key, 0) + quantity
+
+        return result
+
+    """
+    Обороты по парам (номенклатура, склад) за период [start_date, end_date)
+    Целые месяцы берутся из оборотов месяцев, неполные - из транзакций индекса
+    Возвращает словарь: (код номенклатуры, код склада) -> количество
+    """
+    def turnover(self, start_date: date, end_date: date) -> dict:
+        Validator.validate(start_date, date)
+        Validator.validate(end_date, date)
+        self.ensure_actual()
+
+        first_month = BalanceCheckpoints.month_start(start_date)
+        if first_month < start_date:
+            first_month = BalanceCheckpoints.next_month(first_month)
+        last_month = BalanceCheckpoints.month_start(end_date)
+
+        index = TransactionIndex.get(self.data)
+        if first_month >= last_month:
+            return BalanceCheckpoints.__sum(index.all_in_period(start_date, end_date), {})
+
+        result = BalanceCheckpoints.__sum(index.all_in_period(start_date, first_month), {})
+        for position in range(bisect_left(self.__dates, first_month), bisect_left(self.__dates, last_month)):
+            for key, quantity in self.__increments[position].items():
+                result[key] = result.get(key, 0) + quantity
+
+        return BalanceCheckpoints.__sum(index.all_in_period(last_month, end_date), result)
+
+    """
+    Номенклатура, встреченная в транзакциях
+    """
+    def nomenclature(self, nomenclature_id: str):
+        return self.__nomenclatures.get(nomenclature_id)
+
+    """
+    Первое число месяца даты
+    """
+    @staticmethod
+    def month_start(value: date) -> date:
+        return date(value.year, value.month, 1)
+
+    """
+    Первое число следующего месяца
+    """
+    @staticmethod
+    def next_month(value: date) -> date:
+        if value.month == 12:
+            return date(value.year + 1, 1, 1)
+
+        return date(value.year, value.month + 1, 1)
+
+    def _size(self, reference_type: str) -> int:
+        return len(self.__contributions)
+
+    def __contribute(self, transaction) -> tuple:
+        key = (transaction.nomenclature.id, transaction.storage.id)
+        quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+        contribution = (key, transaction.date, quantity)
+
+        self.__contributions[transaction.id] = contribution
+        self.__nomenclatures[transaction.nomenclature.id] = transaction.nomenclature
+
+        return contribution
+
+    @staticmethod
+    def __sum(transactions, result: dict) -> dict:
+        for transaction in transactions:
+            key = (transaction.nomenclature.id, transaction.storage.id)
+            result[key] = result.get(key, 0) + transaction.unit.convert_to_root_base_unit(transaction.quantity)
+
+        return result
+
+    def __shift(self, key: tuple, transaction_date: date, quantity: float):
+        self.__extend(transaction_date)
+
+        # Транзакция входит во все контрольные точки после своей даты и в оборот своего месяца
+        start = bisect_right(self.__dates, transaction_date)
+        increment = self.__increments[start - 1]
+        increment[key] = increment.get(key, 0) + quantity
+
+        for position in range(start, len(self.__dates)):
+            checkpoint = self.__checkpoints[position]
+            checkpoint[key] = checkpoint.get(key, 0) + quantity
+
+    def __extend(self, transaction_date: date):
+        # Транзакция за пределами лестницы - лестница достраивается по месяцам до ее даты
+        if len(self.__dates) == 0:
+            self.__dates.append(BalanceCheckpoints.month_start(transaction_date))
+            self.__checkpoints.append({})
+            self.__increments.append({})
+
+        # Раньше первой точки транзакций нет, остатки в новых точках пустые
+        months = []
+        month = BalanceCheckpoints.month_start(transaction_date)
+        while month < self.__dates[0]:
+            months.append(month)
+            month = BalanceCheckpoints.next_month(month)
+
+        if len(months) > 0:
+            self.__dates[:0] = months
+            self.__checkpoints[:0] = [{} for _ in months]
+            self.__increments[:0] = [{} for _ in months]
+
+        # Новая точка после последней накапливает те же остатки, что и последняя
+        while transaction_date >= self.__dates[-1]:
+            self.__dates.append(BalanceCheckpoints.next_month(self.__dates[-1]))
+            self.__checkpoints.append(dict(self.__checkpoints[-1]))
+            self.__increments.append({})
+
+    def _handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        # Изменение единиц измерения меняет пересчет количеств в корневые единицы
+        reference_type, items = EventType.changed_items(event, params)
+        if event == EventType.change_nomenclature_unit_key() or reference_type == Repository.unit_measure_key:
+            self.__dirty = True
+            return
+
+        if reference_type != Repository.transaction_key:
+            return
+
+        # Событие уже применено по запросу изменений (changes) до своей очереди
+        if self.__applied == ObserveService.version:
+            return
+        self.__applied = ObserveService.version
+
+        # Пакет транзакций учитывается целиком
+        # Событие могло прийти от другого репозитория
+        transactions = self.transactions
+        self.__changes = self.update_many([item for item in items if item.id in transactions]) + \
+            self.remove_many([item.id for item in items if item.id not in transactions])
@@ -0,0 +1,268 @@
+import datetime
+import gc
+import os
+import pickle
+import struct
+from array import array
+from operator import attrgetter
+from src.core.reference_dict import ReferenceDict
+from src.core.validator import Validator, ArgumentException
+from src.logics.factory_convert import FactoryConvert
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from src.repository_loader import RepositoryLoader
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """
+    Чтение данных снимка без импорта классов и функций.
+    Снимок состоит только из встроенных типов (словари, списки, строки, числа, bytes),
+    которые pickle восстанавливает без обращения к глобальным именам,
+    поэтому любая ссылка на класс или функцию в файле - ошибка, а не вызов кода
+    """
+
+    def find_class(self, module: str, name: str):
+        raise ArgumentException(f"Снимок содержит недопустимую ссылку {module}.{name}")
+
+
+class BinarySnapshot:
+    """
+    Двоичный снимок репозитория.
+    Файл начинается с заголовка (сигнатура и версия формата), за ним -
+    данные в pickle (протокол 5) только из встроенных типов.
+    Справочники хранятся колонками по полям записей DataManager,
+    транзакции - типизированными колонками: даты (порядковые номера дней),
+    коды номенклатур, складов и единиц измерения (номер в таблице кодов)
+    и количества (float64). Вложения DataManager хранятся как есть
+    """
+
+    signature = b"REPOSNAP"
+    version = 2
+    # Версии, которые читаются: в версии 1 справочники хранились записями
+    __versions = (1, 2)
+
+    __header = struct.Struct("<8sH")
+    __convert = FactoryConvert()
+
+    # Справочники, которые хранятся записями
+    __references = [
+        Repository.unit_measure_key,
+        Repository.group_nomenclature_key,
+        Repository.nomenclature_key,
+        Repository.storage_key,
+        Repository.recipe_key
+    ]
+
+    # Ссылочные колонки транзакций: колонка -> справочник
+    __columns = {
+        "nomenclature": Repository.nomenclature_key,
+        "storage": Repository.storage_key,
+        "unit": Repository.unit_measure_key
+    }
+
+    """
+    Сохранить репозиторий в файл
+    Файл заменяется целиком: при сбое во время записи остается прежний
+    """
+    @staticmethod
+    def save(data: dict, filename: str, journal_sequence: int = 0, attachments: dict = None):
+        Validator.validate(data, dict)
+        Validator.validate(filename, str)
+
+        BinarySnapshot.__write(filename, {
+            "journal_sequence": journal_sequence,
+            "references": {reference_type: BinarySnapshot.__reference_columns(
+                               [BinarySnapshot.__convert.convert(item) for item in data.get(reference_type, {}).values()])
+                           for reference_type in BinarySnapshot.__references},
+            "transactions": BinarySnapshot.__without_gc(BinarySnapshot.__transaction_columns, data),
+            "attachments": attachments or {}
+        })
+
+    """
+    Сохранить в файл заранее подготовленные записи справочников в формате DataManager
+    (отложенная запись готовит их в потоке, изменившем данные)
+    """
+    @staticmethod
+    def save_records(prepared: dict, filename: str, journal_sequence: int = 0):
+        Validator.validate(prepared, dict)
+        Validator.validate(filename, str)
+
+        BinarySnapshot.__write(filename, {
+            "journal_sequence": journal_sequence,
+            "references": {reference_type: BinarySnapshot.__reference_columns(prepared.get(reference_type, []))
+                           for reference_type in BinarySnapshot.__references},
+            "transactions": BinarySnapshot.__without_gc(BinarySnapshot.__record_columns,
+                                                        prepared.get(Repository.transaction_key, [])),
+            "attachments": prepared.get("attachments", {})
+        })
+
+    @staticmethod
+    def __write(filename: str, payload: dict):
+        with open(filename + ".tmp", 'wb') as file:
+            file.write(BinarySnapshot.__header.pack(BinarySnapshot.signature, BinarySnapshot.version))
+            pickle.dump(payload, file, protocol=5)
+        os.replace(filename + ".tmp", filename)
+
+    """
+    Загрузить репозиторий из файла
+    Вложения снимка дописываются в attachments, если он передан
+    Возвращает номер последней записи журнала, учтенной в снимке
+    """
+    @staticmethod
+    def load(data: dict, filename: str, attachments: dict = None) -> int:
+        Validator.validate(data, dict)
+
+        with open(filename, 'rb') as file:
+            header = file.read(BinarySnapshot.__header.size)
+            if len(header) < BinarySnapshot.__header.size:
+                raise ArgumentException(f"Файл {filename} не является снимком репозитория")
+
+            signature, version = BinarySnapshot.__header.unpack(header)
+            if signature != BinarySnapshot.signature:
+                raise ArgumentException(f"Файл {filename} не является снимком репозитория")
+            if version not in BinarySnapshot.__versions:
+                raise ArgumentException(f"Неподдерживаемая версия снимка: {version}")
+
+            try:
+                payload = SnapshotUnpickler(file).load()
+            except (pickle.UnpicklingError, EOFError) as e:
+                raise ArgumentException(f"Файл {filename} поврежден: {str(e)}")
+
+        # Справочники загружаются как из json, транзакции - по колонкам
+        RepositoryLoader.load(data, {reference_type: BinarySnapshot.__reference_records(references)
+                                     for reference_type, references in payload["references"].items()})
+        BinarySnapshot.__without_gc(BinarySnapshot.__load_transactions, data, payload["transactions"])
+        if attachments is not None:
+            attachments.update(payload.get("attachments", {}))
+
+        return payload.get("journal_sequence", 0)
+
+    @staticmethod
+    def __without_gc(method, *args):
+        # Миллионы создаваемых объектов запускают сборщик мусора, который каждый раз
+        # обходит уже созданные: на время пакетной обработки он отключается
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return method(*args)
+        finally:
+            if enabled:
+                gc.enable()
+
+    @staticmethod
+    def __transaction_columns(data: dict) -> dict:
+        items = data.get(Repository.transaction_key, {})
+        transactions = list(items.values())
+        # Ключи справочника совпадают с кодами транзакций
+        ids = list(dict.keys(items))
+        columns = {
+            "count": len(transactions),
+            "dates": array('i', map(datetime.date.toordinal, map(attrgetter("date"), transactions))).tobytes(),
+            "quantities": array('d', map(float, map(attrgetter("quantity"), transactions))).tobytes()
+        }
+
+        # Коды транзакций одной строкой, если в них нет разделителя
+        joined = "\n".join(ids)
+        columns["ids"] = joined if joined.count("\n") == max(len(ids) - 1, 0) else ids
+
+        for column, reference_type in BinarySnapshot.__columns.items():
+            references = list(map(attrgetter(column), transactions))
+            # Номер в таблице кодов ищется по самому объекту, без обращения к его коду
+            table = list(data.get(reference_type, {}).values())
+            codes = {id(item): code for code, item in enumerate(table)}
+            try:
+                column_codes = array('i', map(codes.__getitem__, map(id, references)))
+            except KeyError:
+                # Ссылка на элемент, которого уже нет в справочнике, - он добавляется в таблицу кодов
+                for item in references:
+                    if id(item) not in codes:
+                        codes[id(item)] = len(table)
+                        table.append(item)
+                column_codes = array('i', map(codes.__getitem__, map(id, references)))
+
+            columns[column] = {"table": [item.id for item in table], "codes": column_codes.tobytes()}
+
+        return columns
+
+    @staticmethod
+    def __record_columns(records: list) -> dict:
+        # Те же колонки, что и по объектам транзакций, но по записям с кодами ссылок
+        ids = [record["id"] for record in records]
+        columns = {
+            "count": len(records),
+            "dates": array('i', [datetime.date.fromisoformat(record["date"]).toordinal() for record in records]).tobytes(),
+            "quantities": array('d', [float(record["quantity"]) for record in records]).tobytes()
+        }
+
+        joined = "\n".join(ids)
+        columns["ids"] = joined if joined.count("\n") == max(len(ids) - 1, 0) else ids
+
+        for column in BinarySnapshot.__columns:
+            references = [record[column] for record in records]
+            table = list(dict.fromkeys(references))
+            codes = {item_id: code for code, item_id in enumerate(table)}
+            columns[column] = {"table": table, "codes": array('i', map(codes.__getitem__, references)).tobytes()}
+
+        return columns
+
+    @staticmethod
+    def __reference_columns(records: list) -> dict:
+        # Одна колонка на поле записи; строки, где поля нет (например, базовой единицы), - в missing
+        fields = list(dict.fromkeys(field for record in records for field in record))
+        return {
+            "count": len(records),
+            "fields": {field: {"values": [record.get(field) for record in records],
+                               "missing": [row for row, record in enumerate(records) if field not in record]}
+                       for field in fields}
+        }
+
+    @staticmethod
+    def __reference_records(columns) -> list:
+        # Снимок версии 1 хранит записи как есть
+        if isinstance(columns, list):
+            return columns
+
+        records = [{} for _ in range(columns["count"])]
+        for field, column in columns["fields"].items():
+            missing = set(column["missing"])
+            for row, (record, value) in enumerate(zip(records, column["values"])):
+                if row not in missing:
+                    record[field] = value
+
+        return records
+
+    @staticmethod
+    def __load_transactions(data: dict, columns: dict):
+        count = columns["count"]
+        ids = columns["ids"]
+        if isinstance(ids, str):
+            ids = ids.split("\n") if count > 0 else []
+
+        dates = array('i')
+        dates.frombytes(columns["dates"])
+        # Одинаковые даты создаются один раз
+        date_table = {ordinal: datetime.date.fromordinal(ordinal) for ordinal in set(dates)}
+        quantities = array('d')
+        quantities.frombytes(columns["quantities"])
+
+        references = {}
+        for column, reference_type in BinarySnapshot.__columns.items():
+            items = data[reference_type]
+            table = [items.get(item_id) for item_id in columns[column]["table"]]
+            if None in table:
+                missing = columns[column]["table"][table.index(None)]
+                raise ArgumentException(f"Зависимость {reference_type} с ID {missing} не найдена")
+
+            codes = array('i')
+            codes.frombytes(columns[column]["codes"])
+            references[column] = map(table.__getitem__, codes)
+
+        restore = TransactionModel.restore
+        transactions = {item_id: restore(item_id, date, nomenclature, storage, quantity, unit)
+                        for item_id, date, nomenclature, storage, quantity, unit in zip(
+                            ids, map(date_table.__getitem__, dates), references["nomenclature"],
+                            references["storage"], quantities, references["unit"])}
+
+        # Коды совпадают с ключами - индекс имен справочника не нужен
+        data[Repository.transaction_key] = ReferenceDict()
+        dict.update(data[Repository.transaction_key], transactions)
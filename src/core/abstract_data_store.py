@@ -0,0 +1,136 @@
+from abc import ABC
+from src.core.observe_service import ObserveService
+from src.core.validator import Validator
+
+
+class AbstractDataStore(ABC):
+    """
+    Общее хранилище, привязанное к набору данных репозитория
+    (индексы, колонки, контрольные точки, граф ссылок, внешние хранилища).
+    На один набор данных приходится один экземпляр каждого наследника.
+    Хранилище обновляется по событиям и перестраивается целиком,
+    если справочники-источники изменили в обход событий или к хранилищу
+    обратились во время рассылки события, до которого очередь еще не дошла
+    (данные уже изменены, а хранилище - еще нет)
+    """
+
+    __data: dict = None
+
+    # Хранилища: (класс хранилища, id набора данных) -> хранилище
+    __instances: dict = {}
+
+    # Справочники, по которым строится хранилище
+    _sources: tuple = ()
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.__tracked = {}
+        # Номер последнего учтенного события
+        self.__version = ObserveService.version
+        ObserveService.add(self)
+
+    """
+    Получить общее хранилище для набора данных репозитория
+    Дополнительные аргументы передаются конструктору при создании хранилища
+    """
+    @classmethod
+    def get(cls, data: dict, *args):
+        Validator.validate(data, dict)
+        store = cls.find(data)
+
+        if store is None:
+            store = cls(data, *args)
+            AbstractDataStore.__instances[(cls, id(data))] = store
+
+        return store
+
+    """
+    Хранилище набора данных, если оно было создано (иначе None)
+    Хранилище, которое отписали от событий, считается отвязанным: оно больше не обновляется
+    """
+    @classmethod
+    def find(cls, data: dict):
+        store = AbstractDataStore.__instances.get((cls, id(data)))
+        if store is None or store.data is not data:
+            return None
+
+        if all(handler is not store for handler in ObserveService.handlers):
+            store.release()
+            return None
+
+        return store
+
+    """
+    Отвязать хранилище от набора данных: следующий get создаст новое
+    Отвязанное хранилище больше не получает события
+    """
+    def release(self):
+        key = (self.__class__, id(self.data))
+        if AbstractDataStore.__instances.get(key) is self:
+            del AbstractDataStore.__instances[key]
+
+        ObserveService.delete(self)
+
+    @property
+    def data(self) -> dict:
+        return self.__data
+
+    @data.setter
+    def data(self, value: dict):
+        Validator.validate(value, dict)
+        self.__data = value
+
+    """
+    Полностью перестроить хранилище по данным репозитория
+    """
+    def rebuild(self):
+        self._track()
+
+    """
+    Перестроить хранилище, если оно устарело
+    """
+    def ensure_actual(self):
+        if self.outdated():
+            self.rebuild()
+
+    """
+    Устарело ли хранилище: последнее событие до него еще не дошло,
+    справочник-источник заменили или число его элементов разошлось с хранилищем
+    """
+    def outdated(self) -> bool:
+        if self.__version != ObserveService.version:
+            return True
+
+        for reference_type in self._sources:
+            items = self.__data.get(reference_type, {})
+            replaced = items is not self.__tracked.get(reference_type) and len(items) > 0
+            if replaced or len(items) != self._size(reference_type):
+                return True
+
+        return False
+
+    def handle(self, event: str, params):
+        """
+        Обработчик событий: событие отмечается учтенным и применяется к хранилищу
+        """
+        self.__version = ObserveService.version
+        self._handle(event, params)
+
+    """
+    Применить событие к хранилищу
+    """
+    def _handle(self, event: str, params):
+        pass
+
+    """
+    Запомнить справочники-источники, по которым построено хранилище
+    """
+    def _track(self):
+        self.__version = ObserveService.version
+        self.__tracked = {reference_type: self.__data.get(reference_type, {}) for reference_type in self._sources}
+
+    """
+    Число элементов справочника, учтенных в хранилище
+    """
+    def _size(self, reference_type: str) -> int:
+        return 0
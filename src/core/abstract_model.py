@@ -5,16 +5,20 @@ import uuid
 from src.core.validator import Validator, OperationException
 
 class AbstractModel(ABC):
-    __id: str = ""
+    __id: str = None
 
     @abstractmethod
     def __init__(self):
         super().__init__()
-        self.__id: str = str(uuid.uuid4())
+        # Код создается при первом обращении: загруженным элементам он назначается сразу после создания
+        self.__id: str = None
 
 
     @property
     def id(self) -> str:
+        if self.__id is None:
+            self.__id = str(uuid.uuid4())
+
         return self.__id
     
 
@@ -28,7 +32,7 @@ class AbstractModel(ABC):
         if not isinstance(value, AbstractModel):
             return False
 
-        return self.__id == value.id
+        return self.id == value.id
     
     """
     Обработка события
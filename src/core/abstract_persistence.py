@@ -0,0 +1,73 @@
+from abc import ABC, abstractmethod
+
+
+class AbstractPersistence(ABC):
+    """
+    Стратегия сохранения репозитория для DataManager:
+    как изменения справочников попадают в файл данных.
+    Файл данных (снимок) записывает сам DataManager
+    """
+
+    def __init__(self, manager):
+        self.__manager = manager
+
+    """
+    Менеджер данных, файл которого сохраняет стратегия
+    """
+    @property
+    def manager(self):
+        return self.__manager
+
+    """
+    Номер последней записи журнала, учтенной в снимке (без журнала - 0)
+    """
+    @property
+    def sequence(self) -> int:
+        return 0
+
+    """
+    Количество изменений, еще не сохраненных в файл
+    """
+    @property
+    def pending_changes(self) -> int:
+        return 0
+
+    """
+    Количество записей в журнале после последнего сжатия
+    """
+    @property
+    def journal_records(self) -> int:
+        return 0
+
+    """
+    Учесть изменение элементов справочника
+    """
+    @abstractmethod
+    def changed(self, reference_type: str, items: list):
+        pass
+
+    """
+    Дописать изменения, сохраненные после снимка
+    sequence - номер записи журнала, учтенной в загруженном снимке
+    Возвращает True, если изменения были применены
+    """
+    def load(self, sequence: int) -> bool:
+        return False
+
+    """
+    Сохранить накопленные изменения сейчас
+    """
+    def flush(self) -> bool:
+        return self.manager._save()
+
+    """
+    Сохранить снимок репозитория и отбросить накопленные после него изменения
+    """
+    def compact(self) -> bool:
+        return self.flush()
+
+    """
+    Остановить сохранение и сохранить несохраненные изменения
+    """
+    def shutdown(self) -> bool:
+        return True
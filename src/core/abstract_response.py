@@ -1,9 +1,13 @@
 from src.core.validator import Validator, OperationException
+from src.core.common import common
 from abc import ABC, abstractmethod
 
 # Абстрактный класс для формирования ответов
 class AbstractResponse(ABC):
 
+    # Размер части потокового ответа (символов)
+    chunk_size: int = 65536
+
     def __init__(self):
         super().__init__()
     
@@ -16,4 +20,31 @@ class AbstractResponse(ABC):
         if len(data) == 0:
             raise OperationException("Нет данных!")
 
-        return f""
\ No newline at end of file
+        return f""
+
+    # Сформировать ответ по частям для потоковой отдачи (по умолчанию - одной частью)
+    def stream(self, format: str, data: list):
+        yield self.build(format, data)
+
+    # Строки значений полей по списку полей первого элемента (для текстовых форматов)
+    def _rows(self, fields: list, data: list):
+        cls = data[0].__class__
+        getters = dict(common.get_schema(cls))
+        getters = [getters[field] for field in fields]
+
+        for item in data:
+            if item.__class__ is cls:
+                values = [getter(item) for getter in getters]
+            else:
+                values = [getattr(item, field, "") for field in fields]
+
+            yield [self._text(value) for value in values]
+
+    # Текстовое представление значения: у вложенных объектов - наименование или код
+    @staticmethod
+    def _text(value) -> str:
+        if hasattr(value, 'name'):
+            return str(value.name)
+        if hasattr(value, 'id'):
+            return str(value.id)
+        return str(value)
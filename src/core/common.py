@@ -5,6 +5,9 @@ from src.core.validator import ArgumentException
 # Набор статических общих методов
 class common:
 
+    # Схемы полей классов: класс -> кортеж пар (имя свойства, функция чтения свойства)
+    __schemas: dict = {}
+
     """
     Получить список наименований всех моделей
     """
@@ -17,6 +20,41 @@ class common:
         return result    
 
 
+    """
+    Получить схему полей класса: пары (имя свойства, функция чтения свойства)
+    в порядке dir(). Схема строится один раз на класс
+    """
+    @staticmethod
+    def get_schema(cls) -> tuple:
+        schema = common.__schemas.get(cls)
+        if schema is not None:
+            return schema
+
+        schema = []
+        for item in dir(cls):
+            if item.startswith("_"):
+                continue
+
+            attribute = getattr(cls, item)
+            if isinstance(attribute, property):
+                schema.append((item, attribute.fget))
+
+        schema = tuple(schema)
+        common.__schemas[cls] = schema
+        return schema
+
+
+    """
+    Сбросить схемы полей (например, после изменения класса): одного класса или всех
+    """
+    @staticmethod
+    def clear_schema(cls = None):
+        if cls is None:
+            common.__schemas.clear()
+        else:
+            common.__schemas.pop(cls, None)
+
+
     """
     Получить полный список полей любой модели
         - is_common = True - исключить из списка словари и списки
@@ -27,19 +65,16 @@ class common:
         if source is None:
             raise ArgumentException("Некорректно переданы аргументы!")
 
-        items = list(filter(lambda x: not x.startswith("_") , dir(source))) 
         result = []
 
-        for item in items:
-            attribute = getattr(source.__class__, item)
-            if isinstance(attribute, property):
-                value = getattr(source, item)
-
-                # Флаг. Только простые типы и модели включать
-                if is_common == True and (isinstance(value, dict) or isinstance(value, list) ):
+        for item, getter in common.get_schema(source.__class__):
+            # Флаг. Только простые типы и модели включать
+            if is_common == True:
+                value = getter(source)
+                if isinstance(value, dict) or isinstance(value, list):
                     continue
 
-                result.append(prefix + item)
+            result.append(prefix + item)
 
         return result
     
@@ -53,21 +88,18 @@ class common:
         if source is None:
             raise ArgumentException("Некорректно переданы аргументы!")
 
-        items = list(filter(lambda x: not x.startswith("_") , dir(source))) 
         result = []
 
-        for item in items:
-            attribute = getattr(source.__class__, item)
-            if isinstance(attribute, property):
-                value = getattr(source, item)
+        for item, getter in common.get_schema(source.__class__):
+            value = getter(source)
 
-                if is_common == True and (isinstance(value, dict) or isinstance(value, list) ):
-                    continue
+            if is_common == True and (isinstance(value, dict) or isinstance(value, list) ):
+                continue
 
-                if isinstance(value, AbstractModel):
-                    inner_result = common.get_fields(value, False, f"{item}/")
-                    result.extend(inner_result)
-                else:
-                    result.append(item)
+            if isinstance(value, AbstractModel):
+                inner_result = common.get_fields(value, False, f"{item}/")
+                result.extend(inner_result)
+            else:
+                result.append(item)
 
         return result
\ No newline at end of file
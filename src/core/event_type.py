@@ -19,20 +19,40 @@ class EventType:
         return "convert_to_json"
 
     """
-    Событие - обновились/добавились элементы в справочники
+    Событие - обновились/добавились/удалились элементы в справочниках
+    Параметры: {"reference_type": тип справочника, "item": измененный элемент}
     """
     @staticmethod
     def change_reference_type_key() -> str:
         return "change_reference_type"
 
+    """
+    Событие - пакетно добавились элементы в справочник (одно событие на весь пакет)
+    Параметры: {"reference_type": тип справочника, "items": список добавленных элементов}
+    """
+    @staticmethod
+    def bulk_change_reference_type_key() -> str:
+        return "bulk_change_reference_type"
+
     """
     Событие - удаляется элемент у справочника
+    Проверочное: обработчик запрещает удаление исключением, данные при этом не меняются
     """
     @staticmethod
     def delete_reference_type_key() -> str:
         return "delete_reference_type"
 
 
+    """
+    Событие - транзакции перенесены из репозитория в сегменты закрытого периода
+    Параметры: {"reference_type": тип справочника, "items": список перенесенных транзакций}
+    Транзакции не удалены: суммы с учетом сегментов не меняются
+    """
+    @staticmethod
+    def seal_transactions_key() -> str:
+        return "seal_transactions"
+
+
     """
     Событие - обновилась единица измерения у номенклатуры
     """
@@ -41,6 +61,26 @@ class EventType:
         return "change_nomenclature_unit"
     
 
+    """
+    Измененные элементы справочника из параметров события
+    change_reference_type (один элемент), bulk_change_reference_type или seal_transactions (пакет)
+    Возвращает: (тип справочника, список элементов); для прочих событий - (None, [])
+    """
+    @staticmethod
+    def changed_items(event: str, params) -> tuple:
+        if not isinstance(params, dict):
+            return None, []
+
+        if event in (EventType.bulk_change_reference_type_key(), EventType.seal_transactions_key()):
+            return params.get("reference_type"), list(params.get("items", []))
+
+        if event == EventType.change_reference_type_key():
+            item = params.get("item")
+            return params.get("reference_type"), [] if item is None else [item]
+
+        return None, []
+
+
     # Получить список всех событий
     def events(self):
         return [attr[:-4] for attr in dir(self) 
@@ -0,0 +1,185 @@
+import operator
+from functools import lru_cache
+from src.core.filter_type import FilterType
+from src.core.validator import ArgumentException
+from src.dtos.filter_sorting_dto import FilterSortingDto
+
+
+class FilterPlan:
+    """
+    Скомпилированный план фильтрации.
+    Функции получения полей и операторы сравнения подготавливаются один раз,
+    значения фильтров подставляются при каждом выполнении
+    """
+
+    def __init__(self, shape: tuple):
+        self.__shape = shape
+        self.__conditions = []
+
+        # Сначала самые дешевые и селективные условия, затем вложенные поля
+        order = sorted(range(len(shape)), key=lambda index: (
+            FilterCompiler.get_cost(shape[index][1]),
+            shape[index][0].count("/")
+        ))
+
+        for index in order:
+            field_name, filter_type = shape[index]
+            getter = operator.attrgetter(field_name.replace("/", "."))
+            compare = FilterCompiler.get_operator(filter_type)
+            self.__conditions.append((index, getter, compare))
+
+    # Форма плана: кортеж пар (field_name, type)
+    @property
+    def shape(self) -> tuple:
+        return self.__shape
+
+    """
+    Проверить, что все поля плана есть у элемента
+    """
+    def validate(self, item):
+        for _, getter, _ in self.__conditions:
+            try:
+                getter(item)
+            except AttributeError:
+                raise ArgumentException("Не верно указан field_name в одном из фильтров")
+
+    """
+    Проверить, что все поля плана есть у модели, до прохода по данным (в том числе пустым)
+    Тип вложенного поля берется из аннотации сеттера свойства, без нее поле дальше не проверяется
+    """
+    def validate_model(self, model: type):
+        for field_name, _ in self.__shape:
+            current = model
+            for part in field_name.split("/"):
+                if current is None:
+                    break
+
+                if not hasattr(current, part):
+                    raise ArgumentException("Не верно указан field_name в одном из фильтров")
+
+                current = FilterPlan.__field_type(getattr(current, part))
+
+    @staticmethod
+    def __field_type(attribute):
+        if not isinstance(attribute, property) or attribute.fset is None:
+            return None
+
+        annotations = [value for name, value in attribute.fset.__annotations__.items() if name != "return"]
+        return annotations[0] if len(annotations) > 0 and isinstance(annotations[0], type) else None
+
+    """
+    Получить предикат со связанными значениями фильтров
+    """
+    def predicate(self, values: tuple):
+        bound = [(getter, compare, values[index]) for index, getter, compare in self.__conditions]
+
+        def match(item) -> bool:
+            for getter, compare, value in bound:
+                if not compare(getter(item), value):
+                    return False
+
+            return True
+
+        return match
+
+    """
+    Лениво выполнить план: каждый элемент проверяется всеми условиями по очереди,
+    подходящие элементы отдаются по одному без промежуточных списков
+    """
+    def iterate(self, data, values: tuple):
+        match = self.predicate(values)
+        validated = False
+
+        for item in data:
+            if not validated:
+                self.validate(item)
+                validated = True
+
+            if match(item):
+                yield item
+
+    """
+    Выполнить план за один проход по данным
+    """
+    def execute(self, data, values: tuple) -> list:
+        return list(self.iterate(data, values))
+
+
+class FilterCompiler:
+    """
+    Компилятор фильтров FilterSortingDto в переиспользуемый план.
+    Планы кэшируются по форме фильтра (набор полей и типов без значений)
+    """
+
+    # Соответствие типов фильтров операторам сравнения: operator(значение поля, значение фильтра)
+    __operators = {
+        FilterType.equals(): operator.eq,
+        FilterType.like(): operator.contains,
+        FilterType.less(): operator.lt,
+        FilterType.greater(): operator.gt,
+        FilterType.less_or_equal(): operator.le,
+        FilterType.greater_or_equal(): operator.ge,
+        FilterType.not_equals(): operator.ne
+    }
+
+    # Относительная стоимость проверки условия: равенство обычно самое селективное,
+    # поиск подстроки - самый дорогой
+    __costs = {
+        FilterType.equals(): 0,
+        FilterType.not_equals(): 1,
+        FilterType.less(): 1,
+        FilterType.greater(): 1,
+        FilterType.less_or_equal(): 1,
+        FilterType.greater_or_equal(): 1,
+        FilterType.like(): 2
+    }
+
+    """
+    Получить оператор сравнения по типу фильтра
+    """
+    @staticmethod
+    def get_operator(filter_type: str):
+        if filter_type not in FilterCompiler.__operators:
+            raise ArgumentException("Не верно указан type в одном из фильтров")
+
+        return FilterCompiler.__operators[filter_type]
+
+    """
+    Получить относительную стоимость условия по типу фильтра
+    """
+    @staticmethod
+    def get_cost(filter_type: str) -> int:
+        return FilterCompiler.__costs.get(filter_type, 1)
+
+    """
+    Разобрать фильтры на форму и значения
+    """
+    @staticmethod
+    def split(filters: FilterSortingDto) -> tuple:
+        shape = []
+        values = []
+
+        for filter in filters.filters:
+            filter_type = filter["type"].lower()
+            FilterCompiler.get_operator(filter_type)
+
+            shape.append((filter["field_name"], filter_type))
+            values.append(filter["value"])
+
+        return tuple(shape), tuple(values)
+
+    """
+    Скомпилировать фильтры. Возвращает план и значения для его выполнения
+    """
+    @staticmethod
+    def compile(filters: FilterSortingDto) -> tuple:
+        shape, values = FilterCompiler.split(filters)
+        return FilterCompiler.compile_shape(shape), values
+
+    """
+    Получить план по форме фильтра (с кэшированием)
+    """
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_shape(shape: tuple) -> FilterPlan:
+        return FilterPlan(shape)
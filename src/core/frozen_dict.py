@@ -0,0 +1,24 @@
+from src.core.validator import OperationException
+
+
+class FrozenDict(dict):
+    """
+    Словарь только для чтения: строки, общие для всех запросов (например, остатки
+    на дату блокировки), нельзя изменить на месте. В JSON выгружается как обычный
+    словарь, копия (dict(row), copy.copy) - обычный изменяемый словарь
+    """
+
+    def __readonly(self, *args, **kwargs):
+        raise OperationException("Словарь только для чтения")
+
+    __setitem__ = __readonly
+    __delitem__ = __readonly
+    __ior__ = __readonly
+    clear = __readonly
+    pop = __readonly
+    popitem = __readonly
+    setdefault = __readonly
+    update = __readonly
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
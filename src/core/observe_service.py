@@ -1,19 +1,33 @@
 from src.core.abstract_model import AbstractModel
+from src.core.event_type import EventType
 
 
 class ObserveService:
     handlers = []
 
+    # Номер последнего вызванного события
+    version: int = 0
+
     """
     Добавить объект под наблюдение
+    Объекты с признаком observe_last (сохранение данных) получают события последними,
+    когда остальные обработчики уже обновили свое состояние
     """
     @staticmethod
     def add(instance):
         if instance is None:
             return
 
-        if instance not in ObserveService.handlers:
+        if instance in ObserveService.handlers:
+            return
+
+        if getattr(instance, "observe_last", False):
             ObserveService.handlers.append(instance)
+            return
+
+        position = next((position for position, handler in enumerate(ObserveService.handlers)
+                         if getattr(handler, "observe_last", False)), len(ObserveService.handlers))
+        ObserveService.handlers.insert(position, instance)
 
     """
     Убрать объект из под наблюдения
@@ -23,14 +37,19 @@ class ObserveService:
         if instance is None:
             return
 
-
-        if instance not in ObserveService.handlers:
+        if instance in ObserveService.handlers:
             ObserveService.handlers.remove(instance)
 
     """
     Вызвать события
+    Проверка перед удалением данные не меняет: номер события не растет,
+    и отказ в удалении посреди рассылки не делает хранилища устаревшими
+    Рассылка идет по копии списка: обработчик может отписаться во время события
     """
     @staticmethod
     def create_event(event: str, params):
-        for instance in ObserveService.handlers:
+        if event != EventType.delete_reference_type_key():
+            ObserveService.version += 1
+
+        for instance in list(ObserveService.handlers):
             instance.handle(event, params)
\ No newline at end of file
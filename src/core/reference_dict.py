@@ -0,0 +1,117 @@
+class ReferenceDict(dict):
+    """
+    Справочник репозитория: элементы хранятся по коду (id).
+    Вторичный индекс имен позволяет обращаться к элементу и по имени,
+    под которым он был добавлен (например "wheat_flour" у эталонных данных)
+    """
+
+    def __init__(self, items: dict = None):
+        super().__init__()
+        # Индекс имен: имя -> код элемента
+        self.__names = {}
+
+        if items is not None:
+            for key, item in items.items():
+                self[key] = item
+
+    """
+    Привести справочник к хранению по коду
+    """
+    @staticmethod
+    def normalize(items: dict) -> "ReferenceDict":
+        if isinstance(items, ReferenceDict):
+            return items
+
+        return ReferenceDict(items)
+
+    """
+    Индекс имен: имя -> код элемента
+    """
+    @property
+    def names(self) -> dict:
+        return {name: item_id for name, item_id in self.__names.items() if dict.__contains__(self, item_id)}
+
+    """
+    Получить код элемента по коду или имени
+    """
+    def resolve(self, key):
+        if super().__contains__(key):
+            return key
+
+        item_id = self.__names.get(key)
+        if item_id is not None and super().__contains__(item_id):
+            return item_id
+
+        return None
+
+    def __setitem__(self, key, item):
+        item_id = item.id
+
+        if key != item_id:
+            previous = self.__names.get(key)
+
+            # Имя переназначено на другой элемент - прежний заменяется, как в обычном словаре
+            if previous is not None and previous != item_id:
+                super().pop(previous, None)
+
+            self.__names[key] = item_id
+
+        super().__setitem__(item_id, item)
+
+    def update(self, *args, **kwargs):
+        for key, item in dict(*args, **kwargs).items():
+            self[key] = item
+
+    def setdefault(self, key, default = None):
+        if key in self:
+            return self[key]
+
+        self[key] = default
+        return default
+
+    # Копия сохраняет индекс имен
+    def copy(self) -> "ReferenceDict":
+        result = ReferenceDict()
+        dict.update(result, self)
+        result.__names.update(self.names)
+        return result
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __or__(self, other):
+        result = self.copy()
+        result.update(other)
+        return result
+
+    def __missing__(self, key):
+        item_id = self.resolve(key)
+        if item_id is None:
+            raise KeyError(key)
+
+        return super().__getitem__(item_id)
+
+    def __contains__(self, key) -> bool:
+        return self.resolve(key) is not None
+
+    def __delitem__(self, key):
+        item_id = self.resolve(key)
+        if item_id is None:
+            raise KeyError(key)
+
+        super().__delitem__(item_id)
+
+    def get(self, key, default = None):
+        item_id = self.resolve(key)
+        if item_id is None:
+            return default
+
+        return super().__getitem__(item_id)
+
+    def pop(self, key, *default):
+        item_id = self.resolve(key)
+        if item_id is None:
+            return super().pop(key, *default)
+
+        return super().pop(item_id)
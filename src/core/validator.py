@@ -9,31 +9,36 @@ class OperationException(Exception):
 class Validator:
 
     @staticmethod
-    def validate(value, variable_type, variable_len=None, comparison_sign="=", name=None):
+    def validate(value, variable_type, variable_len=None, comparison_sign="=", field_name=None):
+        # Имя проверяемого поля для текста ошибки
+        prefix = "" if field_name is None else f"Поле {field_name}: "
+
         if value is None:
             if isinstance(variable_type, tuple):
                 if type(None) not in variable_type:
-                    raise ArgumentException("Аргумент не может быть None")
+                    raise ArgumentException(prefix + "Аргумент не может быть None")
                 
             elif variable_type is not type(None):
-                raise ArgumentException("Аргумент не может быть None")
+                raise ArgumentException(prefix + "Аргумент не может быть None")
 
         if not isinstance(value, variable_type):
-            raise ArgumentException(f"Аргумент должен быть типа {variable_type}")
+            raise ArgumentException(prefix + f"Аргумент должен быть типа {variable_type}")
         
-        if len(str(value).strip()) == 0:
-            raise ArgumentException(f"Аргумент не должен быть пустым")
+        # Строковое представление коллекции не бывает пустым, а строить его для
+        # больших наборов данных дорого
+        if not isinstance(value, (dict, list, tuple, set)) and len(str(value).strip()) == 0:
+            raise ArgumentException(prefix + f"Аргумент не должен быть пустым")
 
         if variable_len is not None:
             if comparison_sign == "=":
                 if len(str(value).strip()) != variable_len:
-                    raise ArgumentException("Некорректная длина аргумента")
+                    raise ArgumentException(prefix + "Некорректная длина аргумента")
             elif comparison_sign == ">":
                 if len(str(value).strip()) > variable_len:
-                    raise ArgumentException("Некорректная длина аргумента")   
+                    raise ArgumentException(prefix + "Некорректная длина аргумента")   
             elif comparison_sign == "<":
                 if len(str(value).strip()) < variable_len:
-                    raise ArgumentException("Некорректная длина аргумента")        
+                    raise ArgumentException(prefix + "Некорректная длина аргумента")        
                 
         return True
     
@@ -1,38 +1,268 @@
-
 import json
+import os
+import threading
+import time
+from src.core.abstract_persistence import AbstractPersistence
 from src.core.observe_service import ObserveService
 from src.logics.factory_entities import FactoryEntities
+from src.logics.factory_convert import FactoryConvert
 from src.core.event_type import EventType
+from src.core.validator import ArgumentException
+from src.core.logger import Logger
 from src.repository import Repository
+from src.repository_loader import RepositoryLoader
+from src.binary_snapshot import BinarySnapshot
+from src.logics.journal_persistence import JournalPersistence
+from src.logics.sync_persistence import SyncPersistence
+from src.logics.write_behind_persistence import WriteBehindPersistence
 
 
 class DataManager:
+    """
+    Сохранение репозитория в json файл.
+    Как изменения справочников попадают в файл, определяет стратегия сохранения:
+    без интервала сохранения файл перезаписывается на каждое изменение (SyncPersistence),
+    с интервалом - отложенной записью в фоновом потоке (WriteBehindPersistence),
+    с журналом - дописыванием изменений в журнал и перезаписью снимка при его сжатии
+    (JournalPersistence). При запуске снимок и журнал загружаются методом load.
+    Без подписки на события (observe=False) файл сохраняется только явными вызовами
+    Снимок сохраняется в json или в компактном двоичном формате (BinarySnapshot)
+    Вместе со справочниками в файл данных попадают вложения (attach) - состояние,
+    которое должно соответствовать сохраненным данным (снимок остатков на дату блокировки)
+    DataManager получает события последним, когда остальные обработчики уже обновились
+    """
     __data = None
     __factory = FactoryEntities()
+    __convert = FactoryConvert()
+
+    observe_last = True
+
+    # Политики сброса журнала на диск: после каждого изменения или на усмотрение ОС
+    fsync_policies = JournalPersistence.fsync_policies
+
+    # Форматы файла данных
+    snapshot_formats = ["json", "binary"]
 
 
-    def __init__(self, data):
+    def __init__(self, data, filename: str = "data/data.json", flush_interval_ms: int = None, flush_max_changes: int = None,
+                 journal_filename: str = None, fsync: str = "always", compact_records: int = 10000,
+                 snapshot_format: str = "json", observe: bool = True):
         self.__data = data
-        ObserveService.add(self)
+        self.__filename = filename
+        # Вложения файла данных: имя -> функция, возвращающая содержимое
+        self.__attachments = {}
+        # Вложения, загруженные из файла данных
+        self.__loaded_attachments = {}
+
+        if snapshot_format not in DataManager.snapshot_formats:
+            raise ArgumentException(f"Недопустимый формат снимка. Допустимые значения: {DataManager.snapshot_formats}")
+        self.__snapshot_format = snapshot_format
+
+        if journal_filename is not None:
+            self.__persistence = JournalPersistence(self, journal_filename, fsync, compact_records)
+        elif flush_interval_ms is not None:
+            self.__persistence = WriteBehindPersistence(self, flush_interval_ms, flush_max_changes)
+        else:
+            self.__persistence = SyncPersistence(self)
+
+        # Метрики сохранений
+        self.__lock = threading.Lock()
+        self.__flushes = 0
+        self.__failed_flushes = 0
+        self.__last_flush_ms = 0.0
+        self.__max_flush_ms = 0.0
+        self.__total_flush_ms = 0.0
+
+        # Без подписки на события файл сохраняется только явными вызовами flush/compact
+        if observe:
+            ObserveService.add(self)
+
+    """
+    Данные репозитория
+    """
+    @property
+    def data(self) -> dict:
+        return self.__data
+
+    """
+    Стратегия сохранения
+    """
+    @property
+    def persistence(self) -> AbstractPersistence:
+        return self.__persistence
+
+    """
+    Включена ли отложенная запись
+    """
+    @property
+    def write_behind(self) -> bool:
+        return isinstance(self.__persistence, WriteBehindPersistence)
+
+    """
+    Включен ли журнал изменений
+    """
+    @property
+    def journaled(self) -> bool:
+        return isinstance(self.__persistence, JournalPersistence)
+
+    """
+    Количество записей в журнале после последнего сжатия
+    """
+    @property
+    def journal_records(self) -> int:
+        return self.__persistence.journal_records
+
+    """
+    Количество изменений, еще не сохраненных в файл
+    """
+    @property
+    def pending_changes(self) -> int:
+        return self.__persistence.pending_changes
+
+    """
+    Метрики сохранений: несохраненные изменения, число сохранений и их длительность (мс)
+    """
+    @property
+    def metrics(self) -> dict:
+        with self.__lock:
+            return {
+                "write_behind": self.write_behind,
+                "journaled": self.journaled,
+                "snapshot_format": self.__snapshot_format,
+                "journal_records": self.journal_records,
+                "pending_changes": self.pending_changes,
+                "flushes": self.__flushes,
+                "failed_flushes": self.__failed_flushes,
+                "last_flush_latency_ms": round(self.__last_flush_ms, 3),
+                "max_flush_latency_ms": round(self.__max_flush_ms, 3),
+                "average_flush_latency_ms": round(self.__total_flush_ms / self.__flushes, 3) if self.__flushes else 0.0
+            }
+
+    """
+    Формат файла данных
+    """
+    @property
+    def snapshot_format(self) -> str:
+        return self.__snapshot_format
+
+    """
+    Добавить вложение файла данных
+    provider вызывается при сохранении и возвращает содержимое (json-совместимое) или None
+    """
+    def attach(self, name: str, provider):
+        self.__attachments[name] = provider
+
+    """
+    Вложение, загруженное из файла данных (None, если его нет или оно устарело)
+    """
+    def attachment(self, name: str):
+        return self.__loaded_attachments.get(name)
+
+    """
+    Содержимое вложений на текущий момент
+    """
+    def capture_attachments(self) -> dict:
+        attachments = {}
+        for name, provider in self.__attachments.items():
+            content = provider()
+            if content is not None:
+                attachments[name] = content
+
+        return attachments
+
+    """
+    Запись элемента справочника в формате файла данных
+    """
+    def convert(self, item) -> dict:
+        return self.__convert.convert(item)
 
     """
-    Сохраняет данные в json файл
+    Сохраняет данные в файл
+    prepared - записи справочников и вложения, подготовленные заранее
+    (None - подготовить по текущим данным репозитория)
     """
-    def save_data_to_file(self, filename="data/data.json"):
-        prepared_data = self.prepare_data(self.__data, self.__factory)
-        
+    def save_data_to_file(self, filename=None, prepared: dict = None):
+        filename = filename or self.__filename
+
+        if self.__snapshot_format == "binary":
+            try:
+                if prepared is None:
+                    BinarySnapshot.save(self.__data, filename, self.__persistence.sequence, self.capture_attachments())
+                else:
+                    BinarySnapshot.save_records(prepared, filename, self.__persistence.sequence)
+                return True
+            except Exception as e:
+                Logger.error("DataManager", f"Ошибка сохранения двоичного снимка: {str(e)}")
+                return False
+
+        if prepared is None:
+            prepared_data = self.prepare_data(self.__data, self.__factory)
+            prepared_data["attachments"] = self.capture_attachments()
+        else:
+            prepared_data = dict(prepared)
+
+        # Записи журнала с номером не больше этого уже учтены в снимке
+        if self.journaled:
+            prepared_data["journal_sequence"] = self.__persistence.sequence
+
         try:
-            with open(filename, 'w', encoding='utf-8') as file:
+            # Файл заменяется целиком: при сбое во время записи остается прежний
+            with open(filename + ".tmp", 'w', encoding='utf-8') as file:
                 json.dump(prepared_data, file, ensure_ascii=False, indent=4)
+            os.replace(filename + ".tmp", filename)
 
             return True
         except Exception as e:
             return False
 
+    """
+    Загрузить репозиторий из файла данных и дописать изменения из журнала
+    Возвращает True, если данные были загружены
+    """
+    def load(self) -> bool:
+        loaded = False
+        sequence = 0
+        self.__loaded_attachments = {}
+
+        if os.path.exists(self.__filename) and self.__snapshot_format == "binary":
+            sequence = BinarySnapshot.load(self.__data, self.__filename, self.__loaded_attachments)
+            loaded = True
+        elif os.path.exists(self.__filename):
+            with open(self.__filename, 'r', encoding='utf-8') as file:
+                prepared_data = json.load(file)
+            RepositoryLoader.load(self.__data, prepared_data)
+            sequence = prepared_data.get("journal_sequence", 0)
+            self.__loaded_attachments = prepared_data.get("attachments", {})
+            loaded = True
+
+        if self.__persistence.load(sequence):
+            # Изменения из журнала новее вложений снимка - вложения не используются
+            self.__loaded_attachments = {}
+            return True
+
+        return loaded
+
+    """
+    Сжать журнал: сохранить снимок репозитория и очистить журнал
+    """
+    def compact(self) -> bool:
+        return self.__persistence.compact()
+
+    """
+    Сохранить накопленные изменения сейчас
+    """
+    def flush(self) -> bool:
+        return self.__persistence.flush()
+
+    """
+    Остановить фоновое сохранение и сохранить несохраненные изменения
+    """
+    def shutdown(self) -> bool:
+        return self.__persistence.shutdown()
 
     """
     Подготавливает данные, приводя их в json формат
-    """    
+    """
     def prepare_data(self, data, factory):
         all_fields = Repository.get_key_fields(Repository)
 
@@ -47,14 +277,54 @@ class DataManager:
             else:
                 data_to_json = list(data[field].values())
 
-            result = logic().build("json", data_to_json)
+            # Пустой справочник сохраняется пустым списком
+            result = logic().build("json", data_to_json) if len(data_to_json) > 0 else []
             prepared_data[field] = result
 
         return prepared_data
-    
+
+    """
+    Записи справочников по текущим данным репозитория (без остатков)
+    Возвращает: справочник -> {код элемента: запись}
+    """
+    def capture(self) -> dict:
+        return {field: {item.id: self.convert(item) for item in self.__data[field].values()}
+                for field in Repository.get_key_fields(Repository) if field != Repository.balances_key}
+
+    """
+    Сохранить файл данных с учетом метрик сохранений (вызывается стратегией сохранения)
+    prepared - заранее подготовленные записи (см. save_data_to_file)
+    """
+    def _save(self, prepared: dict = None) -> bool:
+        start_time = time.perf_counter()
+        try:
+            result = self.save_data_to_file(prepared=prepared)
+        except Exception as e:
+            # Ошибка подготовки данных не должна останавливать фоновое сохранение
+            Logger.error("DataManager", f"Ошибка подготовки данных к сохранению: {str(e)}")
+            result = False
+        latency = (time.perf_counter() - start_time) * 1000
+
+        with self.__lock:
+            self.__last_flush_ms = latency
+            self.__max_flush_ms = max(self.__max_flush_ms, latency)
+            self.__total_flush_ms += latency
+
+            if result:
+                self.__flushes += 1
+            else:
+                self.__failed_flushes += 1
+
+        if not result:
+            Logger.error("DataManager", f"Ошибка сохранения данных в {self.__filename}")
+
+        return result
+
     def handle(self, event: str, params):
         """
         Обработчик событий
         """
-        if event == EventType.change_reference_type_key():
-            self.save_data_to_file("data/data.json")
\ No newline at end of file
+        if event not in [EventType.change_reference_type_key(), EventType.bulk_change_reference_type_key()]:
+            return
+
+        self.__persistence.changed(*EventType.changed_items(event, params))
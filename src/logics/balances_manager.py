@@ -1,15 +1,22 @@
-from datetime import datetime, date
+from collections import ChainMap, OrderedDict
+from datetime import datetime, date, timedelta
+from types import MappingProxyType
 from typing import List
 
 from src.core.observe_service import ObserveService
 from src.core.event_type import EventType
 from src.logics.factory_convert import FactoryConvert
-from src.dtos.filter_sorting_dto import FilterSortingDto
-from src.core.prototype import Prototype
 from src.repository import Repository
+from src.transaction_index import TransactionIndex
+from src.balance_checkpoints import BalanceCheckpoints
+from src.transaction_columns import TransactionColumns
+from src.sqlite_storage import SqliteStorage
+from src.transaction_segments import TransactionSegments
 from src.core.validator import Validator
+from src.core.frozen_dict import FrozenDict
 from src.models.transaction_model import TransactionModel
-import copy
+import json
+import os
 
 class BalancesManager:
     """Менеджер для расчета и управления остатками товаров на складах"""
@@ -18,9 +25,28 @@ class BalancesManager:
     __data: dict
     __factory: FactoryConvert = FactoryConvert()
 
-    def __init__(self, data, block_period):
+    # Снимок остатков на дату блокировки: (код номенклатуры, код склада) -> [число транзакций, количество]
+    __snapshot: dict = None
+    # Число транзакций закрытого периода, по которым построен снимок
+    __snapshot_count: int = 0
+    # Остатки на дату блокировки по номенклатурам: код номенклатуры -> строка остатка
+    # (словарь и строки только для чтения - строки отдаются всем запросам без копирования)
+    __balances: MappingProxyType = None
+    __snapshot_file: str = None
+    # Содержимое снимка для сохранения (строится при первом запросе после изменения снимка)
+    __content: dict = None
+    # Номер последнего учтенного события
+    __version: int = 0
+    # Кэш остатков по складам: (код склада, дата) -> список строк остатков
+    __storage_cache: OrderedDict = None
+    __storage_cache_size: int = 128
+
+    def __init__(self, data, block_period, snapshot_file: str = None):
         self.data = data
         self.block_period = block_period
+        self.snapshot_file = snapshot_file
+        self.__storage_cache = OrderedDict()
+        self.__version = ObserveService.version
         ObserveService.add(self)
 
     def calculation_balances_up_blocking_date(self):
@@ -30,35 +56,112 @@ class BalancesManager:
             List: Список балансов для каждой номенклатуры на дату блокировки
         """
 
-        transactions: List[TransactionModel] = list(self.data[Repository.transaction_key].values())
+        self.__snapshot = self.__calculate_totals(None, self.block_period)
+        self.__snapshot_count = self.__closed_count()
+        self.save_snapshot()
 
-        balance_prototype = Prototype(transactions)
+        return self.__build_balances()
 
-        up_block_period = FilterSortingDto([
-            {
-                "field_name": "date",
-                "value": self.block_period,
-                "type": "less"
-            }
-        ], [])
-        transactions_up_block_period = balance_prototype.filter(balance_prototype, up_block_period)
 
-        balances = {}
-        for transaction in transactions_up_block_period.data:
+    def move_block_period(self, new_block_period: date):
+        """Перенос даты блокировки со сдвигом снимка остатков
+        Применяются только транзакции между старой и новой датой блокировки
+        
+        Args:
+            new_block_period: Новая дата блокировки
+            
+        Returns:
+            List: Список балансов для каждой номенклатуры на новую дату блокировки
+        """
+        Validator.validate(new_block_period, date)
+        old_block_period = self.block_period
+
+        if self.__snapshot is None:
+            self.block_period = new_block_period
+            return self.calculation_balances_up_blocking_date()
+
+        if new_block_period > old_block_period:
+            self.__apply_totals(self.__calculate_totals(old_block_period, new_block_period), 1)
+        elif new_block_period < old_block_period:
+            self.__apply_totals(self.__calculate_totals(new_block_period, old_block_period), -1)
+
+        self.block_period = new_block_period
+        self.__snapshot_count = self.__closed_count()
+        self.save_snapshot()
+
+        return self.__build_balances()
+
+
+    def __calculate_totals(self, start_date, end_date) -> dict:
+        """Суммы по парам (номенклатура, склад) за период [start_date, end_date)
+        
+        Returns:
+            dict: (код номенклатуры, код склада) -> [число транзакций, количество]
+        """
+        totals = self.__live_totals(start_date, end_date)
+
+        # Транзакции закрытого периода, перенесенные в сегменты
+        segments = TransactionSegments.find(self.data)
+        if segments is not None:
+            for key, (count, quantity) in segments.pair_totals(start_date, end_date).items():
+                current = totals.setdefault(key, [0, 0])
+                current[0] += count
+                current[1] += quantity
+
+        return totals
+
+
+    def __live_totals(self, start_date, end_date) -> dict:
+        """Суммы по транзакциям репозитория за период [start_date, end_date)"""
+        storage = SqliteStorage.find(self.data)
+        if storage is not None:
+            # Суммы считаются в базе запросом GROUP BY
+            return storage.pair_totals(start_date, end_date)
+
+        if TransactionColumns.available():
+            # Векторный расчет сумм по колоночному хранилищу
+            columns = TransactionColumns.get(self.data)
+            return columns.pair_totals(columns.mask(start_date=start_date, end_date=end_date, include_end=False))
+
+        if start_date is None:
+            transactions: List[TransactionModel] = self.index.all_before(end_date)
+        else:
+            transactions: List[TransactionModel] = self.index.all_in_period(start_date, end_date)
+
+        return self.__sum_transactions(transactions)
+
+
+    def __sum_transactions(self, transactions) -> dict:
+        """Суммы по парам (номенклатура, склад) для списка транзакций"""
+        totals = {}
+        for transaction in transactions:
             quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+            key = (transaction.nomenclature.id, transaction.storage.id)
 
-            if transaction.nomenclature.id in balances:
-                balances[transaction.nomenclature.id]["balance"] += quantity
+            if key in totals:
+                totals[key][0] += 1
+                totals[key][1] += quantity
             else:
-                balances[transaction.nomenclature.id] = {
-                    "nomenclature": self.__factory.convert(transaction.nomenclature),
-                    "unit": self.__factory.convert(transaction.nomenclature.unit_measurement.root_base_unit()),
-                    "balance": quantity,
-                }
+                totals[key] = [1, quantity]
 
-        self.data[Repository.balances_key] = list(balances.values())
-        
-        return list(balances.values())
+        return totals
+
+
+    def __apply_totals(self, totals: dict, sign: int):
+        """Прибавляет (sign = 1) или вычитает (sign = -1) суммы из снимка остатков"""
+        for key, (count, quantity) in totals.items():
+            current = self.__snapshot.get(key)
+
+            if current is None:
+                self.__snapshot[key] = [count, quantity * sign]
+                continue
+
+            current[0] += count * sign
+            current[1] += quantity * sign
+
+            # Пара без транзакций в закрытом периоде не попадает в снимок
+            if current[0] == 0:
+                del self.__snapshot[key]
     
     def calculation_balances_by_date(self, date):
         """Расчет балансов на произвольную дату
@@ -71,45 +174,278 @@ class BalancesManager:
         """
 
 
-        if self.data[Repository.balances_key] is None:
+        if self.__balances is None:
             self.calculation_balances_up_blocking_date()
 
         if self.block_period >= date:
-            return list(self.data[Repository.balances_key].values())
-
-
-        transactions: List[TransactionModel] = list(self.data[Repository.transaction_key].values())
-        balance_prototype = Prototype(transactions)
-
-        after_block_period = FilterSortingDto([
-            {
-                "field_name": "date",
-                "value": self.block_period,
-                "type": "greater_or_equal"
-            },
-            {
-                "field_name": "date",
-                "value": date,
-                "type": "less_or_equal"
+            return list(self.__balances.values())
+
+        # К строкам на дату блокировки добавляется только оборот после нее:
+        # целые месяцы - из контрольных точек, неполные - из индекса транзакций
+        totals = {}
+        end_date = date + timedelta(days=1)
+        delta = self.checkpoints.turnover(self.block_period, end_date)
+        segments = TransactionSegments.find(self.data)
+        if segments is not None:
+            for key, (count, quantity) in segments.pair_totals(self.block_period, end_date).items():
+                delta[key] = delta.get(key, 0) + quantity
+
+        for (nomenclature_id, storage_id), quantity in delta.items():
+            if nomenclature_id not in totals:
+                base = self.__balances.get(nomenclature_id)
+                totals[nomenclature_id] = 0 if base is None else base["balance"]
+            totals[nomenclature_id] += quantity
+
+        # Строки на дату блокировки не копируются: поверх них кладется слой только измененных строк
+        overlay = {}
+        missing = []
+        for nomenclature_id, quantity in totals.items():
+            base = self.__balances.get(nomenclature_id)
+
+            if base is None:
+                missing.append(((nomenclature_id, None), quantity))
+            elif base["balance"] != quantity:
+                overlay[nomenclature_id] = FrozenDict(base, balance=quantity)
+
+        if len(missing) > 0:
+            overlay.update(self.__aggregate(missing))
+
+        return list(ChainMap(overlay, self.__balances).values())
+
+
+    def calculation_balances_by_storage(self, storage_id: str, date):
+        """Расчет балансов склада на дату включительно
+        Результаты кэшируются по паре (склад, дата) и сбрасываются при изменении транзакций
+        
+        Args:
+            storage_id: Код склада
+            date: Дата, на которую нужно рассчитать балансы
+            
+        Returns:
+            List: Список балансов для каждой номенклатуры склада на указанную дату
+        """
+        Validator.validate(storage_id, str)
+        key = (storage_id, date)
+
+        cached = self.__storage_cache.get(key)
+        if cached is not None:
+            self.__storage_cache.move_to_end(key)
+            return list(cached)
+
+        # Строки кэша отдаются всем запросам - только для чтения
+        balances = self.__aggregate(self.__pair_balances(date, storage_id).items())
+        result = [FrozenDict(balance, storage=storage_id) for balance in balances.values()]
+        self.__storage_cache[key] = result
+        if len(self.__storage_cache) > self.__storage_cache_size:
+            self.__storage_cache.popitem(last=False)
+
+        return list(result)
+
+
+    def create_balance(self, nomenclature, quantity) -> dict:
+        """Строка остатка по номенклатуре в корневой единице измерения (только для чтения)"""
+        return FrozenDict(
+            nomenclature=FrozenDict(self.__factory.convert(nomenclature)),
+            unit=FrozenDict(self.__factory.convert(nomenclature.unit_measurement.root_base_unit())),
+            balance=quantity
+        )
+
+
+    def save_snapshot(self) -> bool:
+        """Сохраняет снимок остатков на дату блокировки в файл
+        
+        Returns:
+            bool: True, если снимок сохранен
+        """
+        self.__content = None
+        content = self.snapshot_content()
+        if self.snapshot_file is None or content is None:
+            return False
+
+        try:
+            with open(self.snapshot_file, 'w', encoding='utf-8') as file:
+                json.dump(content, file, ensure_ascii=False)
+
+            return True
+        except Exception:
+            return False
+
+
+    def snapshot_content(self):
+        """Содержимое снимка остатков на дату блокировки для сохранения вместе с данными
+        Содержимое не меняется после построения: снимок строит новое при изменении
+        
+        Returns:
+            dict: снимок или None, если он не рассчитан или еще не учел последнее событие
+        """
+        if self.__snapshot is None or self.__version != ObserveService.version:
+            return None
+
+        if self.__content is None:
+            self.__content = {
+                "block_period": self.block_period.strftime("%Y-%m-%d"),
+                "transactions_count": self.__snapshot_count,
+                "balances": [
+                    {"nomenclature": nomenclature_id, "storage": storage_id, "count": count, "balance": quantity}
+                    for (nomenclature_id, storage_id), (count, quantity) in self.__snapshot.items()
+                ]
             }
-        ], [])
 
-        transactions_after_block_period = balance_prototype.filter(balance_prototype, after_block_period)
+        return self.__content
 
-        balances_by_date = copy.deepcopy(self.data[Repository.balances_key])
-        for transaction in transactions_after_block_period.data:
-            quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
 
-            if transaction.nomenclature.id in balances_by_date:
-                balances_by_date[transaction.nomenclature.id]["balance"] += quantity
-            else:
-                balances_by_date[transaction.nomenclature.id] = {
-                    "nomenclature": self.__factory.convert(transaction.nomenclature),
-                    "unit": self.__factory.convert(transaction.nomenclature.unit_measurement.root_base_unit()),
-                    "balance": quantity,
-                }
+    def load_snapshot(self, content: dict = None) -> bool:
+        """Загружает снимок остатков на дату блокировки вместо пересчета
+        
+        Args:
+            content: Снимок, сохраненный вместе с данными (None - прочитать файл снимка)
+            
+        Returns:
+            bool: True, если снимок загружен и соответствует текущим данным
+        """
+        if content is None:
+            content = self.__read_snapshot()
+        if not isinstance(content, dict):
+            return False
+
+        # Снимок должен быть сделан на ту же дату и по тому же набору закрытых транзакций
+        if content.get("block_period") != self.block_period.strftime("%Y-%m-%d"):
+            return False
+
+        closed_count = self.__closed_count()
+        if content.get("transactions_count") != closed_count:
+            return False
+
+        try:
+            snapshot = {
+                (balance["nomenclature"], balance["storage"]): [balance["count"], balance["balance"]]
+                for balance in content.get("balances", [])
+            }
+        except (KeyError, TypeError):
+            # Снимок прежнего формата (без числа транзакций по парам) - остатки пересчитываются
+            return False
+
+        self.__snapshot = snapshot
+        self.__snapshot_count = closed_count
+        self.__content = None
+        self.__build_balances()
+
+        return True
+
+
+    def __read_snapshot(self):
+        """Снимок из файла снимка (None, если файла нет или он поврежден)"""
+        if self.snapshot_file is None or not os.path.exists(self.snapshot_file):
+            return None
+
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except Exception:
+            return None
+
+
+    def __pair_balances(self, date, storage_id: str = None) -> dict:
+        """Остатки по парам (номенклатура, склад) на дату включительно с учетом сегментов закрытого периода"""
+        balances = self.checkpoints.balances(date, storage_id)
+
+        segments = TransactionSegments.find(self.data)
+        if segments is None:
+            return balances
+
+        for key, quantity in segments.balances(date, storage_id).items():
+            balances[key] = balances.get(key, 0) + quantity
+
+        return balances
+
+
+    def __shift_snapshot(self, changes: list) -> bool:
+        """Сдвигает снимок на изменения вкладов транзакций закрытого периода
+        Файл снимка не переписывается: снимок сохраняется вместе с данными
+        
+        Args:
+            changes: Пары (прежний вклад, новый вклад), вклад - ((номенклатура, склад), дата, количество)
+            
+        Returns:
+            bool: False, если снимок расходится с транзакциями и нужен полный пересчет
+        """
+        added, removed = {}, {}
+        for previous, current in changes:
+            for contribution, totals in ((current, added), (previous, removed)):
+                if contribution is None or contribution[1] >= self.block_period:
+                    continue
+
+                total = totals.setdefault(contribution[0], [0, 0])
+                total[0] += 1
+                total[1] += contribution[2]
+
+        closed_count = self.__closed_count()
+        shift = sum(count for count, _ in added.values()) - sum(count for count, _ in removed.values())
+        if self.__snapshot_count + shift != closed_count:
+            return False
+
+        if len(added) == 0 and len(removed) == 0:
+            return True
+
+        self.__apply_totals(added, 1)
+        self.__apply_totals(removed, -1)
+        self.__snapshot_count = closed_count
+        self.__content = None
+
+        # Прежний файл снимка больше не соответствует транзакциям
+        if self.snapshot_file is not None and os.path.exists(self.snapshot_file):
+            os.remove(self.snapshot_file)
+
+        self.__build_balances()
+        return True
+
 
-        return list(balances_by_date.values()) 
+    def __closed_count(self) -> int:
+        """Количество транзакций закрытого периода в репозитории и сегментах"""
+        segments = TransactionSegments.find(self.data)
+        count = self.index.count_before(self.block_period)
+        return count if segments is None else count + segments.count_before(self.block_period)
+
+
+    def __build_balances(self) -> list:
+        """Собирает строки остатков по номенклатурам из снимка"""
+        balances = self.__aggregate(
+            (key, quantity) for key, (count, quantity) in self.__snapshot.items()
+        )
+
+        self.__balances = MappingProxyType(balances)
+        self.data[Repository.balances_key] = list(balances.values())
+
+        return list(balances.values())
+
+
+    def __aggregate(self, totals) -> dict:
+        """Сворачивает остатки по парам (номенклатура, склад) в строки по номенклатурам
+        
+        Args:
+            totals: Пары ((код номенклатуры, код склада), количество)
+            
+        Returns:
+            dict: код номенклатуры -> строка остатка
+        """
+        quantities = {}
+        for (nomenclature_id, storage_id), quantity in totals:
+            quantities[nomenclature_id] = quantities.get(nomenclature_id, 0) + quantity
+
+        # Справочник номенклатуры хранится по коду - поиск без построения индекса
+        nomenclatures = self.data.get(Repository.nomenclature_key, {})
+        balances = {}
+        for nomenclature_id, quantity in quantities.items():
+            nomenclature = nomenclatures.get(nomenclature_id)
+            if nomenclature is None:
+                # Номенклатуры нет в справочнике - берем ее из транзакций
+                nomenclature = self.checkpoints.nomenclature(nomenclature_id)
+                if nomenclature is None:
+                    continue
+
+            balances[nomenclature_id] = self.create_balance(nomenclature, quantity)
+
+        return balances
 
 
     @property
@@ -121,6 +457,16 @@ class BalancesManager:
         Validator.validate(value, dict)
         self.__data = value
 
+    # Индекс транзакций репозитория
+    @property
+    def index(self) -> TransactionIndex:
+        return TransactionIndex.get(self.data)
+
+    # Контрольные точки остатков репозитория
+    @property
+    def checkpoints(self) -> BalanceCheckpoints:
+        return BalanceCheckpoints.get(self.data)
+
     @property
     def block_period(self) -> date:
         return self.__block_period
@@ -130,10 +476,55 @@ class BalancesManager:
         Validator.validate(value, date)
         self.__block_period = value
 
+    # Файл снимка остатков на дату блокировки (None - не сохранять)
+    @property
+    def snapshot_file(self) -> str:
+        return self.__snapshot_file
+
+    @snapshot_file.setter
+    def snapshot_file(self, value: str):
+        Validator.validate(value, (str, type(None)))
+        self.__snapshot_file = value
+
 
     def handle(self, event: str, params):
         """
         Обработчик событий
         """
+        self.__version = ObserveService.version
+
+        # Перенос транзакций в сегменты не меняет остатков: суммы считаются вместе с сегментами
+        if event == EventType.seal_transactions_key():
+            return
+
+        # Пакет пересчитывается один раз, а не на каждый элемент
+        reference_type, items = EventType.changed_items(event, params)
+
+        # Транзакция изменяется на месте, прежние склад и дата неизвестны - кэш складов сбрасывается целиком
+        if event == EventType.change_nomenclature_unit_key() or reference_type in (
+            Repository.transaction_key, Repository.unit_measure_key, Repository.nomenclature_key
+        ):
+            self.__storage_cache.clear()
+
+        # Снимок еще не рассчитан - пересчитывать нечего
+        if self.__snapshot is None:
+            return
+
+        # Смена единицы у номенклатуры меняет только представление строк, но не снимок
         if event == EventType.change_nomenclature_unit_key():
-            self.calculation_balances_up_blocking_date()
\ No newline at end of file
+            self.__build_balances()
+            return
+
+        if reference_type == Repository.unit_measure_key:
+            # Изменение коэффициентов меняет пересчет в корневые единицы
+            self.calculation_balances_up_blocking_date()
+
+        elif reference_type == Repository.transaction_key:
+            # Прежние вклады транзакций берутся из контрольных точек: снимок сдвигается
+            # на разницу вкладов закрытого периода, пересчет - только если они неизвестны
+            changes = self.checkpoints.changes(event, params)
+            if changes is None or not self.__shift_snapshot(changes):
+                self.calculation_balances_up_blocking_date()
+
+        elif reference_type == Repository.nomenclature_key:
+            self.__build_balances()
@@ -1,15 +1,19 @@
 from src.core.validator import Validator
 from src.core.abstract_convertor import AbstractConvertor
 from src.core.common import common
-from datetime import datetime
+from datetime import datetime, date
 
 
 class DatetimeConvertor(AbstractConvertor):
     """
     Конвертор для datetime объектов.
-    Преобразует datetime в строки стандартного формата.
+    Преобразует datetime в строки стандартного формата,
+    даты без времени - в строки вида ГГГГ-ММ-ДД.
     """
 
     def convert(self, obj):
-        Validator.validate(obj, datetime)
+        Validator.validate(obj, (datetime, date))
+        if not isinstance(obj, datetime):
+            return obj.strftime("%Y-%m-%d")
+
         return obj.strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
@@ -1,11 +1,5 @@
-from datetime import datetime
-from src.core.abstract_model import AbstractModel
 from src.core.common import common
-from src.logics.reference_convertor import ReferenceConvertor
-from src.logics.basic_convertor import BasicConvertor
-from src.logics.datetime_convertor import DatetimeConvertor
-from src.core.observe_service import ObserveService
-from src.core.event_type import EventType
+from src.logics.serializer_generator import SerializerGenerator
 
 class FactoryConvert:
     """
@@ -13,36 +7,21 @@ class FactoryConvert:
     Объединяет результаты работы всех специализированных конверторов.
     """
 
-    # Словарь соответствия типов конверторов их классам
-    __match = {
-        "basic": BasicConvertor,      # Для базовых типов
-        "datetime": DatetimeConvertor, # Для datetime полей
-        "reference": ReferenceConvertor # Для ссылочных полей
-    }
-
 
     def convert(self, obj) -> dict:
+        # Сериализатор класса генерируется при первой конвертации его объекта
+        return SerializerGenerator.convert(obj)
 
-        fields = common.get_fields(obj)
-        result = {}
-
-        for field in fields:
-            value = getattr(obj, field)
-
-            if isinstance(value, (int, float, str, bool)):
-                result[field] = self.__match["basic"]().convert(value)
 
-            elif isinstance(value, AbstractModel):
-                result[field] = self.__match["reference"]().convert(value)
-
-            elif isinstance(value, datetime):
-                result[field] = self.__match["datetime"]().convert(value)
+    """
+    Конвертация общим путем: обход схемы полей с выбором конвертора по виду каждого значения
+    Результат совпадает с convert
+    """
+    def convert_generic(self, obj) -> dict:
 
-            elif isinstance(value, list):
-                result[field] = []
-                for v in value:
-                    result[field].append(self.convert(v))
+        result = {}
 
-        # Формируем событие о конвертации json
+        for field, getter in common.get_schema(obj.__class__):
+            SerializerGenerator.convert_value(result, field, getter(obj))
 
-        return result
\ No newline at end of file
+        return result
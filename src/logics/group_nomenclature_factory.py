@@ -2,6 +2,7 @@ from src.core.reference_item_factory import ReferenceItemFactory
 from src.core.validator import Validator
 from src.models.group_nomenclature_model import GroupNomenclatureModel
 from src.repository import Repository
+from src.reference_graph import ReferenceGraph
 
 class GroupNomenclatureFactory(ReferenceItemFactory):
     """Фабрика для создания групп номенклатур"""
@@ -31,11 +32,11 @@ class GroupNomenclatureFactory(ReferenceItemFactory):
         """Проверяет использование группы номенклатур в других объектах"""
         errors = []
         
+        graph = ReferenceGraph.get(reference_service.data)
+
         # Проверка в номенклатурах
-        nomenclatures = reference_service._get_reference_data(Repository.nomenclature_key).values()
-        for nomenclature in nomenclatures:
-            if nomenclature.group_nomenclature.id == group_id:
-                errors.append(f"Невозможно удалить группу номенклатур. Она используется в номенклатуре '{nomenclature.name}'")
-                break
+        nomenclature = graph.first_referrer(group_id, Repository.nomenclature_key)
+        if nomenclature is not None:
+            errors.append(f"Невозможно удалить группу номенклатур. Она используется в номенклатуре '{nomenclature.name}'")
         
         return errors
\ No newline at end of file
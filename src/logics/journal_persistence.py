@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+from src.core.abstract_persistence import AbstractPersistence
+from src.core.validator import Validator, ArgumentException
+from src.core.logger import Logger
+from src.logics.factory_convert import FactoryConvert
+from src.repository_loader import RepositoryLoader
+
+
+class JournalPersistence(AbstractPersistence):
+    """
+    Журнал изменений: каждое изменение дописывается в журнал одной компактной записью,
+    а файл данных (снимок) перезаписывается только при сжатии журнала
+    после compact_records записей
+    """
+    __convert = FactoryConvert()
+
+    # Политики сброса журнала на диск: после каждого изменения или на усмотрение ОС
+    fsync_policies = ["always", "never"]
+
+    def __init__(self, manager, journal_filename: str, fsync: str = "always", compact_records: int = 10000):
+        super().__init__(manager)
+
+        Validator.validate(journal_filename, str, field_name="journal_filename")
+
+        if fsync not in JournalPersistence.fsync_policies:
+            raise ArgumentException(f"Недопустимая политика fsync. Допустимые значения: {JournalPersistence.fsync_policies}")
+
+        Validator.validate(compact_records, int, field_name="compact_records")
+        if compact_records <= 0:
+            raise ArgumentException("Количество записей журнала до сжатия должно быть положительным")
+
+        self.__journal_filename = journal_filename
+        self.__fsync = fsync
+        self.__compact_records = compact_records
+        self.__journal = None
+        self.__journal_records = 0
+        # Номер последней записи журнала
+        self.__sequence = 0
+        # Снимок сохраняется под блокировкой: номер последней
+        # записи журнала в снимке должен соответствовать его содержимому
+        self.__lock = threading.RLock()
+
+    @property
+    def sequence(self) -> int:
+        return self.__sequence
+
+    @property
+    def journal_records(self) -> int:
+        with self.__lock:
+            return self.__journal_records
+
+    def changed(self, reference_type: str, items: list):
+        if len(items) == 0:
+            return
+
+        with self.__lock:
+            self.__append([self.__record(reference_type, item) for item in items])
+
+    def load(self, sequence: int) -> bool:
+        self.__sequence = sequence
+        if not os.path.exists(self.__journal_filename):
+            return False
+
+        loaded = False
+        torn = False
+        with open(self.__journal_filename, 'r', encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Запись оборвалась при сбое - она и все после нее не применяются
+                    torn = True
+                    break
+
+                self.__journal_records += 1
+                # Снимок сохранен позже записи (сбой между сохранением снимка и очисткой журнала)
+                if record.get("seq", 0) <= self.__sequence:
+                    continue
+
+                RepositoryLoader.apply(self.manager.data, record)
+                self.__sequence = record["seq"]
+                loaded = True
+
+        Logger.info("DataManager", f"Из журнала применено записей: {self.__journal_records}")
+
+        # Оборванная запись удаляется из журнала вместе со сжатием
+        if torn:
+            Logger.warning("DataManager", f"Журнал {self.__journal_filename} оборван, выполняется сжатие")
+            self.compact()
+
+        return loaded
+
+    def flush(self) -> bool:
+        with self.__lock:
+            return self.manager._save()
+
+    def compact(self) -> bool:
+        with self.__lock:
+            if not self.manager._save():
+                return False
+
+            self.__close_journal()
+            # Снимок уже содержит все изменения журнала
+            open(self.__journal_filename, 'w', encoding='utf-8').close()
+            self.__journal_records = 0
+            return True
+
+    def shutdown(self) -> bool:
+        with self.__lock:
+            result = self.__journal_records == 0 or self.compact()
+            self.__close_journal()
+            return result
+
+    def __append(self, records: list):
+        if self.__journal is None:
+            self.__journal = open(self.__journal_filename, 'a', encoding='utf-8')
+
+        self.__journal.write("".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records
+        ))
+        self.__journal.flush()
+        if self.__fsync == "always":
+            os.fsync(self.__journal.fileno())
+
+        self.__journal_records += len(records)
+        if self.__journal_records >= self.__compact_records:
+            self.compact()
+
+    def __record(self, reference_type: str, item) -> dict:
+        self.__sequence += 1
+
+        # Элемента нет в справочнике - событие об удалении
+        if item.id not in self.manager.data.get(reference_type, {}):
+            return {"seq": self.__sequence, "op": "delete", "type": reference_type, "id": item.id}
+
+        return {"seq": self.__sequence, "op": "put", "type": reference_type, "item": self.__convert.convert(item)}
+
+    def __close_journal(self):
+        if self.__journal is not None:
+            self.__journal.close()
+            self.__journal = None
@@ -2,6 +2,7 @@ from src.core.reference_item_factory import ReferenceItemFactory
 from src.core.validator import Validator
 from src.models.nomenclature_model import NomenclatureModel
 from src.repository import Repository
+from src.reference_graph import ReferenceGraph
 
 
 class NomenclatureFactory(ReferenceItemFactory):
@@ -65,22 +66,17 @@ class NomenclatureFactory(ReferenceItemFactory):
         """Проверяет использование номенклатуры в других объектах"""
         errors = []
         
+        graph = ReferenceGraph.get(reference_service.data)
+
         # Проверка в рецептах
-        recipes = reference_service._get_reference_data(Repository.recipe_key).values()
-        for recipe in recipes:
-            for ingredient in recipe.ingredients:
-                if ingredient.nomenclature.id == nomenclature_id:
-                    errors.append(f"Невозможно удалить номенклатуру. Она используется в рецепте '{recipe.name}'")
-                    break
-            if errors:
-                break
+        recipe = graph.first_referrer(nomenclature_id, Repository.recipe_key)
+        if recipe is not None:
+            errors.append(f"Невозможно удалить номенклатуру. Она используется в рецепте '{recipe.name}'")
         
         # Проверка в транзакциях
         if not errors:  # Проверяем дальше только если нет ошибок
-            transactions = reference_service._get_reference_data(Repository.transaction_key).values()
-            for transaction in transactions:
-                if transaction.nomenclature.id == nomenclature_id:
-                    errors.append(f"Невозможно удалить номенклатуру. Она используется в транзакции от {transaction.date}")
-                    break
+            transaction = graph.first_referrer(nomenclature_id, Repository.transaction_key)
+            if transaction is not None:
+                errors.append(f"Невозможно удалить номенклатуру. Она используется в транзакции от {transaction.date}")
         
         return errors
\ No newline at end of file
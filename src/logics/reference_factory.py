@@ -4,6 +4,7 @@ from src.logics.group_nomenclature_factory import GroupNomenclatureFactory
 from src.logics.nomenclature_factory import NomenclatureFactory
 from src.logics.storage_factory import StorageFactory
 from src.logics.unit_measurement_factory import UnitMeasurementFactory
+from src.logics.transaction_factory import TransactionFactory
 from src.core.reference_item_factory import ReferenceItemFactory
 from src.core.validator import ArgumentException, OperationException
 from src.repository import Repository
@@ -16,7 +17,8 @@ class ReferenceFactory:
         Repository.nomenclature_key: NomenclatureFactory,
         Repository.unit_measure_key: UnitMeasurementFactory,
         Repository.group_nomenclature_key: GroupNomenclatureFactory,
-        Repository.storage_key: StorageFactory
+        Repository.storage_key: StorageFactory,
+        Repository.transaction_key: TransactionFactory
     }
     
     def __init__(self, reference_service):
@@ -55,7 +57,11 @@ class ReferenceFactory:
     def handle(self, event: str, params):
         """Проверяет наличие зависимостей перед удалением"""
         if event == EventType.delete_reference_type_key():
-            errors = self.check_dependencies(params.reference_type, params.item_id, params.reference_service)
+            # У справочников без фабрики (например, рецептов) зависимости не проверяются
+            if params["reference_type"] not in self.__factories:
+                return
+
+            errors = self.check_dependencies(params["reference_type"], params["item_id"], params["reference_service"])
             if errors:
                 # Бросаем первую ошибку из списка
                 raise OperationException(errors[0])
\ No newline at end of file
@@ -3,6 +3,7 @@ from src.core.event_type import EventType
 from src.core.observe_service import ObserveService
 from src.core.validator import Validator, ArgumentException
 from src.core.logger import Logger
+from src.core.reference_dict import ReferenceDict
 from src.repository import Repository
 
 class ReferenceService:
@@ -12,6 +13,12 @@ class ReferenceService:
         Validator.validate(repository_data, dict)
         self.__data = repository_data
         self.__factory = ReferenceFactory(self)
+        # Проверяемый пакет: (тип справочника, элементы пакета) или None
+        self.__staged = None
+
+        # Справочники хранятся по коду элемента со вторичным индексом имен
+        for reference_type in Repository.get_key_fields(Repository):
+            self._get_reference_data(reference_type)
         
         # Логируем создание сервиса
         Logger.debug("ReferenceService", "Сервис справочников создан")
@@ -28,7 +35,13 @@ class ReferenceService:
             raise ArgumentException(error_msg)
         
         Logger.debug("ReferenceService", f"Получены данные справочника: {reference_type}")
-        return self.data.get(reference_type, {})
+        data_dict = self.data.get(reference_type, {})
+
+        if isinstance(data_dict, dict) and not isinstance(data_dict, ReferenceDict):
+            data_dict = ReferenceDict.normalize(data_dict)
+            self.data[reference_type] = data_dict
+
+        return data_dict
     
     def _set_reference_data(self, reference_type: str, data: dict):
         """Установить данные справочника"""
@@ -63,20 +76,84 @@ class ReferenceService:
         data_dict = self._get_reference_data(reference_type)
         
         # Проверяем уникальность ID
-        for key, existing_item in data_dict.items():
-            if existing_item.id == item.id:
-                error_msg = f"Элемент с ID {item.id} уже существует"
-                Logger.error("ReferenceService", error_msg)
-                raise ArgumentException(error_msg)
+        if item.id in data_dict:
+            error_msg = f"Элемент с ID {item.id} уже существует"
+            Logger.error("ReferenceService", error_msg)
+            raise ArgumentException(error_msg)
 
         data_dict[item.id] = item
         self._set_reference_data(reference_type, data_dict)
         
-        ObserveService.create_event(EventType.change_reference_type_key(), None)
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": reference_type,
+            "item": item
+        })
         
         Logger.info("ReferenceService", f"Элемент успешно добавлен: {item.id}")
         return item.id
     
+    def add_bulk(self, reference_type: str, items_data: list) -> list:
+        """Пакетно добавить элементы в справочник из данных JSON
+        Пакет проверяется целиком до вставки: при ошибке в любом элементе ничего не добавляется.
+        На весь пакет создается одно событие bulk_change_reference_type"""
+        Validator.validate(items_data, list)
+        
+        Logger.info("ReferenceService", f"Пакетное добавление в справочник {reference_type}",
+                   {"count": len(items_data)})
+        
+        data_dict = self._get_reference_data(reference_type)
+        staged = ReferenceDict()
+
+        # Элементы пакета могут ссылаться друг на друга (например, единицы измерения)
+        self.__staged = (reference_type, staged)
+        try:
+            for position, item_data in enumerate(items_data):
+                try:
+                    Validator.validate(item_data, dict)
+                    item = self.create_item_from_data(reference_type, item_data)
+                except ArgumentException as e:
+                    error_msg = f"Ошибка в элементе {position}: {str(e)}"
+                    Logger.error("ReferenceService", error_msg)
+                    raise ArgumentException(error_msg)
+
+                if item.id in data_dict or item.id in staged:
+                    error_msg = f"Ошибка в элементе {position}: элемент с ID {item.id} уже существует"
+                    Logger.error("ReferenceService", error_msg)
+                    raise ArgumentException(error_msg)
+
+                staged[item.id] = item
+        finally:
+            self.__staged = None
+
+        return self.add_items(reference_type, list(staged.values()))
+    
+    def add_items(self, reference_type: str, items: list) -> list:
+        """Добавить в справочник пакет готовых элементов
+        На весь пакет создается одно событие bulk_change_reference_type"""
+        Validator.validate(items, list)
+        
+        data_dict = self._get_reference_data(reference_type)
+        
+        # Проверяем уникальность ID до вставки
+        ids = set()
+        for item in items:
+            if item.id in data_dict or item.id in ids:
+                error_msg = f"Элемент с ID {item.id} уже существует"
+                Logger.error("ReferenceService", error_msg)
+                raise ArgumentException(error_msg)
+            ids.add(item.id)
+
+        data_dict.update({item.id: item for item in items})
+        self._set_reference_data(reference_type, data_dict)
+
+        ObserveService.create_event(EventType.bulk_change_reference_type_key(), {
+            "reference_type": reference_type,
+            "items": items
+        })
+        
+        Logger.info("ReferenceService", f"Пакетно добавлено элементов: {len(items)}")
+        return [item.id for item in items]
+    
     def update(self, reference_type: str, id: str, update_data: dict) -> bool:
         """Обновить элемент справочника с обновлением зависимостей"""
         Validator.validate(id, str)
@@ -88,20 +165,27 @@ class ReferenceService:
         data_dict = self._get_reference_data(reference_type)
         
         # Ищем существующий элемент
-        existing_item = None
-        for item in data_dict.values():
-            if item.id == id:
-                existing_item = item
-                break
+        existing_item = data_dict.get(id)
 
         if not existing_item:
             Logger.warning("ReferenceService", f"Элемент {id} не найден для обновления")
             return False
 
         # Используем фабрику для обновления элемента
-        self.__factory.update_item(reference_type, existing_item, update_data)
-        
-        ObserveService.create_event(EventType.change_reference_type_key(), None)
+        try:
+            self.__factory.update_item(reference_type, existing_item, update_data)
+        except Exception:
+            # Фабрика могла изменить часть полей до ошибки - хранилища сверяются с элементом
+            ObserveService.create_event(EventType.change_reference_type_key(), {
+                "reference_type": reference_type,
+                "item": existing_item
+            })
+            raise
+        
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": reference_type,
+            "item": existing_item
+        })
         
         Logger.info("ReferenceService", f"Элемент {id} успешно обновлен")
         return True
@@ -112,30 +196,29 @@ class ReferenceService:
         
         Logger.info("ReferenceService", f"Удаление элемента {id} из справочника {reference_type}")
         
+        data_dict = self._get_reference_data(reference_type)
+
+        # Элемент может быть указан по имени, а зависимости ищутся по коду
+        item_id = data_dict.resolve(id) or id
+
         # Проверяем наличие зависимостей перед удалением
         ObserveService.create_event(EventType.delete_reference_type_key(), {
             "reference_type": reference_type, 
-            "item_id": id, 
+            "item_id": item_id, 
             "reference_service": self
         })
         
-        data_dict = self._get_reference_data(reference_type)
-        
-        # Ищем элемент для удаления
-        item_to_delete = None
-        for key, item in data_dict.items():
-            if item.id == id:
-                item_to_delete = key
-                break
-
-        if not item_to_delete:
+        if item_id not in data_dict:
             Logger.warning("ReferenceService", f"Элемент {id} не найден для удаления")
             return False
         
-        del data_dict[item_to_delete]
+        deleted_item = data_dict.pop(item_id)
         self._set_reference_data(reference_type, data_dict)
 
-        ObserveService.create_event(EventType.change_reference_type_key(), None)
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": reference_type,
+            "item": deleted_item
+        })
         
         Logger.info("ReferenceService", f"Элемент {id} успешно удален")
         return True
@@ -153,6 +236,10 @@ class ReferenceService:
             
         Logger.debug("ReferenceService", f"Поиск зависимости {dependency_id} в {reference_type}")
         dependency = self.get_by_id(reference_type, dependency_id)
+
+        # Зависимость может быть в еще не вставленном пакете
+        if not dependency and self.__staged is not None and self.__staged[0] == reference_type:
+            dependency = self.__staged[1].get(dependency_id)
         if not dependency:
             error_msg = f"Зависимость {reference_type} с ID {dependency_id} не найдена"
             Logger.error("ReferenceService", error_msg)
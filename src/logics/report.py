@@ -1,9 +1,16 @@
+import math
 from src.dtos.filter_sorting_dto import FilterSortingDto
 from src.core.prototype import Prototype
+from src.core.filter_compiler import FilterCompiler
 from src.logics.factory_convert import FactoryConvert
 from src.models.nomenclature_model import NomenclatureModel
 from src.models.transaction_model import TransactionModel
 from src.repository import Repository
+from src.transaction_index import TransactionIndex
+from src.transaction_columns import TransactionColumns
+from src.sqlite_storage import SqliteStorage
+from src.transaction_segments import TransactionSegments
+from src.core.observe_service import ObserveService
 from src.core.validator import Validator
 from src.core.logger import Logger  # Добавляем импорт
 from typing import List
@@ -13,8 +20,16 @@ class Report:
     __data: dict
     __factory: FactoryConvert = FactoryConvert()
 
+    # Модели, к которым применяются фильтры отчета: filter_model -> класс модели
+    __filter_models = {
+        "nomenclature": NomenclatureModel,
+        "transaction": TransactionModel
+    }
+
     def __init__(self, data):
         self.data = data
+        # Последние обороты сегментов закрытого периода: (ключ, обороты склада)
+        self.__sealed = None
         Logger.debug("Report", "Инициализация генератора отчетов")
     
     @property
@@ -26,6 +41,11 @@ class Report:
         Validator.validate(value, dict)
         self.__data = value
 
+    # Индекс транзакций репозитория
+    @property
+    def index(self) -> TransactionIndex:
+        return TransactionIndex.get(self.data)
+
     """
     Генерирует отчет
     """
@@ -37,6 +57,7 @@ class Report:
             "has_filters": filtersDto is not None,
             "filter_model": filter_model
         })
+        Report.__validate_filters(filtersDto, filter_model)
         
         nomenclatures: List[NomenclatureModel] = list(self.data[Repository.nomenclature_key].values())
 
@@ -46,13 +67,10 @@ class Report:
             nomenclatures = prototype.filter(prototype, filtersDto).data
 
         report = []
+        balances = self.calculateBalances(storage, start_date, end_date, filtersDto, filter_model)
 
         for nomenclature in nomenclatures:
-            balance = self.calculateBalance(nomenclature, storage, start_date, end_date, filtersDto, filter_model)
-
-            start_balance = balance[0]
-            income = balance[1]
-            outcome = balance[2]
+            start_balance, income, outcome = balances.get(nomenclature.id, [0, 0, 0])
 
             row = {
                 "nomenclature": self.__factory.convert(nomenclature),
@@ -70,73 +88,152 @@ class Report:
 
 
     """
-    Рассчитывает баланс по номенклатуре
+    Рассчитывает балансы сразу по всем номенклатурам склада за один проход по его транзакциям
+    Возвращает словарь: код номенклатуры -> [начальный остаток, приход, расход]
     """
-    def calculateBalance(self, nomenclature, storage, start_date, end_date, filtersDto = None, filter_model = None):
-        Logger.debug("Report", f"Расчет баланса для номенклатуры {getattr(nomenclature, 'name', 'unknown')}")
-        
-        transactions: List[TransactionModel] = list(self.data[Repository.transaction_key].values())
+    def calculateBalances(self, storage, start_date, end_date, filtersDto = None, filter_model = None) -> dict:
+        Logger.debug("Report", f"Расчет балансов по складу {getattr(storage, 'name', 'unknown')}")
+        Report.__validate_filters(filtersDto, filter_model)
+
+        balances = self.__calculate_live_balances(storage, start_date, end_date, filtersDto, filter_model)
+
+        # Транзакции закрытого периода в сегментах
+        for nomenclature_id, values in self.__sealed_turnover(storage, start_date, end_date, filtersDto, filter_model).items():
+            balance = balances.setdefault(nomenclature_id, [0, 0, 0])
+            for position, value in enumerate(values):
+                balance[position] += value
+
+        return balances
+
+
+    """
+    Проверяет поля фильтров по модели один раз до прохода по данным:
+    неверный field_name - ошибка, даже если на складе нет транзакций
+    """
+    @staticmethod
+    def __validate_filters(filtersDto, filter_model):
+        model = Report.__filter_models.get(filter_model)
+        if filtersDto is None or model is None:
+            return
+
+        plan, _ = FilterCompiler.compile(filtersDto)
+        plan.validate_model(model)
+
+
+    """
+    Точная сумма количеств (math.fsum): не зависит от порядка сложения,
+    поэтому построчный и колоночный расчеты дают одинаковые числа
+    Пустая группа остается целым нулем
+    """
+    @staticmethod
+    def __sum(quantities: list):
+        return math.fsum(quantities) if len(quantities) > 0 else 0
+
+
+    """
+    Обороты склада по сегментам закрытого периода
+    Без фильтров обороты склада считаются один раз и переиспользуются
+    для расчета по каждой номенклатуре, пока данные не изменятся
+    """
+    def __sealed_turnover(self, storage, start_date, end_date, filtersDto, filter_model) -> dict:
+        segments = TransactionSegments.find(self.data)
+        if segments is None:
+            return {}
 
         if filtersDto is not None and filter_model == "transaction":
-            Logger.debug("Report", "Применение фильтров к транзакциям")
-            prototype = Prototype(transactions)
-            transactions = prototype.filter(prototype, filtersDto).data
-
-        report_prototype = Prototype(transactions)
-
-        by_nomenclature_and_storage = FilterSortingDto([
-            {
-                "field_name": "nomenclature/id",
-                "value": nomenclature.id,
-                "type": "equals"
-            },
-            {
-                "field_name": "storage/id",
-                "value": storage.id,
-                "type": "equals"
-            }
-        ], [])
+            return segments.turnover(storage.id, start_date, end_date, filtersDto)
 
-        report_prototype = report_prototype.filter(report_prototype, by_nomenclature_and_storage)
+        key = (id(segments), segments.count, ObserveService.version, storage.id, start_date, end_date)
+        if self.__sealed is None or self.__sealed[0] != key:
+            self.__sealed = (key, segments.turnover(storage.id, start_date, end_date))
+
+        return self.__sealed[1]
 
-        up_startdate = FilterSortingDto([
-            {
-                "field_name": "date",
-                "value": start_date,
-                "type": "less"
-            }
-        ], [])
-
-        between_startdate_end_date = FilterSortingDto([
-            {
-                "field_name": "date",
-                "value": start_date,
-                "type": "greater_or_equal"
-            },
-            {
-                "field_name": "date",
-                "value": end_date,
-                "type": "less_or_equal"
-            }
-        ], [])
 
-        transactions_up_startdate = report_prototype.filter(report_prototype, up_startdate)
-        transactions_between_startdate_end_date = report_prototype.filter(report_prototype, between_startdate_end_date)
+    """
+    Балансы склада по транзакциям репозитория
+    """
+    def __calculate_live_balances(self, storage, start_date, end_date, filtersDto, filter_model) -> dict:
+        has_transaction_filters = filtersDto is not None and filter_model == "transaction"
 
-        start_balance = 0
-        income = 0
-        outcome = 0
+        # Без фильтров по транзакциям суммы считаются запросом к SQLite, если репозиторий хранится в базе
+        sqlite_storage = SqliteStorage.find(self.data)
+        if not has_transaction_filters and sqlite_storage is not None:
+            return sqlite_storage.turnover(storage.id, start_date, end_date)
+
+        # Иначе - векторно по колоночному хранилищу
+        if not has_transaction_filters and TransactionColumns.available():
+            return TransactionColumns.get(self.data).turnover(storage.id, start_date, end_date)
+
+        transactions = self.index.by_storage(storage.id)
+
+        if has_transaction_filters:
+            Logger.debug("Report", "Применение фильтров к транзакциям")
+            transactions = Prototype.filter_iter(Prototype(transactions), filtersDto)
+
+        # Количества собираются по группам и складываются точно в конце
+        groups = {}
+        for transaction in transactions:
+            date = transaction.date
+            is_start = date < start_date
+            if not is_start and date > end_date:
+                continue
+
+            group = groups.get(transaction.nomenclature.id)
+            if group is None:
+                group = ([], [], [])
+                groups[transaction.nomenclature.id] = group
 
-        for transaction in transactions_up_startdate.data:
             quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
-            start_balance += quantity
+            if is_start:
+                group[0].append(quantity)
+            elif quantity > 0:
+                group[1].append(quantity)
+            elif quantity < 0:
+                group[2].append(quantity * -1)
+
+        balances = {nomenclature_id: [Report.__sum(quantities) for quantities in group]
+                    for nomenclature_id, group in groups.items()}
+
+        Logger.debug("Report", f"Балансы рассчитаны, номенклатур с движением: {len(balances)}")
+        return balances
+
 
-        for transaction in transactions_between_startdate_end_date.data:
+    """
+    Рассчитывает баланс по номенклатуре
+    """
+    def calculateBalance(self, nomenclature, storage, start_date, end_date, filtersDto = None, filter_model = None):
+        Logger.debug("Report", f"Расчет баланса для номенклатуры {getattr(nomenclature, 'name', 'unknown')}")
+        Report.__validate_filters(filtersDto, filter_model)
+        
+        # Выборка по индексу: O(log n + k) вместо полного прохода по транзакциям
+        transactions_up_startdate = self.index.before(nomenclature.id, storage.id, start_date)
+        transactions_between_startdate_end_date = self.index.between(nomenclature.id, storage.id, start_date, end_date)
+
+        if filtersDto is not None and filter_model == "transaction":
+            Logger.debug("Report", "Применение фильтров к транзакциям")
+            transactions_up_startdate = Prototype.filter_iter(Prototype(transactions_up_startdate), filtersDto)
+            transactions_between_startdate_end_date = Prototype.filter_iter(Prototype(transactions_between_startdate_end_date), filtersDto)
+
+        start_balance = Report.__sum([transaction.unit.convert_to_root_base_unit(transaction.quantity)
+                                      for transaction in transactions_up_startdate])
+
+        incomes = []
+        outcomes = []
+        for transaction in transactions_between_startdate_end_date:
             quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
             if quantity > 0:
-                income += quantity
+                incomes.append(quantity)
             if quantity < 0:
-                outcome += quantity * -1
+                outcomes.append(quantity * -1)
+
+        income = Report.__sum(incomes)
+        outcome = Report.__sum(outcomes)
+
+        sealed = self.__sealed_turnover(storage, start_date, end_date, filtersDto, filter_model).get(nomenclature.id, [0, 0, 0])
+        start_balance += sealed[0]
+        income += sealed[1]
+        outcome += sealed[2]
 
         Logger.debug("Report", f"Баланс рассчитан: начальный={start_balance}, приход={income}, расход={outcome}")
         return [start_balance, income, outcome]
\ No newline at end of file
@@ -1,3 +1,5 @@
+import csv
+import io
 from src.core.abstract_response import AbstractResponse
 from src.core.common import common
 
@@ -8,29 +10,26 @@ class ResponseCsv(AbstractResponse):
 
     # Преобразует данные в формат CSV
     def build(self, format: str, data: list):
-        text = super().build(format, data)
+        return "".join(self.stream(format, data))
+
+    # Формирует CSV по частям: строки пишутся csv.writer в буфер, буфер отдается по заполнении
+    def stream(self, format: str, data: list):
+        super().build(format, data)
 
         # Шапка
-        item = data[0]
-        fields = common.get_fields(item)
+        fields = common.get_fields(data[0])
 
-        # Шапка CSV
-        for field in fields:
-            text += f"{field};"
-            
-        text = text.rstrip(';') + "\n"
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
+        writer.writerow(fields)
 
         # Данные
-        for item in data:
-            for field in fields:
-                value = getattr(item, field, "")
-                # Обрабатываем вложенные объекты
-                if hasattr(value, 'name'):
-                    text += f"{value.name};"
-                elif hasattr(value, 'id'):
-                    text += f"{value.id};"
-                else:
-                    text += f"{value};"
-            text = text.rstrip(';') + "\n"
-        
-        return text
\ No newline at end of file
+        for row in self._rows(fields, data):
+            writer.writerow(row)
+
+            if buffer.tell() >= self.chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
@@ -1,3 +1,4 @@
+import json
 from src.logics.factory_convert import FactoryConvert
 from src.core.abstract_response import AbstractResponse
 
@@ -19,5 +20,25 @@ class ResponseJson(AbstractResponse):
             result.append(item_dict)
                 
         return result
-    
 
+    # Формирует текст JSON по частям: элементы сериализуются по одному,
+    # текст совпадает с json.dumps(build(format, data))
+    def stream(self, format: str, data: list):
+        super().build(format, data)
+
+        parts = ["["]
+        size = 1
+        separator = ""
+        for item in data:
+            text = separator + json.dumps(self.factory_convert.convert(item))
+            parts.append(text)
+            size += len(text)
+            separator = ", "
+
+            if size >= self.chunk_size:
+                yield "".join(parts)
+                parts = []
+                size = 0
+
+        parts.append("]")
+        yield "".join(parts)
@@ -1,3 +1,4 @@
+import io
 from src.core.abstract_response import AbstractResponse
 from src.core.common import common
 
@@ -8,28 +9,26 @@ class ResponseMarkdown(AbstractResponse):
 
     # Преобразует данные в таблицу Markdown
     def build(self, format: str, data: list):
-        text = super().build(format, data)
- 
+        return "".join(self.stream(format, data))
+
+    # Формирует таблицу Markdown по частям: строки пишутся в буфер, буфер отдается по заполнении
+    def stream(self, format: str, data: list):
+        super().build(format, data)
+
         # Шапка таблицы
-        item = data[0]
-        fields = common.get_fields(item)
-        
-        # Заголовок таблицы
-        text += "| " + " | ".join(fields) + " |\n"
-        text += "| " + " | ".join(["---"] * len(fields)) + " |\n"
-        
+        fields = common.get_fields(data[0])
+
+        buffer = io.StringIO()
+        buffer.write("| " + " | ".join(fields) + " |\n")
+        buffer.write("| " + " | ".join(["---"] * len(fields)) + " |\n")
+
         # Данные
-        for item in data:
-            row = []
-            for field in fields:
-                value = getattr(item, field, "")
-                # Обрабатываем вложенные объекты
-                if hasattr(value, 'name'):
-                    row.append(str(value.name))
-                elif hasattr(value, 'id'):
-                    row.append(str(value.id))
-                else:
-                    row.append(str(value))
-            text += "| " + " | ".join(row) + " |\n"
-        
-        return text
\ No newline at end of file
+        for row in self._rows(fields, data):
+            buffer.write("| " + " | ".join(row) + " |\n")
+
+            if buffer.tell() >= self.chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        yield buffer.getvalue()
@@ -1,6 +1,7 @@
+import io
+from xml.sax.saxutils import escape
 from src.core.abstract_response import AbstractResponse
 from src.core.common import common
-import xml.etree.ElementTree as ET
 
 class ResponseXml(AbstractResponse):
     def __init__(self):
@@ -8,56 +9,69 @@ class ResponseXml(AbstractResponse):
 
     # Преобразует данные в формат XML
     def build(self, format: str, data: list):
+        return "".join(self.stream(format, data))
+
+    # Формирует XML по частям: элементы с отступами пишутся в буфер без построения дерева,
+    # буфер отдается по заполнении
+    def stream(self, format: str, data: list):
         super().build(format, data)
-            
-        root = ET.Element("items")
-        
+
+        buffer = io.StringIO()
+        buffer.write('<?xml version="1.0" encoding="UTF-8"?>\n<items>')
+
         for item in data:
-            item_element = ET.SubElement(root, "item")
-            
-            # Получаем все публичные атрибуты
-            attributes = [attr for attr in dir(item) 
-                         if not attr.startswith('_') 
-                         and not callable(getattr(item, attr))]
-            
-            for attr in attributes:
-                try:
-                    value = getattr(item, attr)
-                    field_element = ET.SubElement(item_element, attr)
-                    
-                    # Обрабатываем вложенные объекты
-                    if hasattr(value, '__dict__'):
-                        # Для вложенных объектов создаем подэлементы
-                        nested_attrs = [nested_attr for nested_attr in dir(value) 
-                                      if not nested_attr.startswith('_') 
-                                      and not callable(getattr(value, nested_attr))]
-                        for nested_attr in nested_attrs:
-                            nested_value = getattr(value, nested_attr)
-                            if not callable(nested_value):
-                                nested_element = ET.SubElement(field_element, nested_attr)
-                                nested_element.text = str(nested_value)
-                    else:
-                        field_element.text = str(value) if value is not None else ""
-                        
-                except Exception:
+            buffer.write("\n  ")
+            self.__write_item(buffer, item)
+
+            if buffer.tell() >= self.chunk_size:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+        buffer.write("\n</items>\n")
+        yield buffer.getvalue()
+
+    # Записывает элемент item со значениями публичных свойств
+    def __write_item(self, buffer, item):
+        values = self.__values(item)
+        if len(values) == 0:
+            buffer.write("<item />")
+            return
+
+        buffer.write("<item>")
+        for name, value in values:
+            buffer.write("\n    ")
+
+            # Для вложенных объектов создаем подэлементы
+            if hasattr(value, '__dict__'):
+                nested_values = self.__values(value)
+                if len(nested_values) == 0:
+                    buffer.write(f"<{name} />")
                     continue
-        
-        # Форматируем XML с отступами
-        self._indent(root)
-        return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding='unicode', method='xml')
-    
-    # Добавляет отступы для красивого форматирования XML
-    def _indent(self, elem, level=0):
-        i = "\n" + level * "  "
-        if len(elem):
-            if not elem.text or not elem.text.strip():
-                elem.text = i + "  "
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = i
-            for elem in elem:
-                self._indent(elem, level + 1)
-            if not elem.tail or not elem.tail.strip():
-                elem.tail = i
+
+                buffer.write(f"<{name}>")
+                for nested_name, nested_value in nested_values:
+                    buffer.write("\n      ")
+                    self.__write_text(buffer, nested_name, str(nested_value))
+                buffer.write(f"\n    </{name}>")
+            else:
+                self.__write_text(buffer, name, str(value) if value is not None else "")
+
+        buffer.write("\n  </item>")
+
+    # Записывает элемент с текстом (пустой элемент - в краткой форме)
+    def __write_text(self, buffer, name: str, text: str):
+        if text:
+            buffer.write(f"<{name}>{escape(text)}</{name}>")
         else:
-            if level and (not elem.tail or not elem.tail.strip()):
-                elem.tail = i
\ No newline at end of file
+            buffer.write(f"<{name} />")
+
+    # Значения публичных свойств объекта по схеме его класса
+    def __values(self, source) -> list:
+        result = []
+        for name, getter in common.get_schema(source.__class__):
+            value = getter(source)
+            if not callable(value):
+                result.append((name, value))
+
+        return result
@@ -0,0 +1,148 @@
+from datetime import datetime, date
+from src.core.abstract_model import AbstractModel
+from src.core.common import common
+from src.logics.basic_convertor import BasicConvertor
+from src.logics.datetime_convertor import DatetimeConvertor
+from src.logics.reference_convertor import ReferenceConvertor
+
+
+class SerializerGenerator:
+    """
+    Генератор сериализаторов моделей в словарь (формат FactoryConvert).
+    Для каждого класса при первом обращении по схеме полей и типам значений
+    первого объекта генерируется функция с прямым чтением свойств.
+    Значение другого типа (например, None вместо ссылки) уходит
+    в общий конвертор, поэтому результат совпадает с построчной конвертацией
+    """
+
+    # Сгенерированные сериализаторы: класс -> функция
+    __serializers: dict = {}
+
+    # Вид значения по его типу: тип -> basic / reference / datetime / list (None - поле не выгружается)
+    __kinds: dict = {}
+
+    # Конверторы общего пути: создаются один раз, а не на каждое значение
+    __convertors = {
+        "basic": BasicConvertor(),
+        "datetime": DatetimeConvertor(),
+        "reference": ReferenceConvertor()
+    }
+
+    """
+    Конвертировать объект в словарь
+    """
+    @staticmethod
+    def convert(obj) -> dict:
+        serializer = SerializerGenerator.__serializers.get(obj.__class__)
+        if serializer is None:
+            serializer = SerializerGenerator.get(obj.__class__, obj)
+
+        return serializer(obj)
+
+    """
+    Получить сериализатор класса
+    sample - объект класса, по типам значений которого генерируется функция
+    """
+    @staticmethod
+    def get(cls, sample):
+        serializer = SerializerGenerator.__serializers.get(cls)
+        if serializer is not None:
+            return serializer
+
+        names = {
+            "convert": SerializerGenerator.convert,
+            "convert_value": SerializerGenerator.convert_value
+        }
+        exec(SerializerGenerator.source(cls, sample, names), names)
+
+        serializer = names["serialize"]
+        SerializerGenerator.__serializers[cls] = serializer
+        return serializer
+
+    """
+    Исходный код сериализатора класса
+    names - пространство имен функции, дополняется функциями чтения свойств и типами
+    """
+    @staticmethod
+    def source(cls, sample, names: dict) -> str:
+        lines = ["def serialize(obj):", "    result = {}"]
+
+        for number, (field, getter) in enumerate(common.get_schema(cls)):
+            value = getter(sample)
+            value_type = type(value)
+            kind = SerializerGenerator.kind(value_type)
+            names[f"get_{number}"] = getter
+            names[f"type_{number}"] = value_type
+
+            lines.append(f"    value = get_{number}(obj)")
+            if kind is None:
+                lines.append(f"    convert_value(result, {field!r}, value)")
+                continue
+
+            # Пустая строка не проходит проверку общего конвертора
+            condition = f"type(value) is type_{number}"
+            if issubclass(value_type, str):
+                condition += " and value.strip()"
+
+            if kind == "basic":
+                expression = "value"
+            elif kind == "reference":
+                expression = "value.id"
+            elif kind == "datetime":
+                expression = "value.strftime(" + repr(
+                    "%Y-%m-%d %H:%M:%S" if issubclass(value_type, datetime) else "%Y-%m-%d") + ")"
+            else:
+                expression = "[convert(item) for item in value]"
+
+            lines.append(f"    if {condition}:")
+            lines.append(f"        result[{field!r}] = {expression}")
+            lines.append("    else:")
+            lines.append(f"        convert_value(result, {field!r}, value)")
+
+        lines.append("    return result")
+        return "\n".join(lines) + "\n"
+
+    """
+    Записать значение поля в результат общим конвертором
+    """
+    @staticmethod
+    def convert_value(result: dict, field: str, value):
+        kind = SerializerGenerator.kind(type(value))
+
+        if kind == "list":
+            result[field] = [SerializerGenerator.convert(item) for item in value]
+        elif kind is not None:
+            result[field] = SerializerGenerator.__convertors[kind].convert(value)
+
+    """
+    Вид значения для конвертации по типу значения
+    """
+    @staticmethod
+    def kind(value_type: type):
+        if value_type in SerializerGenerator.__kinds:
+            return SerializerGenerator.__kinds[value_type]
+
+        if issubclass(value_type, (int, float, str, bool)):
+            kind = "basic"
+        elif issubclass(value_type, AbstractModel):
+            kind = "reference"
+        elif issubclass(value_type, (datetime, date)):
+            kind = "datetime"
+        elif issubclass(value_type, list):
+            kind = "list"
+        else:
+            kind = None
+
+        SerializerGenerator.__kinds[value_type] = kind
+        return kind
+
+    """
+    Сбросить сгенерированные сериализаторы (например, после изменения класса): одного класса или всех
+    """
+    @staticmethod
+    def clear(cls = None):
+        common.clear_schema(cls)
+        if cls is None:
+            SerializerGenerator.__serializers.clear()
+        else:
+            SerializerGenerator.__serializers.pop(cls, None)
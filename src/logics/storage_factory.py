@@ -2,6 +2,7 @@ from src.core.reference_item_factory import ReferenceItemFactory
 from src.core.validator import Validator
 from src.models.storage_model import StorageModel
 from src.repository import Repository
+from src.reference_graph import ReferenceGraph
 
 class StorageFactory(ReferenceItemFactory):
     """Фабрика для создания складов"""
@@ -37,11 +38,11 @@ class StorageFactory(ReferenceItemFactory):
         """Проверяет использование склада в других объектах"""
         errors = []
         
+        graph = ReferenceGraph.get(reference_service.data)
+
         # Проверка в транзакциях
-        transactions = reference_service._get_reference_data(Repository.transaction_key).values()
-        for transaction in transactions:
-            if transaction.storage.id == storage_id:
-                errors.append(f"Невозможно удалить склад. Он используется в транзакции от {transaction.date}")
-                break
+        transaction = graph.first_referrer(storage_id, Repository.transaction_key)
+        if transaction is not None:
+            errors.append(f"Невозможно удалить склад. Он используется в транзакции от {transaction.date}")
         
         return errors
\ No newline at end of file
@@ -0,0 +1,10 @@
+from src.core.abstract_persistence import AbstractPersistence
+
+
+class SyncPersistence(AbstractPersistence):
+    """
+    Синхронное сохранение: файл данных перезаписывается на каждое изменение справочников
+    """
+
+    def changed(self, reference_type: str, items: list):
+        self.flush()
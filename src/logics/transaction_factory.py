@@ -0,0 +1,128 @@
+import datetime
+import math
+from src.core.reference_item_factory import ReferenceItemFactory
+from src.core.validator import Validator, ArgumentException
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.repository import Repository
+
+
+class TransactionFactory(ReferenceItemFactory):
+    """Фабрика для создания транзакций"""
+
+    def __init__(self, reference_service):
+        self.reference_service = reference_service
+
+    def create(self, data: dict) -> TransactionModel:
+        """Создает новую транзакцию"""
+        Validator.validate(data.get('date'), str, field_name="date")
+        Validator.validate(data.get('quantity'), (int, float), field_name="quantity")
+
+        # Получаем зависимости
+        nomenclature = self.reference_service._get_dependency(
+            Repository.nomenclature_key,
+            data.get('nomenclature_id')
+        )
+        storage = self.reference_service._get_dependency(
+            Repository.storage_key,
+            data.get('storage_id')
+        )
+        unit = self.reference_service._get_dependency(
+            Repository.unit_measure_key,
+            data.get('unit_id')
+        )
+
+        item = TransactionModel(
+            date=TransactionFactory.parse_date(data['date']),
+            nomenclature=nomenclature,
+            storage=storage,
+            quantity=TransactionFactory.parse_quantity(data['quantity']),
+            unit=unit
+        )
+
+        if 'id' in data:
+            item.id = data['id']
+
+        return item
+
+    def update(self, existing_item: TransactionModel, update_data: dict):
+        """Обновляет транзакцию напрямую из данных JSON
+        Все поля разбираются и зависимости находятся до изменения транзакции:
+        при ошибке в любом поле транзакция остается прежней"""
+        date = existing_item.date
+        if 'date' in update_data:
+            Validator.validate(update_data['date'], str, field_name="date")
+            date = TransactionFactory.parse_date(update_data['date'])
+
+        quantity = existing_item.quantity
+        if 'quantity' in update_data:
+            Validator.validate(update_data['quantity'], (int, float), field_name="quantity")
+            quantity = TransactionFactory.parse_quantity(update_data['quantity'])
+
+        # Зависимости обновляются, если переданы
+        nomenclature = existing_item.nomenclature
+        if 'nomenclature_id' in update_data:
+            nomenclature = self.reference_service._get_dependency(
+                Repository.nomenclature_key,
+                update_data['nomenclature_id']
+            )
+
+        storage = existing_item.storage
+        if 'storage_id' in update_data:
+            storage = self.reference_service._get_dependency(
+                Repository.storage_key,
+                update_data['storage_id']
+            )
+
+        unit = existing_item.unit
+        if 'unit_id' in update_data:
+            unit = self.reference_service._get_dependency(
+                Repository.unit_measure_key,
+                update_data['unit_id']
+            )
+
+        # Пустой код зависимости не находит элемента - проверка до присваивания
+        Validator.validate_models(nomenclature, NomenclatureModel)
+        Validator.validate_models(storage, StorageModel)
+        Validator.validate_models(unit, UnitMeasurement)
+
+        existing_item.date = date
+        existing_item.quantity = quantity
+        existing_item.nomenclature = nomenclature
+        existing_item.storage = storage
+        existing_item.unit = unit
+
+
+    def check_dependencies(self, transaction_id: str, reference_service) -> list:
+        """На транзакции не ссылаются другие объекты"""
+        return []
+
+    """
+    Разобрать дату транзакции в формате ГГГГ-ММ-ДД
+    """
+    @staticmethod
+    def parse_date(value: str) -> datetime.date:
+        try:
+            return datetime.date.fromisoformat(value.strip())
+        except ValueError:
+            raise ArgumentException(f"Поле date: неверный формат даты {value}, ожидается ГГГГ-ММ-ДД")
+
+    """
+    Разобрать количество транзакции: число или строка с числом (CSV)
+    Бесконечность и NaN не принимаются - они испортили бы остатки
+    """
+    @staticmethod
+    def parse_quantity(value) -> float:
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                raise ArgumentException(f"Поле quantity: {value} не является числом")
+
+        Validator.validate(value, (int, float), field_name="quantity")
+        if not math.isfinite(value):
+            raise ArgumentException(f"Поле quantity: {value} не является конечным числом")
+
+        return float(value)
@@ -0,0 +1,189 @@
+import csv
+import json
+import datetime
+from src.core.validator import Validator, ArgumentException
+from src.core.logger import Logger
+from src.logics.transaction_factory import TransactionFactory
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+
+
+class TransactionIngestException(ArgumentException):
+    """
+    Ошибка в строке потока транзакций
+    line - номер строки с ошибкой, ingested - число транзакций,
+    добавленных в репозиторий до этой строки
+    """
+
+    def __init__(self, message: str, line: int, ingested: int = 0):
+        super().__init__(f"Ошибка в строке {line}: {message}")
+        self.message = message
+        self.line = line
+        self.ingested = ingested
+
+
+class TransactionIngest:
+    """
+    Потоковая загрузка транзакций из NDJSON или CSV.
+    Строки разбираются по мере чтения потока, ссылки на номенклатуру,
+    склад и единицу измерения разрешаются по кодам через хэш-таблицы,
+    готовые транзакции добавляются в репозиторий пакетами
+    (одно событие bulk_change_reference_type на пакет)
+    """
+
+    # Колонки CSV (первая строка файла - заголовок)
+    columns = ["date", "nomenclature_id", "storage_id", "quantity", "unit_id"]
+
+    def __init__(self, reference_service, batch_size: int = 10000):
+        Validator.validate(batch_size, int)
+        if batch_size <= 0:
+            raise ArgumentException("Размер пакета должен быть положительным")
+
+        self.__reference_service = reference_service
+        self.__batch_size = batch_size
+
+    """
+    Загрузить транзакции из строк NDJSON (по одному JSON объекту на строку)
+    Возвращает количество добавленных транзакций
+    """
+    def ingest_ndjson(self, lines) -> int:
+        return self.__ingest(TransactionIngest.__ndjson_rows(lines))
+
+    """
+    Загрузить транзакции из строк CSV с заголовком
+    Возвращает количество добавленных транзакций
+    """
+    def ingest_csv(self, lines) -> int:
+        return self.__ingest(TransactionIngest.__csv_rows(lines))
+
+    """
+    Загрузить транзакции из последовательности словарей
+    Пакеты, добавленные до строки с ошибкой, остаются в репозитории,
+    ошибка (TransactionIngestException) содержит номер строки и их количество
+    Возвращает количество добавленных транзакций
+    """
+    def ingest(self, rows) -> int:
+        return self.__ingest(enumerate(rows, start=1))
+
+    def __ingest(self, numbered_rows) -> int:
+        nomenclatures = self.__reference_service._get_reference_data(Repository.nomenclature_key)
+        storages = self.__reference_service._get_reference_data(Repository.storage_key)
+        units = self.__reference_service._get_reference_data(Repository.unit_measure_key)
+        transactions = self.__reference_service._get_reference_data(Repository.transaction_key)
+
+        # Разобранные даты и найденные ссылки повторяются - разбор кэшируется
+        dates = {}
+        resolved = {"nomenclature_id": {}, "storage_id": {}, "unit_id": {}}
+        batch = []
+        batch_ids = set()
+        count = 0
+        line = 0
+
+        try:
+            for line, row in numbered_rows:
+                transaction = self.__transaction(row, nomenclatures, storages, units, dates, resolved)
+
+                if row.get("id"):
+                    transaction.id = row["id"]
+                    if transaction.id in transactions or transaction.id in batch_ids:
+                        raise ArgumentException(f"Транзакция с ID {transaction.id} уже существует")
+                    batch_ids.add(transaction.id)
+
+                batch.append(transaction)
+                if len(batch) >= self.__batch_size:
+                    count += self.__flush(batch)
+                    batch = []
+                    batch_ids = set()
+
+            if len(batch) > 0:
+                count += self.__flush(batch)
+        except TransactionIngestException as e:
+            raise self.__error(e.message, e.line, count)
+        except ArgumentException as e:
+            raise self.__error(str(e), line, count)
+
+        Logger.info("TransactionIngest", f"Загружено транзакций: {count}")
+        return count
+
+    def __transaction(self, row, nomenclatures: dict, storages: dict, units: dict, dates: dict, resolved: dict):
+        Validator.validate(row, dict)
+        return TransactionModel(
+            TransactionIngest.__date(dates, row.get("date")),
+            TransactionIngest.__resolve(resolved, nomenclatures, "nomenclature_id", row),
+            TransactionIngest.__resolve(resolved, storages, "storage_id", row),
+            TransactionFactory.parse_quantity(row.get("quantity")),
+            TransactionIngest.__resolve(resolved, units, "unit_id", row)
+        )
+
+    @staticmethod
+    def __error(message: str, line: int, ingested: int) -> TransactionIngestException:
+        error = TransactionIngestException(message, line, ingested)
+        Logger.error("TransactionIngest", str(error), {"ingested": ingested})
+        return error
+
+    def __flush(self, batch: list) -> int:
+        self.__reference_service.add_items(Repository.transaction_key, batch)
+        return len(batch)
+
+    @staticmethod
+    def __resolve(resolved: dict, items: dict, field: str, row: dict):
+        item_id = row.get(field)
+        cache = resolved[field]
+        item = cache.get(item_id) if isinstance(item_id, str) else None
+        if item is not None:
+            return item
+
+        item = items.get(item_id) if isinstance(item_id, str) else None
+        if item is None:
+            raise ArgumentException(f"Поле {field}: элемент с ID {item_id} не найден")
+
+        cache[item_id] = item
+        return item
+
+    @staticmethod
+    def __date(dates: dict, value) -> datetime.date:
+        result = dates.get(value)
+        if result is None:
+            Validator.validate(value, str, field_name="date")
+            result = dates[value] = TransactionFactory.parse_date(value)
+
+        return result
+
+    @staticmethod
+    def __decode(lines):
+        for line in lines:
+            yield line.decode("utf-8") if isinstance(line, bytes) else line
+
+    @staticmethod
+    def __ndjson_rows(lines):
+        for line, text in enumerate(TransactionIngest.__decode(lines), start=1):
+            if not text.strip():
+                continue
+
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                raise TransactionIngestException(f"некорректный JSON: {str(e)}", line)
+
+            if not isinstance(row, dict):
+                raise TransactionIngestException("ожидается JSON объект", line)
+
+            yield line, row
+
+    @staticmethod
+    def __csv_rows(lines):
+        reader = csv.reader(TransactionIngest.__decode(lines))
+        header = next(reader, None)
+        if header is None:
+            return
+
+        header = [column.strip() for column in header]
+        missing = [column for column in TransactionIngest.columns if column not in header]
+        if missing:
+            raise TransactionIngestException(f"в заголовке CSV нет колонок: {', '.join(missing)}", 1)
+
+        for values in reader:
+            if len(values) == 0:
+                continue
+
+            yield reader.line_num, dict(zip(header, values))
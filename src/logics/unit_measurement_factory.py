@@ -2,6 +2,7 @@ from src.core.reference_item_factory import ReferenceItemFactory
 from src.core.validator import Validator
 from src.models.unit_measurement_model import UnitMeasurement
 from src.repository import Repository
+from src.reference_graph import ReferenceGraph
 
 class UnitMeasurementFactory(ReferenceItemFactory):
     """Фабрика для создания единиц измерения"""
@@ -52,27 +53,23 @@ class UnitMeasurementFactory(ReferenceItemFactory):
         """Проверяет использование единицы измерения в других объектах"""
         errors = []
         
+        graph = ReferenceGraph.get(reference_service.data)
+
         # Проверка в номенклатурах
-        nomenclatures = reference_service._get_reference_data(Repository.nomenclature_key).values()
-        for nomenclature in nomenclatures:
-            if nomenclature.unit_measurement.id == unit_id:
-                errors.append(f"Невозможно удалить единицу измерения. Она используется в номенклатуре '{nomenclature.name}'")
-                break
+        nomenclature = graph.first_referrer(unit_id, Repository.nomenclature_key)
+        if nomenclature is not None:
+            errors.append(f"Невозможно удалить единицу измерения. Она используется в номенклатуре '{nomenclature.name}'")
         
         # Проверка в транзакциях
         if not errors:
-            transactions = reference_service._get_reference_data(Repository.transaction_key).values()
-            for transaction in transactions:
-                if transaction.unit.id == unit_id:
-                    errors.append(f"Невозможно удалить единицу измерения. Она используется в транзакции от {transaction.date}")
-                    break
+            transaction = graph.first_referrer(unit_id, Repository.transaction_key)
+            if transaction is not None:
+                errors.append(f"Невозможно удалить единицу измерения. Она используется в транзакции от {transaction.date}")
         
         # Проверка в других единицах измерения (как базовая)
         if not errors:
-            units = reference_service._get_reference_data(Repository.unit_measure_key).values()
-            for unit in units:
-                if unit.base_unit and unit.base_unit.id == unit_id:
-                    errors.append(f"Невозможно удалить единицу измерения. Она используется как базовая для '{unit.name}'")
-                    break
+            unit = graph.first_referrer(unit_id, Repository.unit_measure_key)
+            if unit is not None:
+                errors.append(f"Невозможно удалить единицу измерения. Она используется как базовая для '{unit.name}'")
         
         return errors
\ No newline at end of file
@@ -0,0 +1,167 @@
+import threading
+import time
+from src.core.abstract_persistence import AbstractPersistence
+from src.core.validator import Validator, ArgumentException
+from src.core.logger import Logger
+from src.repository import Repository
+
+
+class WriteBehindPersistence(AbstractPersistence):
+    """
+    Отложенная запись: изменения только помечают репозиторий измененным,
+    а фоновый поток сохраняет его не чаще раза в flush_interval_ms
+    или сразу после flush_max_changes изменений.
+    Фоновый поток не читает справочники репозитория: измененные элементы
+    переводятся в записи в потоке, который их изменил, и поток сохраняет
+    неизменяемые копии этих записей вместе с вложениями того же момента
+    """
+
+    def __init__(self, manager, flush_interval_ms: int, flush_max_changes: int = None):
+        super().__init__(manager)
+
+        Validator.validate(flush_interval_ms, int, field_name="flush_interval_ms")
+        if flush_interval_ms <= 0:
+            raise ArgumentException("Интервал сохранения должен быть положительным")
+
+        if flush_max_changes is not None:
+            Validator.validate(flush_max_changes, int, field_name="flush_max_changes")
+            if flush_max_changes <= 0:
+                raise ArgumentException("Количество изменений до сохранения должно быть положительным")
+
+        self.__flush_interval_ms = flush_interval_ms
+        self.__flush_max_changes = flush_max_changes
+
+        self.__condition = threading.Condition()
+        self.__pending = 0
+        self.__dirty_since = None
+        # Записи справочников: справочник -> {код элемента: запись} (None - еще не подготовлены)
+        self.__records = None
+        self.__balances = None
+        self.__balance_records = []
+        self.__attachments = {}
+        self.__worker = None
+        self.__stopped = False
+
+    @property
+    def pending_changes(self) -> int:
+        with self.__condition:
+            return self.__pending
+
+    def changed(self, reference_type: str, items: list):
+        # Пакетное добавление учитывается одним сохранением на весь пакет
+        with self.__condition:
+            if self.__stopped:
+                return
+
+            self.__capture(reference_type, items)
+            self.__pending += max(len(items), 1)
+            if self.__dirty_since is None:
+                self.__dirty_since = time.monotonic()
+
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run, name="DataManager", daemon=True)
+                self.__worker.start()
+
+            self.__condition.notify_all()
+
+    def flush(self) -> bool:
+        # Явное сохранение (в потоке вызывающего) учитывает и изменения в обход событий
+        with self.__condition:
+            self.__records = None
+            self.__capture(None, [])
+
+        return self.__write()
+
+    def compact(self) -> bool:
+        return self.flush()
+
+    def __capture(self, reference_type: str, items: list):
+        # Вызывается под блокировкой в потоке, изменившем данные
+        data = self.manager.data
+        if self.__records is None:
+            self.__records = self.manager.capture()
+        elif reference_type in self.__records:
+            records = self.__records[reference_type]
+            current = data.get(reference_type, {})
+            for item in items:
+                if item.id in current:
+                    records[item.id] = self.manager.convert(item)
+                else:
+                    records.pop(item.id, None)
+
+        # Остатки заменяются новым списком, а не изменяются на месте
+        balances = data.get(Repository.balances_key, [])
+        if balances is not self.__balances:
+            self.__balances = balances
+            self.__balance_records = [self.manager.convert(balance) for balance in balances]
+
+        self.__attachments = self.manager.capture_attachments()
+
+    def __write(self) -> bool:
+        with self.__condition:
+            pending = self.__pending
+            self.__pending = 0
+            self.__dirty_since = None
+
+            # Записи не изменяются после создания: копируются только списки
+            prepared = {reference_type: list(records.values()) for reference_type, records in self.__records.items()}
+            prepared[Repository.balances_key] = list(self.__balance_records)
+            prepared["attachments"] = dict(self.__attachments)
+
+        result = self.manager._save(prepared)
+        if not result:
+            # Изменения не сохранены - повторим при следующем сохранении
+            with self.__condition:
+                self.__pending += pending
+                if self.__dirty_since is None and self.__pending > 0:
+                    self.__dirty_since = time.monotonic()
+
+            Logger.error("DataManager", "Изменения не сохранены", {"pending": pending})
+
+        return result
+
+    def shutdown(self) -> bool:
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+            worker = self.__worker
+
+        if worker is not None:
+            worker.join()
+
+        if self.pending_changes == 0:
+            return True
+
+        return self.flush()
+
+    def __run(self):
+        interval = self.__flush_interval_ms / 1000
+
+        while True:
+            with self.__condition:
+                # Ждем первого изменения
+                while self.__pending == 0 and not self.__stopped:
+                    self.__condition.wait()
+
+                if self.__stopped:
+                    return
+
+                # Ждем окончания интервала или накопления нужного числа изменений
+                # (изменения могли сохранить и вызовом flush из другого потока)
+                while not self.__stopped and self.__pending > 0:
+                    if self.__flush_max_changes is not None and self.__pending >= self.__flush_max_changes:
+                        break
+
+                    remaining = self.__dirty_since + interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+
+                    self.__condition.wait(remaining)
+
+                if self.__stopped:
+                    return
+
+                if self.__pending == 0:
+                    continue
+
+            self.__write()
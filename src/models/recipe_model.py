@@ -9,6 +9,8 @@ class RecipeModel(EntityModel):
 
     def __init__(self, name, description):
         super().__init__()
+        # Список ингредиентов у каждого рецепта свой
+        self.__ingredients = []
         self.name = name
         self.description = description
 
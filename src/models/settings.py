@@ -10,6 +10,13 @@ class Settings:
     __log_date_format: str = "%Y-%m-%d %H:%M:%S"
     __log_format: str = "{timestamp} | {level} | {source} | {message} | {data}"
     __log_directory: str = "logs"
+    __save_interval_ms: int = None
+    __save_max_changes: int = 100
+    __persistence_mode: str = "snapshot"
+    __journal_fsync: str = "always"
+    __journal_compact_records: int = 10000
+    __snapshot_format: str = "json"
+    __transaction_segments: bool = False
 
     def __init__(self):
         self.company = CompanyModel()
@@ -95,4 +102,83 @@ class Settings:
     @log_directory.setter
     def log_directory(self, value: str):
         Validator.validate(value, str)
-        self.__log_directory = value
\ No newline at end of file
+        self.__log_directory = value
+    
+    # Интервал 0 или None (по умолчанию) - сохранение на каждое изменение (без отложенной записи)
+    @property
+    def save_interval_ms(self) -> int|None:
+        return self.__save_interval_ms
+    
+    @save_interval_ms.setter
+    def save_interval_ms(self, value: int|None):
+        Validator.validate(value, (int, type(None)))
+        if value is not None and value < 0:
+            raise ArgumentException("Интервал сохранения не может быть отрицательным")
+        self.__save_interval_ms = value
+    
+    @property
+    def save_max_changes(self) -> int:
+        return self.__save_max_changes
+    
+    @save_max_changes.setter
+    def save_max_changes(self, value: int):
+        Validator.validate(value, int)
+        if value <= 0:
+            raise ArgumentException("Количество изменений до сохранения должно быть положительным")
+        self.__save_max_changes = value
+    
+    @property
+    def persistence_mode(self) -> str:
+        return self.__persistence_mode
+    
+    @persistence_mode.setter
+    def persistence_mode(self, value: str):
+        valid_modes = ["snapshot", "journal", "sqlite"]
+        if value in valid_modes:
+            self.__persistence_mode = value
+        else:
+            raise ArgumentException(f"Недопустимый режим сохранения. Допустимые значения: {valid_modes}")
+    
+    @property
+    def journal_fsync(self) -> str:
+        return self.__journal_fsync
+    
+    @journal_fsync.setter
+    def journal_fsync(self, value: str):
+        valid_policies = ["always", "never"]
+        if value in valid_policies:
+            self.__journal_fsync = value
+        else:
+            raise ArgumentException(f"Недопустимая политика fsync. Допустимые значения: {valid_policies}")
+    
+    @property
+    def journal_compact_records(self) -> int:
+        return self.__journal_compact_records
+    
+    @journal_compact_records.setter
+    def journal_compact_records(self, value: int):
+        Validator.validate(value, int)
+        if value <= 0:
+            raise ArgumentException("Количество записей журнала до сжатия должно быть положительным")
+        self.__journal_compact_records = value
+    
+    @property
+    def snapshot_format(self) -> str:
+        return self.__snapshot_format
+    
+    @snapshot_format.setter
+    def snapshot_format(self, value: str):
+        valid_formats = ["json", "binary"]
+        if value in valid_formats:
+            self.__snapshot_format = value
+        else:
+            raise ArgumentException(f"Недопустимый формат снимка. Допустимые значения: {valid_formats}")
+    
+    @property
+    def transaction_segments(self) -> bool:
+        return self.__transaction_segments
+    
+    @transaction_segments.setter
+    def transaction_segments(self, value: bool):
+        Validator.validate(value, bool)
+        self.__transaction_segments = value
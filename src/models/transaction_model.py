@@ -71,3 +71,19 @@ class TransactionModel(AbstractModel):
     def unit(self, value: UnitMeasurement):
         Validator.validate_models(value, UnitMeasurement)
         self.__unit = value
+
+
+    '''
+    Восстановить транзакцию из проверенных данных снимка
+    Поля не проверяются: значения уже прошли проверку при сохранении
+    '''
+    @classmethod
+    def restore(cls, item_id: str, date, nomenclature, storage, quantity: float, unit) -> "TransactionModel":
+        item = cls.__new__(cls)
+        item.id = item_id
+        item.__date = date
+        item.__nomenclature = nomenclature
+        item.__storage = storage
+        item.__quantity = quantity
+        item.__unit = unit
+        return item
@@ -0,0 +1,134 @@
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.event_type import EventType
+from src.repository import Repository
+
+
+class ReferenceGraph(AbstractDataStore):
+    """
+    Граф обратных ссылок между элементами справочников:
+    код элемента -> тип справочника -> коды ссылающихся на него элементов.
+    Проверка зависимостей перед удалением сводится к поиску в множестве.
+    Обновляется инкрементально по событиям изменения справочников
+    """
+
+    # Справочники, элементы которых ссылаются на другие элементы
+    _sources = (
+        Repository.unit_measure_key,
+        Repository.nomenclature_key,
+        Repository.recipe_key,
+        Repository.transaction_key
+    )
+
+    def __init__(self, data: dict):
+        super().__init__(data)
+        self.rebuild()
+
+    """
+    Коды элементов, на которые ссылается элемент справочника
+    """
+    @staticmethod
+    def references(reference_type: str, item) -> list:
+        if reference_type == Repository.unit_measure_key:
+            return [] if item.base_unit is None else [item.base_unit.id]
+
+        if reference_type == Repository.nomenclature_key:
+            return [item.group_nomenclature.id, item.unit_measurement.id]
+
+        if reference_type == Repository.recipe_key:
+            return [ingredient.nomenclature.id for ingredient in item.ingredients]
+
+        if reference_type == Repository.transaction_key:
+            return [item.nomenclature.id, item.storage.id, item.unit.id]
+
+        return []
+
+    """
+    Полностью перестроить граф по данным репозитория
+    """
+    def rebuild(self):
+        super().rebuild()
+        # Обратные ссылки: код элемента -> тип справочника -> множество кодов
+        self.__referrers = {}
+        # Прямые ссылки: (тип справочника, код элемента) -> коды элементов, на которые он ссылается
+        self.__links = {}
+        # Количество элементов в графе по типам справочников
+        self.__counts = {reference_type: 0 for reference_type in self._sources}
+
+        for reference_type in self._sources:
+            for item in self.data.get(reference_type, {}).values():
+                self.link(reference_type, item)
+
+    """
+    Добавить или обновить ссылки элемента
+    """
+    def link(self, reference_type: str, item):
+        self.unlink(reference_type, item.id)
+
+        targets = ReferenceGraph.references(reference_type, item)
+        self.__links[(reference_type, item.id)] = targets
+        self.__counts[reference_type] += 1
+
+        for target in targets:
+            self.__referrers.setdefault(target, {}).setdefault(reference_type, set()).add(item.id)
+
+    """
+    Убрать ссылки элемента
+    """
+    def unlink(self, reference_type: str, item_id: str):
+        targets = self.__links.pop((reference_type, item_id), None)
+        if targets is None:
+            return
+
+        self.__counts[reference_type] -= 1
+
+        for target in targets:
+            by_type = self.__referrers.get(target)
+            if by_type is None or reference_type not in by_type:
+                continue
+
+            by_type[reference_type].discard(item_id)
+            if len(by_type[reference_type]) == 0:
+                del by_type[reference_type]
+            if len(by_type) == 0:
+                del self.__referrers[target]
+
+    """
+    Коды элементов справочника, ссылающихся на элемент
+    """
+    def referrers(self, item_id: str, reference_type: str) -> set:
+        self.ensure_actual()
+        return set(self.__referrers.get(item_id, {}).get(reference_type, ()))
+
+    """
+    Первый найденный элемент справочника, ссылающийся на элемент (None - ссылок нет)
+    """
+    def first_referrer(self, item_id: str, reference_type: str):
+        self.ensure_actual()
+        items = self.data.get(reference_type, {})
+
+        for referrer_id in self.__referrers.get(item_id, {}).get(reference_type, ()):
+            referrer = items.get(referrer_id)
+            if referrer is not None:
+                return referrer
+
+        return None
+
+    def _size(self, reference_type: str) -> int:
+        return self.__counts[reference_type]
+
+    def _handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        # Пакет обрабатывается как последовательность одиночных изменений
+        reference_type, items = EventType.changed_items(event, params)
+        if reference_type not in self._sources:
+            return
+
+        # Событие могло прийти от другого репозитория
+        current = self.data.get(reference_type, {})
+        for item in items:
+            if item.id in current:
+                self.link(reference_type, item)
+            else:
+                self.unlink(reference_type, item.id)
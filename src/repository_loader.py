@@ -0,0 +1,223 @@
+import datetime
+from src.core.reference_dict import ReferenceDict
+from src.core.validator import Validator, ArgumentException
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.ingredient_model import IngredientModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.recipe_model import RecipeModel
+from src.models.storage_model import StorageModel
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.repository import Repository
+
+
+class RepositoryLoader:
+    """
+    Построение графа объектов репозитория из данных в формате DataManager
+    (справочник -> список записей, ссылки на другие элементы - их коды).
+    Ссылки разрешаются за один проход по словарям "код -> элемент"
+    уже загруженных справочников
+    """
+
+    # Порядок загрузки: справочник загружается после справочников, на которые он ссылается
+    __order = [
+        Repository.unit_measure_key,
+        Repository.group_nomenclature_key,
+        Repository.nomenclature_key,
+        Repository.storage_key,
+        Repository.recipe_key,
+        Repository.transaction_key
+    ]
+
+    # Ссылочные поля записей: поле -> справочник, в котором ищется элемент
+    __references = {
+        Repository.unit_measure_key: {"base_unit": Repository.unit_measure_key},
+        Repository.nomenclature_key: {
+            "group_nomenclature": Repository.group_nomenclature_key,
+            "unit_measurement": Repository.unit_measure_key
+        },
+        Repository.transaction_key: {
+            "nomenclature": Repository.nomenclature_key,
+            "storage": Repository.storage_key,
+            "unit": Repository.unit_measure_key
+        }
+    }
+
+    """
+    Загрузить справочники репозитория из подготовленных данных
+    Остатки не загружаются - они пересчитываются по транзакциям
+    """
+    @staticmethod
+    def load(data: dict, prepared: dict):
+        Validator.validate(data, dict)
+        Validator.validate(prepared, dict)
+
+        for reference_type in RepositoryLoader.__order:
+            data[reference_type] = ReferenceDict()
+
+        for reference_type in RepositoryLoader.__order:
+            records = prepared.get(reference_type, [])
+            items = data[reference_type]
+
+            if reference_type == Repository.unit_measure_key:
+                # Базовая единица может идти в списке позже производной
+                for record in records:
+                    item = RepositoryLoader.create(reference_type, dict(record, base_unit=None), data)
+                    items[item.id] = item
+                for record in records:
+                    if record.get("base_unit"):
+                        items[record["id"]].base_unit = RepositoryLoader.__resolve(
+                            data, Repository.unit_measure_key, record["base_unit"])
+                continue
+
+            if reference_type == Repository.transaction_key:
+                RepositoryLoader.__load_transactions(data, records)
+                continue
+
+            for record in records:
+                item = RepositoryLoader.create(reference_type, record, data)
+                items[item.id] = item
+
+        data[Repository.balances_key] = []
+
+    """
+    Применить запись журнала: добавить, изменить или удалить элемент справочника
+    Возвращает измененный элемент (None - элемента не было)
+    """
+    @staticmethod
+    def apply(data: dict, record: dict):
+        Validator.validate(record, dict)
+        reference_type = record.get("type")
+        if reference_type not in RepositoryLoader.__order:
+            raise ArgumentException(f"Неверный тип справочника: {reference_type}")
+
+        items = data.setdefault(reference_type, ReferenceDict())
+
+        if record.get("op") == "delete":
+            return items.pop(record.get("id"), None)
+
+        if record.get("op") != "put":
+            raise ArgumentException(f"Неизвестная операция журнала: {record.get('op')}")
+
+        values = record.get("item")
+        Validator.validate(values, dict)
+        existing = items.get(values.get("id"))
+        if existing is None:
+            item = RepositoryLoader.create(reference_type, values, data)
+            items[item.id] = item
+            return item
+
+        RepositoryLoader.update(reference_type, existing, values, data)
+        return existing
+
+    """
+    Создать элемент справочника из записи
+    """
+    @staticmethod
+    def create(reference_type: str, record: dict, data: dict):
+        values = RepositoryLoader.__values(reference_type, record, data)
+
+        if reference_type == Repository.unit_measure_key:
+            item = UnitMeasurement(values["name"], values["coefficient"], values.get("base_unit"))
+
+        elif reference_type == Repository.group_nomenclature_key:
+            item = GroupNomenclatureModel()
+            item.name = values["name"]
+
+        elif reference_type == Repository.nomenclature_key:
+            item = NomenclatureModel(values["name"], values["full_name"],
+                                     values["group_nomenclature"], values["unit_measurement"])
+
+        elif reference_type == Repository.storage_key:
+            item = StorageModel(values["name"], values["address"])
+
+        elif reference_type == Repository.recipe_key:
+            item = RecipeModel(values["name"], values["description"])
+            for ingredient in record.get("ingredients", []):
+                item.ingredients.append(RepositoryLoader.__ingredient(ingredient, data))
+
+        elif reference_type == Repository.transaction_key:
+            item = TransactionModel(values["date"], values["nomenclature"], values["storage"],
+                                    float(values["quantity"]), values["unit"])
+
+        else:
+            raise ArgumentException(f"Неверный тип справочника: {reference_type}")
+
+        item.id = record["id"]
+        return item
+
+    """
+    Изменить элемент справочника по записи (ссылки на элемент остаются действительными)
+    """
+    @staticmethod
+    def update(reference_type: str, item, record: dict, data: dict):
+        values = RepositoryLoader.__values(reference_type, record, data)
+
+        for field, value in values.items():
+            if field == "id":
+                continue
+            if field == "quantity":
+                value = float(value)
+            setattr(item, field, value)
+
+    @staticmethod
+    def __load_transactions(data: dict, records: list):
+        # Ссылки ищутся в обычных словарях "код -> элемент" без разбора имен,
+        # одинаковые даты разбираются один раз
+        nomenclatures = dict(data[Repository.nomenclature_key])
+        storages = dict(data[Repository.storage_key])
+        units = dict(data[Repository.unit_measure_key])
+        dates = {}
+        items = {}
+
+        for record in records:
+            date = dates.get(record["date"])
+            if date is None:
+                date = datetime.date.fromisoformat(record["date"])
+                dates[record["date"]] = date
+
+            try:
+                item = TransactionModel(date, nomenclatures[record["nomenclature"]], storages[record["storage"]],
+                                        float(record["quantity"]), units[record["unit"]])
+                item.id = record["id"]
+            except KeyError:
+                # Ссылка не по коду: полный разбор записи с поиском по именам и текстом ошибки
+                item = RepositoryLoader.create(Repository.transaction_key, record, data)
+
+            items[item.id] = item
+
+        # Коды совпадают с ключами - индекс имен справочника не нужен
+        dict.update(data[Repository.transaction_key], items)
+
+    @staticmethod
+    def __values(reference_type: str, record: dict, data: dict) -> dict:
+        references = RepositoryLoader.__references.get(reference_type, {})
+        values = {}
+
+        for field, value in record.items():
+            if field == "ingredients":
+                continue
+
+            if field in references:
+                value = None if value is None else RepositoryLoader.__resolve(data, references[field], value)
+            elif field == "date" and isinstance(value, str):
+                value = datetime.date.fromisoformat(value)
+
+            values[field] = value
+
+        return values
+
+    @staticmethod
+    def __ingredient(record: dict, data: dict) -> IngredientModel:
+        nomenclature = RepositoryLoader.__resolve(data, Repository.nomenclature_key, record["nomenclature"])
+        ingredient = IngredientModel(record["name"], nomenclature, record["count"])
+        ingredient.id = record["id"]
+        return ingredient
+
+    @staticmethod
+    def __resolve(data: dict, reference_type: str, item_id: str):
+        item = data[reference_type].get(item_id)
+        if item is None:
+            raise ArgumentException(f"Зависимость {reference_type} с ID {item_id} не найдена")
+
+        return item
@@ -87,6 +87,27 @@ class SettingsManager:
         if "log_directory" in data:
             self.__settings.log_directory = data["log_directory"]
 
+        if "save_interval_ms" in data:
+            self.__settings.save_interval_ms = data["save_interval_ms"]
+
+        if "save_max_changes" in data:
+            self.__settings.save_max_changes = data["save_max_changes"]
+
+        if "persistence_mode" in data:
+            self.__settings.persistence_mode = data["persistence_mode"]
+
+        if "journal_fsync" in data:
+            self.__settings.journal_fsync = data["journal_fsync"]
+
+        if "journal_compact_records" in data:
+            self.__settings.journal_compact_records = data["journal_compact_records"]
+
+        if "snapshot_format" in data:
+            self.__settings.snapshot_format = data["snapshot_format"]
+
+        if "transaction_segments" in data:
+            self.__settings.transaction_segments = data["transaction_segments"]
+
         return True
 
     def default_settings(self):
@@ -104,5 +125,12 @@ class SettingsManager:
         self.__settings.log_date_format = "%Y-%m-%d %H:%M:%S"
         self.__settings.log_format = "{timestamp} | {level} | {source} | {message} | {data}"
         self.__settings.log_directory = "logs"
+        self.__settings.save_interval_ms = None
+        self.__settings.save_max_changes = 100
+        self.__settings.persistence_mode = "snapshot"
+        self.__settings.journal_fsync = "always"
+        self.__settings.journal_compact_records = 10000
+        self.__settings.snapshot_format = "json"
+        self.__settings.transaction_segments = False
 
     
\ No newline at end of file
@@ -0,0 +1,325 @@
+import sqlite3
+import threading
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.event_type import EventType
+from src.core.logger import Logger
+from src.repository import Repository
+from src.repository_loader import RepositoryLoader
+
+
+class SqliteStorage(AbstractDataStore):
+    """
+    Кэш агрегатов репозитория в SQLite (режим WAL).
+    Копия справочников в памяти лежит в отдельных таблицах с индексами по ссылкам
+    и датам и обновляется по событиям изменения справочников. Суммы для остатков
+    и оборотов Report и BalancesManager считаются в базе запросами GROUP BY
+    по количествам, приведенным к корневой единице измерения; при перезапуске
+    копия заменяет data.json (load).
+
+    Это не источник данных репозитория: Repository и ReferenceService работают
+    со справочниками в памяти, load восстанавливает их целиком. Сменное хранилище
+    за Repository/ReferenceService (данные больше оперативной памяти, мгновенный
+    перезапуск) не реализовано
+    """
+
+    _sources = (Repository.transaction_key,)
+
+    __schema = [
+        """CREATE TABLE IF NOT EXISTS unit_measure (
+            id TEXT PRIMARY KEY, name TEXT NOT NULL, coefficient INTEGER NOT NULL, base_unit TEXT)""",
+        """CREATE TABLE IF NOT EXISTS group_nomenclature (
+            id TEXT PRIMARY KEY, name TEXT NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS nomenclature (
+            id TEXT PRIMARY KEY, name TEXT NOT NULL, full_name TEXT NOT NULL,
+            group_nomenclature TEXT NOT NULL, unit_measurement TEXT NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS storage (
+            id TEXT PRIMARY KEY, name TEXT NOT NULL, address TEXT NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS recipe (
+            id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS ingredient (
+            id TEXT PRIMARY KEY, recipe TEXT NOT NULL, position INTEGER NOT NULL,
+            name TEXT NOT NULL, nomenclature TEXT NOT NULL, count INTEGER NOT NULL)""",
+        """CREATE TABLE IF NOT EXISTS transactions (
+            id TEXT PRIMARY KEY, date TEXT NOT NULL, nomenclature TEXT NOT NULL, storage TEXT NOT NULL,
+            quantity REAL NOT NULL, unit TEXT NOT NULL, root_quantity REAL NOT NULL)""",
+        "CREATE INDEX IF NOT EXISTS ix_nomenclature_group ON nomenclature (group_nomenclature)",
+        "CREATE INDEX IF NOT EXISTS ix_nomenclature_unit ON nomenclature (unit_measurement)",
+        "CREATE INDEX IF NOT EXISTS ix_ingredient_recipe ON ingredient (recipe, position)",
+        "CREATE INDEX IF NOT EXISTS ix_ingredient_nomenclature ON ingredient (nomenclature)",
+        "CREATE INDEX IF NOT EXISTS ix_transactions_date ON transactions (date)",
+        "CREATE INDEX IF NOT EXISTS ix_transactions_storage_date ON transactions (storage, date)",
+        "CREATE INDEX IF NOT EXISTS ix_transactions_pair_date ON transactions (nomenclature, storage, date)"
+    ]
+
+    # Таблицы справочников: тип справочника -> (таблица, колонки)
+    __tables = {
+        Repository.unit_measure_key: ("unit_measure", ["id", "name", "coefficient", "base_unit"]),
+        Repository.group_nomenclature_key: ("group_nomenclature", ["id", "name"]),
+        Repository.nomenclature_key: ("nomenclature", ["id", "name", "full_name", "group_nomenclature", "unit_measurement"]),
+        Repository.storage_key: ("storage", ["id", "name", "address"]),
+        Repository.recipe_key: ("recipe", ["id", "name", "description"]),
+        Repository.transaction_key: ("transactions", ["id", "date", "nomenclature", "storage", "quantity", "unit", "root_quantity"])
+    }
+
+    # Суммы по парам (номенклатура, склад) за период [начало, конец)
+    __pair_totals_sql = """
+        SELECT nomenclature, storage, COUNT(*), SUM(root_quantity) FROM transactions
+        WHERE date >= ? AND date < ? GROUP BY nomenclature, storage"""
+
+    # Остатки по парам (номенклатура, склад) на дату включительно
+    __balances_sql = """
+        SELECT nomenclature, storage, SUM(root_quantity) FROM transactions
+        WHERE date <= ? GROUP BY nomenclature, storage"""
+
+    __storage_balances_sql = """
+        SELECT nomenclature, storage, SUM(root_quantity) FROM transactions
+        WHERE storage = ? AND date <= ? GROUP BY nomenclature, storage"""
+
+    # Обороты склада по номенклатурам: начальный остаток, приход, расход
+    __turnover_sql = """
+        SELECT nomenclature,
+            TOTAL(CASE WHEN date < :start THEN root_quantity END),
+            TOTAL(CASE WHEN date >= :start AND root_quantity > 0 THEN root_quantity END),
+            TOTAL(CASE WHEN date >= :start AND root_quantity < 0 THEN -root_quantity END),
+            COUNT(CASE WHEN date < :start THEN 1 END),
+            COUNT(CASE WHEN date >= :start AND root_quantity > 0 THEN 1 END),
+            COUNT(CASE WHEN date >= :start AND root_quantity < 0 THEN 1 END)
+        FROM transactions WHERE storage = :storage AND date <= :end GROUP BY nomenclature"""
+
+    def __init__(self, data: dict, filename: str = "data/data.sqlite"):
+        self.__filename = filename
+        self.__lock = threading.RLock()
+        # Число транзакций, записанных в базу: для проверки актуальности
+        self.__transactions_count = 0
+
+        self.__connection = sqlite3.connect(filename, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        with self.__connection:
+            for statement in SqliteStorage.__schema:
+                self.__connection.execute(statement)
+
+        super().__init__(data)
+
+    @property
+    def filename(self) -> str:
+        return self.__filename
+
+    """
+    Полностью записать репозиторий в базу
+    """
+    def save_all(self):
+        with self.__lock, self.__connection:
+            for reference_type, (table, _) in SqliteStorage.__tables.items():
+                self.__connection.execute(f"DELETE FROM {table}")
+                self.__upsert(reference_type, list(self.data.get(reference_type, {}).values()))
+            self.__connection.execute("DELETE FROM ingredient")
+            self.__upsert_ingredients(list(self.data.get(Repository.recipe_key, {}).values()))
+
+            self._track()
+            self.__transactions_count = len(self.data.get(Repository.transaction_key, {}))
+
+        Logger.info("SqliteStorage", f"Репозиторий записан в {self.__filename}")
+
+    """
+    Загрузить репозиторий из базы
+    Возвращает True, если в базе были данные
+    """
+    def load(self) -> bool:
+        with self.__lock:
+            prepared = {}
+            for reference_type, (table, columns) in SqliteStorage.__tables.items():
+                names = [column for column in columns if column != "root_quantity"]
+                cursor = self.__connection.execute(f"SELECT {', '.join(names)} FROM {table}")
+                prepared[reference_type] = [dict(zip(names, row)) for row in cursor]
+
+            ingredients = {}
+            cursor = self.__connection.execute(
+                "SELECT recipe, id, name, nomenclature, count FROM ingredient ORDER BY recipe, position")
+            for recipe_id, ingredient_id, name, nomenclature_id, count in cursor:
+                ingredients.setdefault(recipe_id, []).append(
+                    {"id": ingredient_id, "name": name, "nomenclature": nomenclature_id, "count": count})
+            for record in prepared[Repository.recipe_key]:
+                record["ingredients"] = ingredients.get(record["id"], [])
+
+            if all(len(records) == 0 for records in prepared.values()):
+                return False
+
+            RepositoryLoader.load(self.data, prepared)
+            self._track()
+            self.__transactions_count = len(self.data[Repository.transaction_key])
+
+        Logger.info("SqliteStorage", f"Репозиторий загружен из {self.__filename}")
+        return True
+
+    """
+    Записать в базу расхождения транзакций с репозиторием (справочник транзакций изменили в обход событий)
+    Перезаписываются только добавленные, измененные и удаленные транзакции
+    """
+    def rebuild(self):
+        transactions = self.data.get(Repository.transaction_key, {})
+        table, columns = SqliteStorage.__tables[Repository.transaction_key]
+        with self.__lock, self.__connection:
+            stored = {row[0]: row for row in self.__connection.execute(f"SELECT {', '.join(columns)} FROM {table}")}
+            changed = [transaction for transaction in transactions.values()
+                       if stored.pop(transaction.id, None) != self.__row(Repository.transaction_key, transaction)]
+
+            self.__upsert(Repository.transaction_key, changed)
+            self.__connection.executemany(f"DELETE FROM {table} WHERE id = ?", ((item_id,) for item_id in stored))
+            super().rebuild()
+            self.__transactions_count = len(transactions)
+
+        Logger.debug("SqliteStorage", f"Транзакции сверены с базой: записано {len(changed)}, удалено {len(stored)}")
+
+    """
+    Суммы по парам (номенклатура, склад) за период [start_date, end_date)
+    Возвращает словарь: (код номенклатуры, код склада) -> [число транзакций, количество]
+    """
+    def pair_totals(self, start_date, end_date) -> dict:
+        self.ensure_actual()
+        start = "" if start_date is None else start_date.isoformat()
+
+        with self.__lock:
+            cursor = self.__connection.execute(SqliteStorage.__pair_totals_sql, (start, end_date.isoformat()))
+            return {(nomenclature_id, storage_id): [count, quantity]
+                    for nomenclature_id, storage_id, count, quantity in cursor}
+
+    """
+    Остатки по парам (номенклатура, склад) на дату включительно
+    Возвращает словарь: (код номенклатуры, код склада) -> количество
+    """
+    def balances(self, end_date, storage_id: str = None) -> dict:
+        self.ensure_actual()
+
+        with self.__lock:
+            if storage_id is None:
+                cursor = self.__connection.execute(SqliteStorage.__balances_sql, (end_date.isoformat(),))
+            else:
+                cursor = self.__connection.execute(SqliteStorage.__storage_balances_sql, (storage_id, end_date.isoformat()))
+
+            return {(nomenclature_id, storage): quantity for nomenclature_id, storage, quantity in cursor}
+
+    """
+    Обороты склада по номенклатурам за период
+    Возвращает словарь: код номенклатуры -> [начальный остаток, приход, расход]
+    """
+    def turnover(self, storage_id: str, start_date, end_date) -> dict:
+        self.ensure_actual()
+
+        with self.__lock:
+            cursor = self.__connection.execute(SqliteStorage.__turnover_sql, {
+                "storage": storage_id, "start": start_date.isoformat(), "end": end_date.isoformat()
+            })
+
+            result = {}
+            for nomenclature_id, start, income, outcome, *counts in cursor:
+                # Пустые группы остаются целым нулем, как при построчном расчете
+                result[nomenclature_id] = [value if count else 0 for value, count in zip([start, income, outcome], counts)]
+
+            return result
+
+    """
+    Закрыть соединение с базой
+    """
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+        self.release()
+
+    def _size(self, reference_type: str) -> int:
+        return self.__transactions_count
+
+    def __row(self, reference_type: str, item) -> tuple:
+        if reference_type == Repository.unit_measure_key:
+            return (item.id, item.name, item.coefficient, None if item.base_unit is None else item.base_unit.id)
+
+        if reference_type == Repository.group_nomenclature_key:
+            return (item.id, item.name)
+
+        if reference_type == Repository.nomenclature_key:
+            return (item.id, item.name, item.full_name, item.group_nomenclature.id, item.unit_measurement.id)
+
+        if reference_type == Repository.storage_key:
+            return (item.id, item.name, item.address)
+
+        if reference_type == Repository.recipe_key:
+            return (item.id, item.name, item.description)
+
+        return (item.id, item.date.isoformat(), item.nomenclature.id, item.storage.id, item.quantity, item.unit.id,
+                item.unit.convert_to_root_base_unit(item.quantity))
+
+    def __upsert(self, reference_type: str, items: list):
+        table, columns = SqliteStorage.__tables[reference_type]
+        placeholders = ", ".join("?" for _ in columns)
+        self.__connection.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+            (self.__row(reference_type, item) for item in items)
+        )
+
+    def __upsert_ingredients(self, recipes: list):
+        self.__connection.executemany(
+            "DELETE FROM ingredient WHERE recipe = ?", ((recipe.id,) for recipe in recipes))
+        self.__connection.executemany(
+            "INSERT OR REPLACE INTO ingredient (id, recipe, position, name, nomenclature, count) VALUES (?, ?, ?, ?, ?, ?)",
+            ((ingredient.id, recipe.id, position, ingredient.name, ingredient.nomenclature.id, ingredient.count)
+             for recipe in recipes for position, ingredient in enumerate(recipe.ingredients))
+        )
+
+    def __apply(self, reference_type: str, items: list):
+        table, _ = SqliteStorage.__tables[reference_type]
+        current = self.data.get(reference_type, {})
+
+        # Элемента нет в справочнике - событие об удалении
+        changed = [item for item in items if item.id in current]
+        deleted = [(item.id,) for item in items if item.id not in current]
+
+        with self.__lock, self.__connection:
+            self.__upsert(reference_type, changed)
+            self.__connection.executemany(f"DELETE FROM {table} WHERE id = ?", deleted)
+
+            if reference_type == Repository.recipe_key:
+                self.__connection.executemany("DELETE FROM ingredient WHERE recipe = ?", deleted)
+                self.__upsert_ingredients(changed)
+
+            if reference_type == Repository.unit_measure_key:
+                # Коэффициенты изменились - пересчитываем количества в корневых единицах
+                # только у транзакций, в цепочке единиц которых есть измененная
+                affected = self.__affected_units({item.id for item in items})
+                transactions = self.data.get(Repository.transaction_key, {})
+                self.__connection.executemany(
+                    "UPDATE transactions SET root_quantity = ? WHERE id = ?",
+                    ((transaction.unit.convert_to_root_base_unit(transaction.quantity), transaction.id)
+                     for transaction in transactions.values() if affected(transaction.unit))
+                )
+
+            if reference_type == Repository.transaction_key:
+                self._track()
+                self.__transactions_count = len(current)
+
+    @staticmethod
+    def __affected_units(changed_ids: set):
+        # Проверка единицы с запоминанием: цепочка каждой единицы проходится один раз
+        known = {}
+
+        def affected(unit) -> bool:
+            chain = []
+            while unit is not None and unit.id not in known:
+                if unit.id in changed_ids:
+                    break
+                chain.append(unit.id)
+                unit = unit.base_unit
+
+            result = unit is not None and (unit.id in changed_ids or known[unit.id])
+            for unit_id in chain:
+                known[unit_id] = result
+            return result
+
+        return affected
+
+    def _handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        reference_type, items = EventType.changed_items(event, params)
+        if reference_type in SqliteStorage.__tables and len(items) > 0:
+            self.__apply(reference_type, items)
@@ -5,6 +5,7 @@ from src.models.storage_model import StorageModel
 from src.models.transaction_model import TransactionModel
 from src.models.ingredient_model import IngredientModel
 from src.core.validator import OperationException, Validator
+from src.core.reference_dict import ReferenceDict
 from src.models.group_nomenclature_model import GroupNomenclatureModel
 from src.repository import Repository
 from src.models.unit_measurement_model import UnitMeasurement
@@ -15,12 +16,12 @@ class StartService():
     __repository: Repository = Repository()
     
     def __init__(self):
-        self.data[Repository.unit_measure_key] = {}
-        self.data[Repository.group_nomenclature_key] = {}
-        self.data[Repository.nomenclature_key] = {}
-        self.data[Repository.recipe_key] = {}
-        self.data[Repository.transaction_key] = {}
-        self.data[Repository.storage_key] = {}
+        self.data[Repository.unit_measure_key] = ReferenceDict()
+        self.data[Repository.group_nomenclature_key] = ReferenceDict()
+        self.data[Repository.nomenclature_key] = ReferenceDict()
+        self.data[Repository.recipe_key] = ReferenceDict()
+        self.data[Repository.transaction_key] = ReferenceDict()
+        self.data[Repository.storage_key] = ReferenceDict()
         self.data[Repository.balances_key] = []
         
 
@@ -0,0 +1,267 @@
+import math
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.event_type import EventType
+from src.core.validator import OperationException
+from src.repository import Repository
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TransactionColumns(AbstractDataStore):
+    """
+    Колоночное хранилище транзакций репозитория на массивах NumPy:
+        - даты (порядковые номера дней)
+        - коды номенклатур
+        - коды складов
+        - количества, приведенные к корневой единице измерения
+    Необязательное: используется только если установлен NumPy.
+    Синхронизируется с репозиторием по событиям изменения справочников
+    """
+
+    _sources = (Repository.transaction_key,)
+
+    def __init__(self, data: dict):
+        if not TransactionColumns.available():
+            raise OperationException("Для колоночного хранилища требуется numpy")
+
+        super().__init__(data)
+        self.rebuild()
+
+    """
+    Доступно ли колоночное хранилище (установлен ли NumPy)
+    """
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    """
+    Транзакции репозитория
+    """
+    @property
+    def transactions(self) -> dict:
+        return self.data.get(Repository.transaction_key, {})
+
+    """
+    Количество строк хранилища
+    """
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    """
+    Полностью перестроить колонки по данным репозитория
+    """
+    def rebuild(self):
+        super().rebuild()
+        transactions = self.transactions
+        self.__rows = {}
+        self.__ids = []
+        self.__nomenclature_codes = {}
+        self.__nomenclatures = []
+        self.__storage_codes = {}
+        self.__storages = []
+        self.__size = 0
+
+        capacity = max(len(transactions), 16)
+        self.__dates = np.zeros(capacity, dtype=np.int64)
+        self.__nomenclature_column = np.zeros(capacity, dtype=np.int64)
+        self.__storage_column = np.zeros(capacity, dtype=np.int64)
+        self.__quantities = np.zeros(capacity, dtype=np.float64)
+
+        for transaction in transactions.values():
+            self.__append(transaction)
+
+    """
+    Добавить или обновить строку транзакции
+    """
+    def update(self, transaction):
+        row = self.__rows.get(transaction.id)
+        if row is None:
+            self.__append(transaction)
+        else:
+            self.__write(row, transaction)
+
+    """
+    Удалить строку транзакции (последняя строка переносится на ее место)
+    """
+    def remove(self, transaction_id: str):
+        row = self.__rows.pop(transaction_id, None)
+        if row is None:
+            return
+
+        last = self.__size - 1
+        if row != last:
+            for column in self.__columns():
+                column[row] = column[last]
+
+            moved_id = self.__ids[last]
+            self.__ids[row] = moved_id
+            self.__rows[moved_id] = row
+
+        self.__ids.pop()
+        self.__size = last
+
+    """
+    Маска строк по периоду и складу
+        - start_date, end_date: границы периода (None - без ограничения)
+        - include_end: включать ли end_date в период
+    """
+    def mask(self, start_date = None, end_date = None, storage_id: str = None, include_end: bool = True):
+        self.ensure_actual()
+        dates = self.__dates[:self.__size]
+        result = np.ones(self.__size, dtype=bool)
+
+        if start_date is not None:
+            result &= dates >= start_date.toordinal()
+
+        if end_date is not None:
+            if include_end:
+                result &= dates <= end_date.toordinal()
+            else:
+                result &= dates < end_date.toordinal()
+
+        if storage_id is not None:
+            code = self.__storage_codes.get(storage_id)
+            if code is None:
+                return np.zeros(self.__size, dtype=bool)
+
+            result &= self.__storage_column[:self.__size] == code
+
+        return result
+
+    """
+    Суммы количеств по номенклатурам для строк маски
+    Возвращает список пар (номенклатура, количество) для номенклатур с движением
+    """
+    def totals(self, mask) -> list:
+        counts, sums = self.__group(mask)
+
+        result = []
+        for code in np.flatnonzero(counts):
+            result.append((self.__nomenclatures[code], float(sums[code])))
+
+        return result
+
+    """
+    Суммы количеств по парам (номенклатура, склад) для строк маски
+    Возвращает словарь: (id номенклатуры, id склада) -> [число транзакций, количество]
+    """
+    def pair_totals(self, mask) -> dict:
+        storages_count = max(len(self.__storages), 1)
+        pairs = self.__nomenclature_column[:self.__size][mask] * storages_count + self.__storage_column[:self.__size][mask]
+        length = len(self.__nomenclatures) * storages_count
+        counts = np.bincount(pairs, minlength=length)
+        sums = np.bincount(pairs, weights=self.__quantities[:self.__size][mask], minlength=length)
+
+        result = {}
+        for pair in np.flatnonzero(counts):
+            nomenclature = self.__nomenclatures[pair // storages_count]
+            storage = self.__storages[pair % storages_count]
+            result[(nomenclature.id, storage.id)] = [int(counts[pair]), float(sums[pair])]
+
+        return result
+
+    """
+    Обороты склада по номенклатурам за период
+    Возвращает словарь: код номенклатуры -> [начальный остаток, приход, расход]
+    """
+    def turnover(self, storage_id: str, start_date, end_date) -> dict:
+        storage_mask = self.mask(storage_id=storage_id)
+        dates = self.__dates[:self.__size]
+        quantities = self.__quantities[:self.__size]
+
+        before = storage_mask & (dates < start_date.toordinal())
+        period = storage_mask & (dates >= start_date.toordinal()) & (dates <= end_date.toordinal())
+
+        groups = [
+            self.__group(before),
+            self.__group(period & (quantities > 0)),
+            self.__group(period & (quantities < 0))
+        ]
+        touched = groups[0][0] + groups[1][0] + groups[2][0]
+
+        result = {}
+        for code in np.flatnonzero(touched):
+            # Пустые группы остаются целым нулем, как при построчном расчете
+            values = [float(sums[code]) if counts[code] else 0 for counts, sums in groups]
+            values[2] = -values[2] if values[2] else 0
+            result[self.__nomenclatures[code].id] = values
+
+        return result
+
+    def _size(self, reference_type: str) -> int:
+        return self.__size
+
+    def __group(self, mask) -> tuple:
+        length = len(self.__nomenclatures)
+        codes = self.__nomenclature_column[:self.__size][mask]
+        quantities = self.__quantities[:self.__size][mask]
+        counts = np.bincount(codes, minlength=length)
+
+        # Точная сумма группы (math.fsum) не зависит от порядка строк - как при построчном расчете отчета
+        order = np.argsort(codes, kind="stable")
+        ends = np.cumsum(counts)
+        sorted_quantities = quantities[order]
+        sums = np.zeros(length)
+        for code in np.flatnonzero(counts):
+            sums[code] = math.fsum(sorted_quantities[ends[code] - counts[code]:ends[code]].tolist())
+
+        return counts, sums
+
+    def __columns(self) -> list:
+        return [self.__dates, self.__nomenclature_column, self.__storage_column, self.__quantities]
+
+    def __append(self, transaction):
+        if self.__size == len(self.__dates):
+            self.__dates, self.__nomenclature_column, self.__storage_column, self.__quantities = [
+                np.concatenate([column, np.zeros_like(column)]) for column in self.__columns()
+            ]
+
+        row = self.__size
+        self.__size += 1
+        self.__rows[transaction.id] = row
+        self.__ids.append(transaction.id)
+        self.__write(row, transaction)
+
+    def __write(self, row: int, transaction):
+        self.__dates[row] = transaction.date.toordinal()
+        self.__nomenclature_column[row] = TransactionColumns.__code(
+            self.__nomenclature_codes, self.__nomenclatures, transaction.nomenclature)
+        self.__storage_column[row] = TransactionColumns.__code(
+            self.__storage_codes, self.__storages, transaction.storage)
+        self.__quantities[row] = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+
+    @staticmethod
+    def __code(codes: dict, items: list, item) -> int:
+        code = codes.get(item.id)
+        if code is None:
+            code = len(items)
+            codes[item.id] = code
+            items.append(item)
+
+        return code
+
+    def _handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        # Изменение единиц измерения меняет пересчет количеств в корневые единицы,
+        # пакет единиц требует одной перестройки
+        reference_type, items = EventType.changed_items(event, params)
+        if event == EventType.change_nomenclature_unit_key() or reference_type == Repository.unit_measure_key:
+            self.rebuild()
+            return
+
+        if reference_type != Repository.transaction_key:
+            return
+
+        # Событие могло прийти от другого репозитория
+        transactions = self.transactions
+        for item in items:
+            if item.id in transactions:
+                self.update(item)
+            else:
+                self.remove(item.id)
@@ -0,0 +1,292 @@
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.event_type import EventType
+from src.repository import Repository
+
+
+class TransactionIndex(AbstractDataStore):
+    """
+    Вторичные индексы транзакций репозитория:
+        - хэш-индекс по коду номенклатуры
+        - хэш-индекс по коду склада
+        - сортированный по дате индекс для каждой пары (номенклатура, склад)
+        - общий сортированный по дате индекс
+    Обновляется инкрементально по событиям изменения справочника транзакций
+    """
+
+    _sources = (Repository.transaction_key,)
+
+    def __init__(self, data: dict):
+        super().__init__(data)
+        self.rebuild()
+
+    """
+    Транзакции репозитория
+    """
+    @property
+    def transactions(self) -> dict:
+        return self.data.get(Repository.transaction_key, {})
+
+    """
+    Полностью перестроить индексы по данным репозитория
+    """
+    def rebuild(self):
+        super().rebuild()
+        self.__keys = {}
+        self.__by_nomenclature = {}
+        self.__by_storage = {}
+        self.__by_pair = {}
+        self.__by_date = ([], [])
+
+        # Сортированные индексы заполняются одной сортировкой на индекс, а не вставкой по одной
+        self.add_many(list(self.transactions.values()))
+
+    """
+    Добавить транзакцию в индексы
+    """
+    def add(self, transaction):
+        if transaction.id in self.__keys:
+            self.remove(transaction.id)
+
+        self.__insert(transaction)
+
+    """
+    Добавить пакет транзакций в индексы
+    Новые транзакции дописываются в конец сортированных индексов
+    и упорядочиваются одной сортировкой на пакет, а не вставкой по одной
+    """
+    def add_many(self, transactions: list):
+        fresh = []
+        for transaction in transactions:
+            if transaction.id in self.__keys:
+                self.add(transaction)
+            else:
+                fresh.append(transaction)
+
+        pairs = {}
+        for transaction in fresh:
+            nomenclature_id = transaction.nomenclature.id
+            storage_id = transaction.storage.id
+
+            self.__keys[transaction.id] = (nomenclature_id, storage_id, transaction.date)
+            self.__by_nomenclature.setdefault(nomenclature_id, {})[transaction.id] = transaction
+            self.__by_storage.setdefault(storage_id, {})[transaction.id] = transaction
+            pairs.setdefault((nomenclature_id, storage_id), []).append(transaction)
+
+        for key, items in pairs.items():
+            TransactionIndex.__merge_sorted(self.__by_pair.setdefault(key, ([], [])), items)
+        TransactionIndex.__merge_sorted(self.__by_date, fresh)
+
+    """
+    Переиндексировать транзакцию после изменения
+    """
+    def update(self, transaction):
+        self.add(transaction)
+
+    """
+    Убрать транзакцию из индексов
+    """
+    def remove(self, transaction_id: str):
+        key = self.__keys.pop(transaction_id, None)
+        if key is None:
+            return
+
+        nomenclature_id, storage_id, date = key
+        TransactionIndex.__remove_from_bucket(self.__by_nomenclature, nomenclature_id, transaction_id)
+        TransactionIndex.__remove_from_bucket(self.__by_storage, storage_id, transaction_id)
+
+        pair = self.__by_pair.get((nomenclature_id, storage_id))
+        if pair is not None:
+            TransactionIndex.__remove_sorted(pair, date, transaction_id)
+            if len(pair[0]) == 0:
+                del self.__by_pair[(nomenclature_id, storage_id)]
+
+        TransactionIndex.__remove_sorted(self.__by_date, date, transaction_id)
+
+    """
+    Убрать пакет транзакций из индексов
+    Сортированные индексы фильтруются один раз на пакет, а не поиском по одной
+    """
+    def remove_many(self, transaction_ids: list):
+        removed = set()
+        pairs = set()
+        for transaction_id in transaction_ids:
+            key = self.__keys.pop(transaction_id, None)
+            if key is None:
+                continue
+
+            nomenclature_id, storage_id, _ = key
+            TransactionIndex.__remove_from_bucket(self.__by_nomenclature, nomenclature_id, transaction_id)
+            TransactionIndex.__remove_from_bucket(self.__by_storage, storage_id, transaction_id)
+            pairs.add((nomenclature_id, storage_id))
+            removed.add(transaction_id)
+
+        if len(removed) == 0:
+            return
+
+        for pair in pairs:
+            index = self.__by_pair.get(pair)
+            if index is not None:
+                TransactionIndex.__filter_sorted(index, removed)
+                if len(index[0]) == 0:
+                    del self.__by_pair[pair]
+
+        TransactionIndex.__filter_sorted(self.__by_date, removed)
+
+    """
+    Транзакции по номенклатуре
+    """
+    def by_nomenclature(self, nomenclature_id: str) -> list:
+        self.ensure_actual()
+        return list(self.__by_nomenclature.get(nomenclature_id, {}).values())
+
+    """
+    Транзакции по складу
+    """
+    def by_storage(self, storage_id: str) -> list:
+        self.ensure_actual()
+        return list(self.__by_storage.get(storage_id, {}).values())
+
+    """
+    Транзакции по номенклатуре и складу в диапазоне дат (границы включительно)
+    """
+    def between(self, nomenclature_id: str, storage_id: str, start_date = None, end_date = None) -> list:
+        self.ensure_actual()
+        pair = self.__by_pair.get((nomenclature_id, storage_id))
+        if pair is None:
+            return []
+
+        return TransactionIndex.__slice(pair, start_date, end_date)
+
+    """
+    Транзакции по номенклатуре и складу строго до даты
+    """
+    def before(self, nomenclature_id: str, storage_id: str, date) -> list:
+        self.ensure_actual()
+        pair = self.__by_pair.get((nomenclature_id, storage_id))
+        if pair is None:
+            return []
+
+        dates, items = pair
+        return items[:bisect_left(dates, date)]
+
+    """
+    Все транзакции в диапазоне дат (границы включительно)
+    """
+    def all_between(self, start_date = None, end_date = None) -> list:
+        self.ensure_actual()
+        return TransactionIndex.__slice(self.__by_date, start_date, end_date)
+
+    """
+    Все транзакции за период [start_date, end_date) - правая граница не включается
+    """
+    def all_in_period(self, start_date, end_date) -> list:
+        self.ensure_actual()
+        dates, items = self.__by_date
+        return items[bisect_left(dates, start_date):bisect_left(dates, end_date)]
+
+    """
+    Все транзакции строго до даты
+    """
+    def all_before(self, date) -> list:
+        self.ensure_actual()
+        dates, items = self.__by_date
+        return items[:bisect_left(dates, date)]
+
+    """
+    Количество транзакций строго до даты
+    """
+    def count_before(self, date) -> int:
+        self.ensure_actual()
+        return bisect_left(self.__by_date[0], date)
+
+    def _size(self, reference_type: str) -> int:
+        return len(self.__keys)
+
+    def __insert(self, transaction):
+        nomenclature_id = transaction.nomenclature.id
+        storage_id = transaction.storage.id
+        date = transaction.date
+
+        self.__keys[transaction.id] = (nomenclature_id, storage_id, date)
+        self.__by_nomenclature.setdefault(nomenclature_id, {})[transaction.id] = transaction
+        self.__by_storage.setdefault(storage_id, {})[transaction.id] = transaction
+
+        pair = self.__by_pair.setdefault((nomenclature_id, storage_id), ([], []))
+        TransactionIndex.__insert_sorted(pair, date, transaction)
+        TransactionIndex.__insert_sorted(self.__by_date, date, transaction)
+
+    @staticmethod
+    def __insert_sorted(index: tuple, date, transaction):
+        dates, items = index
+        position = bisect_right(dates, date)
+        dates.insert(position, date)
+        items.insert(position, transaction)
+
+    @staticmethod
+    def __merge_sorted(index: tuple, transactions: list):
+        if len(transactions) == 0:
+            return
+
+        dates, items = index
+        # Сортировка устойчивая: при равных датах новые транзакции остаются после прежних
+        ordered = sorted(((transaction.date, transaction) for transaction in transactions), key=itemgetter(0))
+
+        if len(dates) == 0 or ordered[0][0] >= dates[-1]:
+            # Частый случай - пакет целиком позже индекса
+            merged = ordered
+        else:
+            merged = sorted(list(zip(dates, items)) + ordered, key=itemgetter(0))
+            dates.clear()
+            items.clear()
+
+        dates.extend(date for date, _ in merged)
+        items.extend(transaction for _, transaction in merged)
+
+    @staticmethod
+    def __remove_sorted(index: tuple, date, transaction_id: str):
+        dates, items = index
+        for position in range(bisect_left(dates, date), bisect_right(dates, date)):
+            if items[position].id == transaction_id:
+                del dates[position]
+                del items[position]
+                return
+
+    @staticmethod
+    def __filter_sorted(index: tuple, removed: set):
+        dates, items = index
+        kept = [(date, transaction) for date, transaction in zip(dates, items) if transaction.id not in removed]
+        dates[:] = [date for date, _ in kept]
+        items[:] = [transaction for _, transaction in kept]
+
+    @staticmethod
+    def __remove_from_bucket(buckets: dict, key: str, transaction_id: str):
+        bucket = buckets.get(key)
+        if bucket is None:
+            return
+
+        bucket.pop(transaction_id, None)
+        if len(bucket) == 0:
+            del buckets[key]
+
+    @staticmethod
+    def __slice(index: tuple, start_date, end_date) -> list:
+        dates, items = index
+        start = 0 if start_date is None else bisect_left(dates, start_date)
+        end = len(dates) if end_date is None else bisect_right(dates, end_date)
+        return items[start:end]
+
+    def _handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        reference_type, items = EventType.changed_items(event, params)
+        if reference_type != Repository.transaction_key:
+            return
+
+        # Пакет транзакций индексируется целиком
+        # Событие могло прийти от другого репозитория
+        transactions = self.transactions
+        self.add_many([item for item in items if item.id in transactions])
+        self.remove_many([item.id for item in items if item.id not in transactions])
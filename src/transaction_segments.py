@@ -0,0 +1,507 @@
+import datetime
+import json
+import os
+import struct
+from types import SimpleNamespace
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.event_type import EventType
+from src.core.filter_compiler import FilterCompiler
+from src.core.observe_service import ObserveService
+from src.dtos.filter_sorting_dto import FilterSortingDto
+from src.core.validator import Validator, ArgumentException, OperationException
+from src.core.logger import Logger
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TransactionSegments(AbstractDataStore):
+    """
+    Сегменты закрытого периода: транзакции до даты блокировки, перенесенные
+    из репозитория в неизменяемые файлы с записями фиксированной ширины.
+    Файлы отображаются в память (mmap), суммы считаются по представлениям NumPy
+    над отображением без копирования и без создания объектов транзакций.
+    В репозитории остаются только транзакции открытого периода.
+    Записи сегмента упорядочены по дате, файл называется по диапазону дат,
+    небольшой последний сегмент сливается со следующим переносом.
+    Необязательное: используется только если установлен NumPy
+    """
+
+    signature = b"TXSEGMNT"
+    version = 1
+
+    # Сегмент с меньшим числом записей сливается со следующим переносом
+    merge_records: int = 65536
+
+    # Заголовок: сигнатура, версия, длина описания, число записей,
+    # смещение записей, смещение и длина блока кодов транзакций
+    __header = struct.Struct("<8sHIQQQQ")
+
+    # Ссылочные колонки записей: колонка -> справочник
+    __columns = {
+        "nomenclature": Repository.nomenclature_key,
+        "storage": Repository.storage_key,
+        "unit": Repository.unit_measure_key
+    }
+
+    # Поля значений записей, по которым можно фильтровать сегменты
+    __values = ["date", "quantity"]
+
+    def __init__(self, data: dict, directory: str = "data/segments"):
+        if not TransactionSegments.available():
+            raise OperationException("Для сегментов транзакций требуется numpy")
+
+        Validator.validate(directory, str)
+        self.__directory = directory
+        self.__segments = []
+        super().__init__(data)
+
+    """
+    Доступны ли сегменты (установлен ли NumPy)
+    """
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    """
+    Запись сегмента: дата (порядковый номер дня), номера номенклатуры, склада
+    и единицы измерения в таблицах кодов сегмента, количество
+    """
+    @staticmethod
+    def record_type():
+        return np.dtype([("date", "<i4"), ("nomenclature", "<i4"), ("storage", "<i4"),
+                         ("unit", "<i4"), ("quantity", "<f8")])
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    """
+    Количество транзакций в сегментах
+    """
+    @property
+    def count(self) -> int:
+        return sum(len(segment["records"]) for segment in self.__segments)
+
+    """
+    Количество транзакций в сегментах до даты (не включая ее)
+    Двоичный поиск по отсортированным датам сегмента вместо прохода по записям
+    """
+    def count_before(self, date) -> int:
+        ordinal = date.toordinal()
+        count = 0
+        for segment in self.__segments:
+            if segment["last_date"] < date:
+                count += len(segment["records"])
+            else:
+                count += int(np.searchsorted(segment["dates"], ordinal, side="left"))
+
+        return count
+
+    """
+    Транзакции сегментов, восстановленные из записей (для выгрузки данных)
+    Ссылки берутся из справочников репозитория: удалять их, пока есть сегменты, нельзя
+    """
+    def transactions(self):
+        for segment in self.__segments:
+            tables = {column: [self.data.get(reference_type, {}).get(item_id) for item_id in segment[column]]
+                      for column, reference_type in TransactionSegments.__columns.items()}
+            records = segment["records"]
+
+            for item_id, record in zip(self.__ids(segment), records):
+                yield TransactionModel.restore(item_id, datetime.date.fromordinal(int(record["date"])),
+                                               tables["nomenclature"][record["nomenclature"]],
+                                               tables["storage"][record["storage"]], float(record["quantity"]),
+                                               tables["unit"][record["unit"]])
+
+    """
+    Открыть файлы сегментов каталога
+    Транзакции, которые уже есть в сегментах, удаляются из репозитория
+    (сбой между записью сегмента и сохранением репозитория)
+    Возвращает количество транзакций в сегментах
+    """
+    def open(self) -> int:
+        self.__segments = []
+        if os.path.isdir(self.__directory):
+            self.__recover()
+            for name in sorted(os.listdir(self.__directory)):
+                if name.endswith(".seg"):
+                    self.__segments.append(self.__map(os.path.join(self.__directory, name)))
+
+        # Коды транзакций читаются только для оставшихся в репозитории транзакций закрытого периода
+        last_date = max((segment["last_date"] for segment in self.__segments), default=None)
+        transactions = self.data.get(Repository.transaction_key, {})
+        candidates = [] if last_date is None else \
+            [transaction.id for transaction in transactions.values() if transaction.date <= last_date]
+
+        if len(candidates) > 0:
+            sealed = set()
+            for segment in self.__segments:
+                sealed.update(self.__ids(segment))
+
+            moved = [transactions.pop(transaction_id) for transaction_id in candidates if transaction_id in sealed]
+            self.__moved(moved)
+
+        Logger.info("TransactionSegments", f"Открыто сегментов: {len(self.__segments)}, транзакций: {self.count}")
+        return self.count
+
+    """
+    Удалить файлы сегментов (например, при генерации данных заново)
+    """
+    def clear(self):
+        self.__segments = []
+        if not os.path.isdir(self.__directory):
+            return
+
+        for name in os.listdir(self.__directory):
+            if name.endswith((".seg", ".merge", ".tmp")):
+                os.remove(os.path.join(self.__directory, name))
+
+    """
+    Перенести транзакции до даты (не включая ее) из репозитория в сегмент
+    Сегмент называется по диапазону дат; последний сегмент меньше merge_records записей
+    и сегмент с тем же именем сливаются с новым
+    Возвращает количество перенесенных транзакций
+    """
+    def seal(self, until) -> int:
+        Validator.validate(until, datetime.date)
+        transactions = self.data.get(Repository.transaction_key, {})
+        sealed = [transaction for transaction in transactions.values() if transaction.date < until]
+        if len(sealed) == 0:
+            return 0
+
+        os.makedirs(self.__directory, exist_ok=True)
+        part = self.__pack(sealed)
+
+        merged = []
+        if len(self.__segments) > 0 and len(self.__segments[-1]["records"]) < TransactionSegments.merge_records:
+            merged.append(self.__segments[-1])
+
+        # Имя определяется диапазоном дат: сегмент с тем же именем тоже сливается
+        while True:
+            first_date = min([part["first_date"]] + [segment["first_date"] for segment in merged])
+            last_date = max([part["last_date"]] + [segment["last_date"] for segment in merged])
+            filename = self.__filename(first_date, last_date)
+            clash = next((segment for segment in self.__segments
+                          if segment["filename"] == filename and all(segment is not other for other in merged)), None)
+            if clash is None:
+                break
+            merged.append(clash)
+
+        if len(merged) > 0:
+            part = TransactionSegments.__combine([self.__unpack(segment) for segment in merged] + [part])
+
+        self.__write(filename, part, [segment["filename"] for segment in merged])
+        self.__segments = [segment for segment in self.__segments if all(segment is not other for other in merged)]
+        self.__segments.append(self.__map(filename))
+        self.__segments.sort(key=lambda segment: (segment["first_date"], segment["filename"]))
+
+        for transaction in sealed:
+            transactions.pop(transaction.id)
+        self.__moved(sealed)
+
+        Logger.info("TransactionSegments", f"В сегмент {filename} перенесено транзакций: {len(sealed)}")
+        return len(sealed)
+
+    """
+    Суммы по парам (номенклатура, склад) за период [start_date, end_date)
+    Возвращает словарь: (код номенклатуры, код склада) -> [число транзакций, количество]
+    """
+    def pair_totals(self, start_date, end_date) -> dict:
+        totals = {}
+
+        for segment in self.__segments:
+            records = segment["records"]
+            mask = records["date"] < end_date.toordinal()
+            if start_date is not None:
+                mask &= records["date"] >= start_date.toordinal()
+
+            storages = len(segment["storage"])
+            keys = records["nomenclature"][mask].astype(np.int64) * storages + records["storage"][mask]
+            counts = np.bincount(keys, minlength=len(segment["nomenclature"]) * storages)
+            sums = np.bincount(keys, weights=self.__root_quantities(segment, mask), minlength=len(counts))
+
+            for key in np.flatnonzero(counts):
+                pair = (segment["nomenclature"][key // storages], segment["storage"][key % storages])
+                current = totals.setdefault(pair, [0, 0.0])
+                current[0] += int(counts[key])
+                current[1] += float(sums[key])
+
+        return totals
+
+    """
+    Остатки по парам (номенклатура, склад) на дату включительно
+    Возвращает словарь: (код номенклатуры, код склада) -> количество
+    """
+    def balances(self, date, storage_id: str = None) -> dict:
+        balances = {}
+        end_date = date + datetime.timedelta(days=1)
+
+        for (nomenclature_id, storage), (count, quantity) in self.pair_totals(None, end_date).items():
+            if storage_id is None or storage == storage_id:
+                balances[(nomenclature_id, storage)] = quantity
+
+        return balances
+
+    """
+    Обороты склада по номенклатурам за период
+    Фильтры по полям транзакций применяются к записям так же, как к транзакциям репозитория
+    Возвращает словарь: код номенклатуры -> [начальный остаток, приход, расход]
+    """
+    def turnover(self, storage_id: str, start_date, end_date, filters: FilterSortingDto = None) -> dict:
+        # Суммы и число транзакций: пустые группы остаются целым нулем, как при построчном расчете
+        groups = {}
+
+        for segment in self.__segments:
+            if storage_id not in segment["storage"]:
+                continue
+
+            records = segment["records"]
+            storage_mask = records["storage"] == segment["storage"].index(storage_id)
+            if filters is not None:
+                storage_mask &= self.__filter_mask(segment, filters)
+            dates = records["date"]
+            quantities = np.zeros(len(records))
+            quantities[storage_mask] = self.__root_quantities(segment, storage_mask)
+
+            before = storage_mask & (dates < start_date.toordinal())
+            period = storage_mask & (dates >= start_date.toordinal()) & (dates <= end_date.toordinal())
+            masks = [before, period & (quantities > 0), period & (quantities < 0)]
+
+            length = len(segment["nomenclature"])
+            codes = records["nomenclature"]
+            counted = [(np.bincount(codes[mask], minlength=length),
+                        np.bincount(codes[mask], weights=quantities[mask], minlength=length)) for mask in masks]
+
+            touched = counted[0][0] + counted[1][0] + counted[2][0]
+            for code in np.flatnonzero(touched):
+                group = groups.setdefault(segment["nomenclature"][code], [[0, 0.0] for _ in masks])
+                for values, (counts, sums) in zip(group, counted):
+                    values[0] += int(counts[code])
+                    values[1] += float(sums[code])
+
+        result = {}
+        for nomenclature_id, group in groups.items():
+            values = [quantity if count else 0 for count, quantity in group]
+            values[2] = -values[2] if values[2] else 0
+            result[nomenclature_id] = values
+
+        return result
+
+    """
+    Закрыть отображения файлов
+    """
+    def close(self):
+        self.__segments = []
+        self.release()
+
+    def __filename(self, first_date, last_date) -> str:
+        return os.path.join(self.__directory, f"segment-{first_date:%Y%m%d}-{last_date:%Y%m%d}.seg")
+
+    def __pack(self, transactions: list) -> dict:
+        # Ссылки хранятся номерами в таблицах кодов сегмента
+        part = {"records": np.zeros(len(transactions), dtype=TransactionSegments.record_type()),
+                "ids": [transaction.id for transaction in transactions],
+                "first_date": min(transaction.date for transaction in transactions),
+                "last_date": max(transaction.date for transaction in transactions)}
+        records = part["records"]
+        records["date"] = [transaction.date.toordinal() for transaction in transactions]
+        records["quantity"] = [transaction.quantity for transaction in transactions]
+
+        for column in TransactionSegments.__columns:
+            references = [getattr(transaction, column).id for transaction in transactions]
+            part[column] = list(dict.fromkeys(references))
+            codes = {item_id: code for code, item_id in enumerate(part[column])}
+            records[column] = [codes[item_id] for item_id in references]
+
+        return part
+
+    def __unpack(self, segment: dict) -> dict:
+        part = {column: segment[column] for column in TransactionSegments.__columns}
+        part.update(records=np.array(segment["records"]), ids=self.__ids(segment),
+                    first_date=segment["first_date"], last_date=segment["last_date"])
+        return part
+
+    @staticmethod
+    def __combine(parts: list) -> dict:
+        # Таблицы кодов объединяются, номера в записях переводятся в номера общей таблицы
+        result = {"records": np.concatenate([part["records"] for part in parts]),
+                  "ids": [item_id for part in parts for item_id in part["ids"]],
+                  "first_date": min(part["first_date"] for part in parts),
+                  "last_date": max(part["last_date"] for part in parts)}
+
+        for column in TransactionSegments.__columns:
+            table = list(dict.fromkeys(item_id for part in parts for item_id in part[column]))
+            codes = {item_id: code for code, item_id in enumerate(table)}
+            recoded = [np.array([codes[item_id] for item_id in part[column]], dtype=np.int32)[part["records"][column]]
+                       if len(part["records"]) > 0 else np.zeros(0, dtype=np.int32) for part in parts]
+            result["records"][column] = np.concatenate(recoded)
+            result[column] = table
+
+        return result
+
+    def __write(self, filename: str, part: dict, merged: list):
+        # Записи упорядочиваются по дате: количество до даты считается двоичным поиском
+        order = np.argsort(part["records"]["date"], kind="stable")
+        records = part["records"][order]
+        ids = "\n".join(part["ids"][position] for position in order).encode("utf-8")
+
+        meta = json.dumps(dict({column: part[column] for column in TransactionSegments.__columns},
+                               first_date=part["first_date"].isoformat(), last_date=part["last_date"].isoformat(),
+                               merged=[os.path.basename(name) for name in merged]),
+                          ensure_ascii=False).encode("utf-8")
+
+        # Записи выравниваются по 8 байт для представления без копирования
+        records_offset = TransactionSegments.__header.size + len(meta)
+        records_offset += -records_offset % 8
+        ids_offset = records_offset + records.nbytes
+
+        # Сегмент неизменяем: файл записывается целиком и только потом появляется под своим именем.
+        # Слияние проходит через файл .merge: после сбоя open заканчивает замену слитых сегментов
+        with open(filename + ".tmp", 'wb') as file:
+            file.write(TransactionSegments.__header.pack(TransactionSegments.signature, TransactionSegments.version,
+                                                          len(meta), len(records), records_offset, ids_offset, len(ids)))
+            file.write(meta)
+            file.write(b"\0" * (records_offset - TransactionSegments.__header.size - len(meta)))
+            file.write(records.tobytes())
+            file.write(ids)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(filename + ".tmp", filename + ".merge")
+        self.__finish_merge(filename + ".merge", merged)
+
+    def __finish_merge(self, pending: str, merged: list):
+        filename = pending[:-len(".merge")]
+        for name in merged:
+            path = os.path.join(self.__directory, os.path.basename(name))
+            if path != filename and os.path.exists(path):
+                os.remove(path)
+
+        os.replace(pending, filename)
+
+    def __recover(self):
+        # Незаконченная запись удаляется, законченное слияние доводится до конца
+        for name in os.listdir(self.__directory):
+            path = os.path.join(self.__directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)
+            elif name.endswith(".merge"):
+                with open(path, 'rb') as file:
+                    header = TransactionSegments.__header.unpack(file.read(TransactionSegments.__header.size))
+                    meta = json.loads(file.read(header[2]).decode("utf-8"))
+                self.__finish_merge(path, meta.get("merged", []))
+
+    def __map(self, filename: str) -> dict:
+        with open(filename, 'rb') as file:
+            header = file.read(TransactionSegments.__header.size)
+            if len(header) < TransactionSegments.__header.size:
+                raise ArgumentException(f"Файл {filename} не является сегментом транзакций")
+
+            signature, version, meta_length, count, records_offset, ids_offset, ids_length = \
+                TransactionSegments.__header.unpack(header)
+            if signature != TransactionSegments.signature:
+                raise ArgumentException(f"Файл {filename} не является сегментом транзакций")
+            if version != TransactionSegments.version:
+                raise ArgumentException(f"Неподдерживаемая версия сегмента: {version}")
+
+            meta = json.loads(file.read(meta_length).decode("utf-8"))
+
+        records = np.memmap(filename, dtype=TransactionSegments.record_type(), mode="r",
+                            offset=records_offset, shape=(count,)) if count > 0 \
+            else np.zeros(0, dtype=TransactionSegments.record_type())
+
+        # Сегменты прежних версий могут быть не упорядочены по дате - для поиска хранится отсортированная копия
+        dates = records["date"]
+        if count > 1 and not bool(np.all(dates[1:] >= dates[:-1])):
+            dates = np.sort(dates)
+
+        return dict(meta, filename=filename, records=records, ids_offset=ids_offset, ids_length=ids_length,
+                    dates=dates, first_date=datetime.date.fromisoformat(meta["first_date"]),
+                    last_date=datetime.date.fromisoformat(meta["last_date"]))
+
+    def __ids(self, segment: dict) -> list:
+        with open(segment["filename"], 'rb') as file:
+            file.seek(segment["ids_offset"])
+            return file.read(segment["ids_length"]).decode("utf-8").split("\n")
+
+    def __filter_mask(self, segment: dict, filters: FilterSortingDto):
+        """
+        Маска записей сегмента, подходящих под фильтры транзакций
+        Фильтры проверяются не по записям, а по таблицам кодов сегмента
+        (номенклатуры, склады, единицы) и по различным значениям даты и количества
+        """
+        groups = {}
+        for filter in filters.filters:
+            field = filter["field_name"].split("/")[0]
+            if field not in TransactionSegments.__columns and field not in TransactionSegments.__values:
+                raise OperationException(f"Фильтр по полю {filter['field_name']} не применяется к транзакциям закрытого периода")
+            groups.setdefault(field, []).append(filter)
+
+        records = segment["records"]
+        mask = np.ones(len(records), dtype=bool)
+
+        for field, group in groups.items():
+            plan, values = FilterCompiler.compile(FilterSortingDto(group, []))
+            match = plan.predicate(values)
+
+            if field in TransactionSegments.__columns:
+                references = self.data.get(TransactionSegments.__columns[field], {})
+                items = [references.get(item_id) for item_id in segment[field]]
+                codes = records[field]
+            else:
+                distinct, codes = np.unique(records[field], return_inverse=True)
+                items = [datetime.date.fromordinal(int(value)) if field == "date" else float(value)
+                         for value in distinct]
+
+            candidates = [None if item is None else SimpleNamespace(**{field: item}) for item in items]
+            for candidate in candidates:
+                if candidate is not None:
+                    plan.validate(candidate)
+                    break
+
+            accepted = np.array([candidate is not None and match(candidate) for candidate in candidates], dtype=bool)
+            if len(accepted) > 0:
+                mask &= accepted[codes]
+
+        return mask
+
+    def __root_quantities(self, segment: dict, mask):
+        # Коэффициенты единиц берутся из справочника на момент расчета
+        units = self.data.get(Repository.unit_measure_key, {})
+        factors = np.array([units[unit_id].convert_to_root_base_unit(1.0) if unit_id in units else 1.0
+                            for unit_id in segment["unit"]], dtype=np.float64)
+        records = segment["records"]
+        return records["quantity"][mask] * factors[records["unit"][mask]]
+
+    def __moved(self, transactions: list):
+        # Хранилища убирают перенесенные транзакции по событию, а не перестраиваются целиком
+        if len(transactions) == 0:
+            return
+
+        ObserveService.create_event(EventType.seal_transactions_key(), {
+            "reference_type": Repository.transaction_key,
+            "items": transactions
+        })
+
+    def _handle(self, event: str, params):
+        """
+        Обработчик событий
+        """
+        # Удалять элементы, на которые ссылаются транзакции закрытого периода, нельзя
+        if event != EventType.delete_reference_type_key() or not isinstance(params, dict):
+            return
+
+        column = next((column for column, reference_type in TransactionSegments.__columns.items()
+                       if reference_type == params.get("reference_type")), None)
+        if column is None:
+            return
+
+        items = self.data.get(params["reference_type"], {})
+        item_id = items.resolve(params.get("item_id")) if hasattr(items, "resolve") else params.get("item_id")
+        if any(item_id in segment[column] for segment in self.__segments):
+            raise OperationException(f"Элемент {params.get('item_id')} используется в транзакциях закрытого периода")
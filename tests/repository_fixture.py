@@ -0,0 +1,42 @@
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.storage_model import StorageModel
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.repository import Repository
+
+
+class RepositoryFixture:
+    """
+    Небольшой репозиторий для тестов индексов, хранилищ и сервисов:
+    группа ingredients, грамм и килограмм, мука и сахар, два склада.
+    Транзакции добавляются тестом через add_transaction
+    """
+
+    def __init__(self):
+        self.group = GroupNomenclatureModel()
+        self.group.name = "ingredients"
+        self.gramm = UnitMeasurement.create_gramm()
+        self.kilogramm = UnitMeasurement.create_kilo(self.gramm)
+        self.flour = NomenclatureModel("flour", "wheat flour", self.group, self.gramm)
+        self.sugar = NomenclatureModel("sugar", "granulated sugar", self.group, self.gramm)
+        self.first_storage = StorageModel("Первый склад", "Улица Мира 1")
+        self.second_storage = StorageModel("Второй склад", "Улица Мира 2")
+
+        self.data = {
+            Repository.nomenclature_key: {self.flour.id: self.flour, self.sugar.id: self.sugar},
+            Repository.storage_key: {self.first_storage.id: self.first_storage, self.second_storage.id: self.second_storage},
+            Repository.unit_measure_key: {self.gramm.id: self.gramm, self.kilogramm.id: self.kilogramm},
+            Repository.group_nomenclature_key: {self.group.id: self.group},
+            Repository.recipe_key: {},
+            Repository.transaction_key: {},
+            Repository.balances_key: []
+        }
+
+    """
+    Создать транзакцию и добавить ее в репозиторий без событий
+    """
+    def add_transaction(self, date, nomenclature, storage, quantity: float, unit = None) -> TransactionModel:
+        transaction = TransactionModel(date, nomenclature, storage, quantity, unit or self.gramm)
+        self.data[Repository.transaction_key][transaction.id] = transaction
+        return transaction
@@ -0,0 +1,92 @@
+import unittest
+from src.core.abstract_data_store import AbstractDataStore
+from src.core.observe_service import ObserveService
+from src.repository import Repository
+
+
+class TransactionsCounter(AbstractDataStore):
+    """Хранилище для проверки: число транзакций репозитория"""
+
+    _sources = (Repository.transaction_key,)
+
+    def __init__(self, data: dict):
+        super().__init__(data)
+        self.rebuilds = 0
+        self.rebuild()
+
+    def rebuild(self):
+        super().rebuild()
+        self.rebuilds += 1
+        self.count = len(self.data.get(Repository.transaction_key, {}))
+
+    def _size(self, reference_type: str) -> int:
+        return self.count
+
+    def _handle(self, event: str, params):
+        pass
+
+
+class TestAbstractDataStore(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        self.data = {Repository.transaction_key: {"1": None}}
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def test_get_returns_one_store_per_data(self):
+        # Подготовка
+        other = {Repository.transaction_key: {}}
+
+        # Действие
+        store = TransactionsCounter.get(self.data)
+
+        # Проверка
+        assert TransactionsCounter.get(self.data) is store
+        assert TransactionsCounter.find(self.data) is store
+        assert TransactionsCounter.find(other) is None
+        assert TransactionsCounter.get(other) is not store
+        assert store in ObserveService.handlers
+
+    def test_release_detaches_store_from_data(self):
+        # Подготовка
+        store = TransactionsCounter.get(self.data)
+
+        # Действие
+        store.release()
+
+        # Проверка
+        assert TransactionsCounter.find(self.data) is None
+        assert store not in ObserveService.handlers
+        assert TransactionsCounter.get(self.data) is not store
+
+    def test_get_replaces_store_unsubscribed_from_events(self):
+        # Подготовка
+        store = TransactionsCounter.get(self.data)
+
+        # Действие
+        ObserveService.delete(store)
+
+        # Проверка
+        assert TransactionsCounter.find(self.data) is None
+        assert TransactionsCounter.get(self.data) is not store
+
+    def test_ensure_actual_rebuilds_after_changes_bypassing_events(self):
+        # Подготовка
+        store = TransactionsCounter.get(self.data)
+        store.ensure_actual()
+        rebuilds = store.rebuilds
+
+        # Действие
+        self.data[Repository.transaction_key]["2"] = None
+        store.ensure_actual()
+
+        # Проверка
+        assert store.rebuilds == rebuilds + 1
+        assert store.count == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
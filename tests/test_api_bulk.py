@@ -0,0 +1,166 @@
+import unittest
+import importlib
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from src.core.observe_service import ObserveService
+from src.logics.transaction_ingest import TransactionIngest
+from src.repository import Repository
+
+try:
+    import connexion
+except ImportError:
+    connexion = None
+
+
+@unittest.skipUnless(connexion is not None, "Для тестов API требуется connexion")
+class TestApiBulk(unittest.TestCase):
+    """Тесты пакетного добавления (/api/<reference_type>/bulk) и потоковой загрузки транзакций"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Приложение запускается в отдельном каталоге: файлы данных и журналы пишутся туда"""
+        cls.directory = tempfile.mkdtemp()
+        cls.cwd = os.getcwd()
+
+        with open(os.path.join(cls.cwd, "settings.json"), 'r', encoding='utf-8') as file:
+            settings = json.load(file)
+        settings.update({"first_start": True, "log_level": "ERROR", "log_mode": "console",
+                         "persistence_mode": "snapshot", "save_interval_ms": None})
+        with open(os.path.join(cls.directory, "settings.json"), 'w', encoding='utf-8') as file:
+            json.dump(settings, file)
+        os.makedirs(os.path.join(cls.directory, "data"))
+        os.makedirs(os.path.join(cls.directory, "logs"))
+
+        os.chdir(cls.directory)
+        ObserveService.handlers.clear()
+        cls.main = importlib.import_module("main")
+        cls.client = cls.main.app.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Очистка после тестов"""
+        os.chdir(cls.cwd)
+        ObserveService.handlers.clear()
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def __storages(self) -> dict:
+        return self.main.start_service.data[Repository.storage_key]
+
+    def __storage_lines(self, prefix: str, count: int) -> list:
+        return [json.dumps({"id": f"{prefix}-{number}", "name": f"Склад {number}", "address": "Улица Мира 1"})
+                for number in range(count)]
+
+    def test_bulk_json_array_adds_all_items(self):
+        # Подготовка
+        items = [{"id": f"array-{number}", "name": f"Склад {number}", "address": "Улица Мира 1"} for number in range(3)]
+
+        # Действие
+        response = self.client.put("/api/storage/bulk", json=items)
+
+        # Проверка
+        assert response.status_code == 201
+        assert response.get_json()["ids"] == [item["id"] for item in items]
+        assert all(item["id"] in self.__storages() for item in items)
+
+    def test_bulk_json_array_with_invalid_item_adds_nothing(self):
+        # Подготовка
+        items = [{"id": "atomic-0", "name": "Склад", "address": "Улица Мира 1"}, {"id": "atomic-1", "name": "Склад"}]
+
+        # Действие
+        response = self.client.put("/api/storage/bulk", json=items)
+
+        # Проверка
+        assert response.status_code == 400
+        assert "atomic-0" not in self.__storages()
+
+    def test_bulk_ndjson_adds_items_in_batches(self):
+        # Подготовка - пять строк при пакете из двух элементов
+        lines = self.__storage_lines("stream", 5)
+        calls = []
+        add_bulk = self.main.reference_service.add_bulk
+
+        def counted(reference_type, items_data):
+            calls.append(len(items_data))
+            return add_bulk(reference_type, items_data)
+
+        # Действие
+        with patch.object(self.main, "bulk_batch_size", 2), \
+                patch.object(self.main.reference_service, "add_bulk", side_effect=counted):
+            response = self.client.put("/api/storage/bulk", data="\n".join(lines) + "\n",
+                                       content_type="application/x-ndjson")
+
+        # Проверка
+        assert response.status_code == 201
+        assert response.get_json()["count"] == 5
+        assert calls == [2, 2, 1]
+        assert all(f"stream-{number}" in self.__storages() for number in range(5))
+
+    def test_bulk_ndjson_bad_line_reports_line_and_committed_items(self):
+        # Подготовка - ошибка в четвертой строке, первый пакет уже добавлен
+        lines = self.__storage_lines("partial", 3) + ["{broken"] + self.__storage_lines("after", 1)
+
+        # Действие
+        with patch.object(self.main, "bulk_batch_size", 2):
+            response = self.client.put("/api/storage/bulk", data="\n".join(lines),
+                                       content_type="application/x-ndjson")
+
+        # Проверка
+        body = response.get_json()
+        assert response.status_code == 400
+        assert body["line"] == 4
+        assert body["count"] == 2
+        assert body["ids"] == ["partial-0", "partial-1"]
+        assert "partial-1" in self.__storages()
+        assert "partial-2" not in self.__storages()
+        assert "after-0" not in self.__storages()
+
+    def test_bulk_ndjson_empty_stream_returns_bad_request(self):
+        # Действие
+        response = self.client.put("/api/storage/bulk", data="\n", content_type="application/x-ndjson")
+
+        # Проверка
+        assert response.status_code == 400
+
+    def test_ingest_bad_line_reports_line_and_committed_count(self):
+        # Подготовка - пакеты по две транзакции, ошибка в пятой строке
+        data = self.main.start_service.data
+        transaction = next(iter(data[Repository.transaction_key].values()))
+        row = {"nomenclature_id": transaction.nomenclature.id, "storage_id": transaction.storage.id,
+               "quantity": 1, "unit_id": transaction.unit.id}
+        lines = [json.dumps(dict(row, date=f"2025-11-{day:02d}")) for day in range(1, 5)]
+        lines.append(json.dumps(dict(row, date="01.11.2025")))
+        count = len(data[Repository.transaction_key])
+
+        # Действие
+        with patch.object(self.main, "transaction_ingest", TransactionIngest(self.main.reference_service, batch_size=2)):
+            response = self.client.put("/api/transaction/ingest", data="\n".join(lines),
+                                       content_type="application/x-ndjson")
+
+        # Проверка
+        body = response.get_json()
+        assert response.status_code == 400
+        assert body["line"] == 5
+        assert body["count"] == 4
+        assert len(data[Repository.transaction_key]) == count + 4
+
+    def test_ingest_csv_adds_transactions(self):
+        # Подготовка
+        data = self.main.start_service.data
+        transaction = next(iter(data[Repository.transaction_key].values()))
+        body = "date,nomenclature_id,storage_id,quantity,unit_id\n" + "".join(
+            f"2025-12-{day:02d},{transaction.nomenclature.id},{transaction.storage.id},2,{transaction.unit.id}\n"
+            for day in range(1, 4))
+
+        # Действие
+        response = self.client.put("/api/transaction/ingest", data=body, content_type="text/csv")
+
+        # Проверка
+        assert response.status_code == 201
+        assert response.get_json()["count"] == 3
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import unittest
+import datetime
+from unittest.mock import patch
+from src.balance_checkpoints import BalanceCheckpoints
+from src.core.event_type import EventType
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from tests.repository_fixture import RepositoryFixture
+
+
+class TestBalanceCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        fixture = RepositoryFixture()
+        self.gramm = fixture.gramm
+        self.kilogramm = fixture.kilogramm
+        self.flour = fixture.flour
+        self.first_storage = fixture.first_storage
+        self.second_storage = fixture.second_storage
+        self.data = fixture.data
+
+        for transaction_date, storage, quantity, unit in [
+            (datetime.date(2025, 8, 15), self.first_storage, 10.0, self.gramm),
+            (datetime.date(2025, 9, 1), self.first_storage, 2.0, self.kilogramm),
+            (datetime.date(2025, 9, 20), self.second_storage, 5.0, self.gramm),
+            (datetime.date(2025, 10, 5), self.first_storage, -100.0, self.gramm),
+        ]:
+            fixture.add_transaction(transaction_date, self.flour, storage, quantity, unit)
+
+        self.checkpoints = BalanceCheckpoints(self.data)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def __add(self, transaction: TransactionModel) -> TransactionModel:
+        self.data[Repository.transaction_key][transaction.id] = transaction
+        return transaction
+
+    def __notify(self, transaction: TransactionModel):
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": Repository.transaction_key, "item": transaction
+        })
+
+    def __brute_force(self, end_date: datetime.date) -> dict:
+        result = {}
+        for transaction in self.data[Repository.transaction_key].values():
+            if transaction.date <= end_date:
+                key = (transaction.nomenclature.id, transaction.storage.id)
+                quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+                result[key] = result.get(key, 0) + quantity
+        return result
+
+    def test_rebuild_checkpoints_on_month_starts(self):
+        # Подготовка
+
+        # Действие
+        result = self.checkpoints.dates
+
+        # Проверка
+        assert result == [
+            datetime.date(2025, 8, 1),
+            datetime.date(2025, 9, 1),
+            datetime.date(2025, 10, 1),
+            datetime.date(2025, 11, 1)
+        ]
+
+    def test_balances_any_date_matches_full_scan(self):
+        # Подготовка
+        dates = [
+            datetime.date(2025, 7, 1),
+            datetime.date(2025, 8, 15),
+            datetime.date(2025, 9, 1),
+            datetime.date(2025, 9, 30),
+            datetime.date(2025, 10, 5),
+            datetime.date(2026, 1, 1)
+        ]
+
+        # Действие & Проверка
+        for end_date in dates:
+            with self.subTest(end_date=end_date):
+                assert self.checkpoints.balances(end_date) == self.__brute_force(end_date)
+
+    def test_balances_storage_returns_only_storage_pairs(self):
+        # Подготовка
+
+        # Действие
+        result = self.checkpoints.balances(datetime.date(2025, 9, 30), self.second_storage.id)
+
+        # Проверка
+        assert result == {(self.flour.id, self.second_storage.id): 5.0}
+
+    def test_handle_changed_quantity_shifts_later_checkpoints(self):
+        # Подготовка
+        changed = list(self.data[Repository.transaction_key].values())[0]
+        changed.quantity = 40.0
+
+        # Действие
+        self.__notify(changed)
+
+        # Проверка
+        for end_date in [datetime.date(2025, 8, 31), datetime.date(2025, 10, 31)]:
+            assert self.checkpoints.balances(end_date) == self.__brute_force(end_date)
+
+    def test_handle_transaction_events_keep_checkpoints_actual(self):
+        # Подготовка
+        added = self.__add(TransactionModel(datetime.date(2025, 8, 20), self.flour, self.first_storage, 7.0, self.gramm))
+        outside = self.__add(TransactionModel(datetime.date(2026, 2, 1), self.flour, self.first_storage, 1.0, self.gramm))
+
+        # Действие
+        self.__notify(added)
+        self.__notify(outside)
+        added.quantity = 3.0
+        self.__notify(added)
+        removed = self.data[Repository.transaction_key].pop(outside.id)
+        self.__notify(removed)
+
+        # Проверка
+        end_date = datetime.date(2026, 3, 1)
+        assert self.checkpoints.balances(end_date) == self.__brute_force(end_date)
+        assert self.checkpoints.balances(datetime.date(2025, 9, 1)) == self.__brute_force(datetime.date(2025, 9, 1))
+
+    def test_handle_later_transaction_extends_ladder_without_rebuild(self):
+        # Подготовка
+        later = self.__add(TransactionModel(datetime.date(2026, 1, 10), self.flour, self.second_storage, 4.0, self.gramm))
+        earlier = self.__add(TransactionModel(datetime.date(2025, 6, 3), self.flour, self.first_storage, 6.0, self.gramm))
+
+        # Действие
+        with patch.object(self.checkpoints, "rebuild", wraps=self.checkpoints.rebuild) as rebuild:
+            self.__notify(later)
+            self.__notify(earlier)
+            dates = self.checkpoints.dates
+            balances = {
+                end_date: self.checkpoints.balances(end_date)
+                for end_date in [datetime.date(2025, 6, 30), datetime.date(2025, 12, 31), datetime.date(2026, 1, 31)]
+            }
+
+        # Проверка
+        rebuild.assert_not_called()
+        assert dates[0] == datetime.date(2025, 6, 1)
+        assert dates[-1] == datetime.date(2026, 2, 1)
+        for end_date, result in balances.items():
+            assert result == self.__brute_force(end_date)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,16 @@
 import unittest
 import datetime
+import json
+import os
+import tempfile
 from datetime import date
 from src.logics.balances_manager import BalancesManager
+from src.core.event_type import EventType
+from src.core.observe_service import ObserveService
+from src.core.validator import OperationException
+from src.logics.reference_service import ReferenceService
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.transaction_model import TransactionModel
 from src.repository import Repository
 from src.start_service import StartService
 
@@ -199,4 +208,295 @@ class TestBalancesManager(unittest.TestCase):
         # Проверка
         assert isinstance(initial_balances, list)
         assert isinstance(recalculated_balances, list)
-        # После изменения даты блокировки балансы должны пересчитаться
\ No newline at end of file
+        # После изменения даты блокировки балансы должны пересчитаться
+
+    def test_move_block_period_matches_full_recalculation(self):
+        # Подготовка
+        def to_dict(balances):
+            return {balance["nomenclature"]["id"]: round(balance["balance"], 6) for balance in balances}
+
+        self.__balances_manager.calculation_balances_up_blocking_date()
+        forward = datetime.date(2025, 10, 30)
+        backward = datetime.date(2025, 10, 27)
+
+        # Действие
+        moved_forward = self.__balances_manager.move_block_period(forward)
+        expected_forward = BalancesManager(self.__start_service.data, forward).calculation_balances_up_blocking_date()
+        moved_backward = self.__balances_manager.move_block_period(backward)
+        expected_backward = BalancesManager(self.__start_service.data, backward).calculation_balances_up_blocking_date()
+
+        # Проверка
+        assert self.__balances_manager.block_period == backward
+        assert to_dict(moved_forward) == to_dict(expected_forward)
+        assert to_dict(moved_backward) == to_dict(expected_backward)
+
+    def test_calculation_balances_by_date_reuses_unchanged_block_rows(self):
+        # Подготовка
+        target_date = datetime.date(2025, 10, 29)
+        data = dict(self.__start_service.data)
+        data[Repository.transaction_key] = {}
+        for transaction in self.__start_service.transactions.values():
+            data[Repository.transaction_key][transaction.id] = transaction
+
+        # Номенклатура без движения после даты блокировки
+        source = list(self.__start_service.transactions.values())[0]
+        nomenclature = NomenclatureModel("salt", "table salt", source.nomenclature.group_nomenclature, source.unit)
+        data[Repository.nomenclature_key] = dict(data[Repository.nomenclature_key], salt=nomenclature)
+        unchanged = TransactionModel(datetime.date(2025, 10, 1), nomenclature, source.storage, 3.0, source.unit)
+        data[Repository.transaction_key][unchanged.id] = unchanged
+
+        balances_manager = BalancesManager(data, self.block_period)
+        block_rows = {row["nomenclature"]["id"]: row for row in balances_manager.calculation_balances_up_blocking_date()}
+        expected = {}
+        for transaction in data[Repository.transaction_key].values():
+            if transaction.date <= target_date:
+                quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+                expected[transaction.nomenclature.id] = expected.get(transaction.nomenclature.id, 0) + quantity
+
+        # Действие
+        result = balances_manager.calculation_balances_by_date(target_date)
+
+        # Проверка
+        rows = {row["nomenclature"]["id"]: row for row in result}
+        assert {key: round(row["balance"], 6) for key, row in rows.items()} == \
+            {key: round(value, 6) for key, value in expected.items()}
+        assert rows[nomenclature.id] is block_rows[nomenclature.id]
+        changed = rows[source.nomenclature.id]
+        if source.nomenclature.id in block_rows:
+            assert changed is not block_rows[source.nomenclature.id]
+            assert changed["nomenclature"] is block_rows[source.nomenclature.id]["nomenclature"]
+
+    def test_calculation_balances_by_date_few_changes_skip_checkpoints(self):
+        # Подготовка - транзакций после даты блокировки не больше строк снимка
+        block_period = datetime.date(2025, 10, 30)
+        target_date = datetime.date(2025, 10, 31)
+        data = dict(self.__start_service.data)
+        nomenclatures = {item.id for item in data[Repository.nomenclature_key].values()}
+        data[Repository.transaction_key] = {key: transaction
+            for key, transaction in self.__start_service.transactions.items()
+            if transaction.nomenclature.id in nomenclatures}
+        balances_manager = BalancesManager(data, block_period)
+        balances_manager.calculation_balances_up_blocking_date()
+        checkpoints = balances_manager.checkpoints
+        calls = []
+        original = checkpoints.balances
+        checkpoints.balances = lambda *args: calls.append(args) or original(*args)
+        expected = {}
+        for transaction in data[Repository.transaction_key].values():
+            if transaction.date <= target_date:
+                quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+                expected[transaction.nomenclature.id] = expected.get(transaction.nomenclature.id, 0) + quantity
+
+        # Действие
+        result = balances_manager.calculation_balances_by_date(target_date)
+        del checkpoints.balances
+
+        # Проверка
+        assert calls == []
+        assert {row["nomenclature"]["id"]: round(row["balance"], 6) for row in result} == \
+            {key: round(value, 6) for key, value in expected.items()}
+
+    def test_calculation_balances_by_date_rows_are_read_only(self):
+        # Подготовка
+        target_date = datetime.date(2025, 10, 29)
+        balances_manager = BalancesManager(self.__start_service.data, self.block_period)
+        expected = json.dumps(balances_manager.calculation_balances_by_date(target_date))
+        rows = balances_manager.calculation_balances_by_date(target_date)
+
+        # Действие & Проверка - строки на дату блокировки общие для всех запросов
+        for row in rows:
+            with self.assertRaises(OperationException):
+                row["balance"] = 0
+            with self.assertRaises(OperationException):
+                row["nomenclature"]["name"] = ""
+        assert json.dumps(balances_manager.calculation_balances_by_date(target_date)) == expected
+
+    def test_calculation_balances_by_storage_returns_storage_balances(self):
+        # Подготовка
+        target_date = datetime.date(2025, 10, 29)
+        storage = self.__start_service.storages["Первый склад"]
+        expected = {}
+        for transaction in self.__start_service.transactions.values():
+            if transaction.storage.id == storage.id and transaction.date <= target_date:
+                quantity = transaction.unit.convert_to_root_base_unit(transaction.quantity)
+                expected[transaction.nomenclature.id] = expected.get(transaction.nomenclature.id, 0) + quantity
+
+        # Действие
+        result = self.__balances_manager.calculation_balances_by_storage(storage.id, target_date)
+        other = self.__balances_manager.calculation_balances_by_storage(self.__start_service.storages["Второй склад"].id, target_date)
+
+        # Проверка
+        assert {row["nomenclature"]["id"]: round(row["balance"], 6) for row in result} == \
+            {key: round(value, 6) for key, value in expected.items()}
+        assert all(row["storage"] == storage.id for row in result)
+        assert other == []
+
+    def test_calculation_balances_by_storage_cached_until_transaction_change(self):
+        # Подготовка
+        target_date = datetime.date(2025, 10, 29)
+        source = list(self.__start_service.transactions.values())[0]
+        checkpoints = self.__balances_manager.checkpoints
+        calls = []
+        original = checkpoints.balances
+        checkpoints.balances = lambda *args: calls.append(args) or original(*args)
+
+        # Действие
+        first = self.__balances_manager.calculation_balances_by_storage(source.storage.id, target_date)
+        second = self.__balances_manager.calculation_balances_by_storage(source.storage.id, target_date)
+        added = TransactionModel(datetime.date(2025, 10, 1), source.nomenclature, source.storage, 1.0, source.unit)
+        self.__start_service.transactions[added.id] = added
+        self.__balances_manager.handle(EventType.change_reference_type_key(), {
+            "reference_type": Repository.transaction_key, "item": added
+        })
+        third = self.__balances_manager.calculation_balances_by_storage(source.storage.id, target_date)
+        del checkpoints.balances
+        self.__start_service.transactions.pop(added.id)
+
+        # Проверка
+        assert len(calls) == 2
+        assert first == second
+        assert sum(row["balance"] for row in third) == \
+            sum(row["balance"] for row in first) + source.unit.convert_to_root_base_unit(1.0)
+
+    def test_save_snapshot_load_restores_balances_without_recalculation(self):
+        # Подготовка
+        snapshot_file = os.path.join(tempfile.mkdtemp(), "balances_snapshot.json")
+        source = BalancesManager(self.__start_service.data, self.block_period, snapshot_file)
+        expected = source.calculation_balances_up_blocking_date()
+
+        # Действие
+        loaded = BalancesManager(self.__start_service.data, self.block_period, snapshot_file)
+        is_loaded = loaded.load_snapshot()
+
+        # Проверка
+        assert is_loaded
+        assert loaded.calculation_balances_by_date(self.block_period) == expected
+        os.remove(snapshot_file)
+
+    def test_load_snapshot_other_block_period_returns_false(self):
+        # Подготовка
+        snapshot_file = os.path.join(tempfile.mkdtemp(), "balances_snapshot.json")
+        BalancesManager(self.__start_service.data, self.block_period, snapshot_file).calculation_balances_up_blocking_date()
+
+        # Действие
+        loaded = BalancesManager(self.__start_service.data, datetime.date(2025, 10, 30), snapshot_file)
+
+        # Проверка
+        assert loaded.load_snapshot() == False
+        os.remove(snapshot_file)
+
+    def test_load_snapshot_without_pair_counts_returns_false(self):
+        # Подготовка - снимок прежнего формата: строки без числа транзакций
+        snapshot_file = os.path.join(tempfile.mkdtemp(), "balances_snapshot.json")
+        source = BalancesManager(self.__start_service.data, self.block_period, snapshot_file)
+        source.calculation_balances_up_blocking_date()
+        with open(snapshot_file, 'r', encoding='utf-8') as file:
+            content = json.load(file)
+        for balance in content["balances"]:
+            del balance["count"]
+        with open(snapshot_file, 'w', encoding='utf-8') as file:
+            json.dump(content, file)
+
+        # Действие
+        loaded = BalancesManager(self.__start_service.data, self.block_period, snapshot_file)
+
+        # Проверка
+        assert loaded.load_snapshot() == False
+        os.remove(snapshot_file)
+
+    def test_handle_open_period_transaction_change_keeps_snapshot(self):
+        # Подготовка
+        data = self.__start_service.data
+        self.__balances_manager.calculation_balances_up_blocking_date()
+        source = list(self.__start_service.transactions.values())[0]
+        opened = TransactionModel(datetime.date(2025, 11, 5), source.nomenclature, source.storage, 1.0, source.unit)
+        closed = TransactionModel(datetime.date(2025, 10, 1), source.nomenclature, source.storage, 1.0, source.unit)
+        before = {row["nomenclature"]["id"]: row["balance"] for row in data[Repository.balances_key]}
+        recalculated = []
+        self.__balances_manager.calculation_balances_up_blocking_date = lambda: recalculated.append(True)
+
+        # Действие
+        data[Repository.transaction_key][opened.id] = opened
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": Repository.transaction_key, "item": opened
+        })
+        opened_balances = {row["nomenclature"]["id"]: row["balance"] for row in data[Repository.balances_key]}
+        data[Repository.transaction_key][closed.id] = closed
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": Repository.transaction_key, "item": closed
+        })
+
+        # Проверка - снимок сдвинут на вклад транзакции закрытого периода без пересчета
+        result = {row["nomenclature"]["id"]: row["balance"] for row in data[Repository.balances_key]}
+        assert recalculated == []
+        assert opened_balances == before
+        self.assertAlmostEqual(result[source.nomenclature.id],
+                               before.get(source.nomenclature.id, 0) + source.unit.convert_to_root_base_unit(1.0))
+        del data[Repository.transaction_key][opened.id]
+        del data[Repository.transaction_key][closed.id]
+        ObserveService.handlers.clear()
+
+    def test_calculation_balances_by_date_matches_recalculation_across_months(self):
+        # Подготовка - оборот после даты блокировки захватывает целые месяцы
+        data = dict(self.__start_service.data)
+        data[Repository.transaction_key] = dict(self.__start_service.transactions)
+        source = list(self.__start_service.transactions.values())[0]
+        for month in range(1, 6):
+            transaction = TransactionModel(datetime.date(2026, month, 15), source.nomenclature,
+                                           source.storage, float(month), source.unit)
+            data[Repository.transaction_key][transaction.id] = transaction
+        balances_manager = BalancesManager(data, self.block_period)
+
+        for target_date in (datetime.date(2025, 11, 30), datetime.date(2026, 3, 1), datetime.date(2026, 5, 20)):
+            # Действие
+            result = balances_manager.calculation_balances_by_date(target_date)
+            expected = BalancesManager(data, target_date + datetime.timedelta(days=1)) \
+                .calculation_balances_up_blocking_date()
+
+            # Проверка
+            assert {row["nomenclature"]["id"]: round(row["balance"], 6) for row in result} == \
+                {row["nomenclature"]["id"]: round(row["balance"], 6) for row in expected}
+
+    def test_edit_closed_transaction_quantity_updates_snapshot(self):
+        # Подготовка - менеджер подписан на события раньше хранилищ транзакций
+        ObserveService.handlers.clear()
+        data = self.__start_service.data
+        manager = BalancesManager(data, self.block_period)
+        manager.calculation_balances_up_blocking_date()
+        transaction = next(transaction for transaction in data[Repository.transaction_key].values()
+                           if transaction.date < self.block_period)
+
+        # Действие
+        ReferenceService(data).update(Repository.transaction_key, transaction.id,
+                                      {"quantity": transaction.quantity + 1000})
+
+        # Проверка
+        result = {row["nomenclature"]["id"]: row["balance"] for row in data[Repository.balances_key]}
+        expected = sum(item.unit.convert_to_root_base_unit(item.quantity)
+                       for item in data[Repository.transaction_key].values()
+                       if item.date < self.block_period and item.nomenclature.id == transaction.nomenclature.id)
+        self.assertAlmostEqual(result[transaction.nomenclature.id], expected)
+        ObserveService.handlers.clear()
+
+    def test_move_closed_transaction_into_open_period_updates_snapshot(self):
+        # Подготовка
+        data = self.__start_service.data
+        manager = BalancesManager(data, self.block_period)
+        manager.calculation_balances_up_blocking_date()
+        transaction = next(transaction for transaction in data[Repository.transaction_key].values()
+                           if transaction.date < self.block_period)
+        nomenclature_id = transaction.nomenclature.id
+
+        # Действие
+        ReferenceService(data).update(Repository.transaction_key, transaction.id, {"date": "2025-12-01"})
+
+        # Проверка
+        result = {row["nomenclature"]["id"]: row["balance"] for row in data[Repository.balances_key]}
+        closed = [item.unit.convert_to_root_base_unit(item.quantity)
+                  for item in data[Repository.transaction_key].values()
+                  if item.date < self.block_period and item.nomenclature.id == nomenclature_id]
+        if len(closed) == 0:
+            assert nomenclature_id not in result
+        else:
+            self.assertAlmostEqual(result[nomenclature_id], sum(closed))
+        ObserveService.handlers.clear()
@@ -0,0 +1,139 @@
+import unittest
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+from src.binary_snapshot import BinarySnapshot
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.core.validator import ArgumentException
+from src.data_manager import DataManager
+from src.logics.reference_service import ReferenceService
+from src.models.storage_model import StorageModel
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestBinarySnapshot(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        ObserveService.handlers.clear()
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.data = self.start_service.data
+
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.bin")
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_save_load_restores_repository(self):
+        # Подготовка
+        BinarySnapshot.save(self.data, self.filename, 7)
+        data = {}
+
+        # Действие
+        sequence = BinarySnapshot.load(data, self.filename)
+
+        # Проверка
+        assert sequence == 7
+        for reference_type in [Repository.unit_measure_key, Repository.nomenclature_key,
+                               Repository.recipe_key, Repository.transaction_key]:
+            assert set(data[reference_type].keys()) == {item.id for item in self.data[reference_type].values()}
+
+        for unit in self.data[Repository.unit_measure_key].values():
+            restored = data[Repository.unit_measure_key][unit.id]
+            assert restored.coefficient == unit.coefficient
+            assert (restored.base_unit is None) == (unit.base_unit is None)
+
+        for transaction in self.data[Repository.transaction_key].values():
+            restored = data[Repository.transaction_key][transaction.id]
+            assert restored.date == transaction.date
+            assert restored.quantity == transaction.quantity
+            assert restored.nomenclature is data[Repository.nomenclature_key][transaction.nomenclature.id]
+            assert restored.unit is data[Repository.unit_measure_key][transaction.unit.id]
+
+    def test_snapshot_smaller_than_json(self):
+        # Подготовка
+        json_filename = os.path.join(self.directory, "data.json")
+
+        # Действие
+        BinarySnapshot.save(self.data, self.filename)
+        DataManager(self.data, json_filename).save_data_to_file()
+
+        # Проверка
+        assert os.path.getsize(self.filename) < os.path.getsize(json_filename)
+
+    def test_load_unsupported_version_raises_exception(self):
+        # Подготовка
+        BinarySnapshot.save(self.data, self.filename)
+        with open(self.filename, 'r+b') as file:
+            file.seek(len(BinarySnapshot.signature))
+            file.write(b"\xff\x00")
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            BinarySnapshot.load({}, self.filename)
+
+    def test_load_snapshot_with_class_reference_raises_exception(self):
+        # Подготовка - вместо данных в файле ссылка на функцию, которую pickle вызвал бы при загрузке
+        with open(self.filename, 'wb') as file:
+            file.write(struct.pack("<8sH", BinarySnapshot.signature, BinarySnapshot.version))
+            file.write(pickle.dumps(os.getcwd, protocol=5))
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            BinarySnapshot.load({}, self.filename)
+
+    def test_load_version_1_snapshot_with_reference_records(self):
+        # Подготовка - в версии 1 справочники хранились записями
+        BinarySnapshot.save(self.data, self.filename, 3)
+        with open(self.filename, 'rb') as file:
+            file.seek(struct.calcsize("<8sH"))
+            payload = pickle.load(file)
+        loaded = {}
+        BinarySnapshot.load(loaded, self.filename)
+        payload["references"] = {reference_type: [DataManager(loaded, self.filename, observe=False).convert(item)
+                                                  for item in loaded[reference_type].values()]
+                                 for reference_type in payload["references"]}
+        with open(self.filename, 'wb') as file:
+            file.write(struct.pack("<8sH", BinarySnapshot.signature, 1))
+            pickle.dump(payload, file, protocol=5)
+        data = {}
+
+        # Действие
+        sequence = BinarySnapshot.load(data, self.filename)
+
+        # Проверка
+        assert sequence == 3
+        kilo = next(unit for unit in data[Repository.unit_measure_key].values() if unit.base_unit is not None)
+        assert kilo.base_unit is data[Repository.unit_measure_key][kilo.base_unit.id]
+        assert set(data[Repository.transaction_key].keys()) == set(self.data[Repository.transaction_key].keys())
+
+    def test_data_manager_restores_binary_snapshot_and_journal(self):
+        # Подготовка
+        journal_filename = os.path.join(self.directory, "journal.ndjson")
+        manager = DataManager(self.data, self.filename, journal_filename=journal_filename,
+                              fsync="never", snapshot_format="binary")
+        manager.compact()
+        storage = StorageModel("Новый склад", "Улица Мира 5")
+        ReferenceService(self.data).add(Repository.storage_key, storage)
+        data = {}
+
+        # Действие
+        loaded = DataManager(data, self.filename, journal_filename=journal_filename, snapshot_format="binary").load()
+
+        # Проверка
+        assert loaded == True
+        assert storage.id in data[Repository.storage_key]
+        assert len(data[Repository.transaction_key]) == len(self.data[Repository.transaction_key])
+
+
+if __name__ == "__main__":
+    unittest.main()
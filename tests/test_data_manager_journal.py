@@ -0,0 +1,132 @@
+import unittest
+import datetime
+import os
+import shutil
+import tempfile
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.data_manager import DataManager
+from src.logics.reference_service import ReferenceService
+from src.models.storage_model import StorageModel
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestDataManagerJournal(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        ObserveService.handlers.clear()
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.data = self.start_service.data
+
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.json")
+        self.journal_filename = os.path.join(self.directory, "journal.ndjson")
+        self.manager = DataManager(self.data, self.filename, journal_filename=self.journal_filename, fsync="never")
+        self.manager.compact()
+        self.service = ReferenceService(self.data)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __restore(self) -> dict:
+        """Загрузить репозиторий из снимка и журнала в новый набор данных"""
+        data = {}
+        DataManager(data, self.filename, journal_filename=self.journal_filename).load()
+        return data
+
+    def __journal_lines(self) -> list:
+        with open(self.journal_filename, 'r', encoding='utf-8') as file:
+            return file.readlines()
+
+    def test_change_appends_one_journal_record(self):
+        # Подготовка
+        snapshot_time = os.path.getmtime(self.filename)
+        storage = StorageModel("Новый склад", "Улица Мира 5")
+
+        # Действие
+        self.service.add(Repository.storage_key, storage)
+
+        # Проверка
+        assert len(self.__journal_lines()) == 1
+        assert self.manager.journal_records == 1
+        assert os.path.getmtime(self.filename) == snapshot_time
+
+    def test_load_replays_snapshot_and_journal(self):
+        # Подготовка
+        storage = StorageModel("Новый склад", "Улица Мира 5")
+        nomenclature = list(self.start_service.nomenclatures.values())[0]
+        self.service.add(Repository.storage_key, storage)
+        transaction = TransactionModel(datetime.date(2025, 11, 3), nomenclature, storage, 7.0,
+                                       nomenclature.unit_measurement)
+        self.service.add(Repository.transaction_key, transaction)
+        self.service.update(Repository.storage_key, storage.id, {"address": "Улица Мира 7"})
+        removed = list(self.start_service.transactions.values())[0]
+        self.service.delete(Repository.transaction_key, removed.id)
+
+        # Действие
+        data = self.__restore()
+
+        # Проверка
+        assert data[Repository.storage_key][storage.id].address == "Улица Мира 7"
+        restored = data[Repository.transaction_key][transaction.id]
+        assert restored.date == datetime.date(2025, 11, 3)
+        assert restored.storage is data[Repository.storage_key][storage.id]
+        assert removed.id not in data[Repository.transaction_key]
+        assert len(data[Repository.transaction_key]) == len(self.data[Repository.transaction_key])
+
+    def test_compact_after_record_limit_truncates_journal(self):
+        # Подготовка
+        ObserveService.handlers.clear()
+        manager = DataManager(self.data, self.filename, journal_filename=self.journal_filename,
+                              fsync="never", compact_records=3)
+        service = ReferenceService(self.data)
+
+        # Действие
+        for number in range(4):
+            service.add(Repository.storage_key, StorageModel(f"Склад {number}", "Улица Мира 9"))
+
+        # Проверка
+        assert len(self.__journal_lines()) == 1
+        assert manager.journal_records == 1
+        assert len(self.__restore()[Repository.storage_key]) == len(self.data[Repository.storage_key])
+
+    def test_load_ignores_torn_last_record(self):
+        # Подготовка
+        storage = StorageModel("Новый склад", "Улица Мира 5")
+        self.service.add(Repository.storage_key, storage)
+        with open(self.journal_filename, 'a', encoding='utf-8') as file:
+            file.write('{"seq": 99, "op": "put", "type": "sto')
+
+        # Действие
+        data = self.__restore()
+
+        # Проверка
+        assert storage.id in data[Repository.storage_key]
+        assert self.__journal_lines() == []
+
+    def test_load_skips_records_already_in_snapshot(self):
+        # Подготовка - сбой между сохранением снимка и очисткой журнала
+        storage = StorageModel("Новый склад", "Улица Мира 5")
+        self.service.add(Repository.storage_key, storage)
+        self.service.delete(Repository.storage_key, storage.id)
+        journal = self.__journal_lines()
+        self.manager.compact()
+        with open(self.journal_filename, 'w', encoding='utf-8') as file:
+            file.writelines(journal)
+
+        # Действие
+        data = self.__restore()
+
+        # Проверка
+        assert storage.id not in data[Repository.storage_key]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import unittest
+import datetime
+import os
+import shutil
+import tempfile
+import json
+import time
+from src.core.event_type import EventType
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.data_manager import DataManager
+from src.logics.balances_manager import BalancesManager
+from src.logics.journal_persistence import JournalPersistence
+from src.logics.reference_service import ReferenceService
+from src.logics.sync_persistence import SyncPersistence
+from src.logics.write_behind_persistence import WriteBehindPersistence
+from src.repository import Repository
+from src.settings_manager import SettingsManager
+from src.start_service import StartService
+
+
+class TestDataManagerWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        ObserveService.handlers.clear()
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.start_service.balances = BalancesManager(
+            self.start_service.data, datetime.date(2025, 10, 28)
+        ).calculation_balances_up_blocking_date()
+
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.json")
+        self.storage = list(self.start_service.storages.values())[0]
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __change(self):
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": Repository.storage_key, "item": self.storage
+        })
+
+    def __wait_flushes(self, manager: DataManager, flushes: int):
+        deadline = time.time() + 5
+        while manager.metrics["flushes"] < flushes and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_without_interval_saves_on_each_change(self):
+        # Подготовка
+        manager = DataManager(self.start_service.data, self.filename)
+
+        # Действие
+        self.__change()
+
+        # Проверка
+        assert os.path.exists(self.filename)
+        assert manager.pending_changes == 0
+
+    def test_persistence_strategy_follows_arguments(self):
+        # Подготовка
+        journal_filename = os.path.join(self.directory, "journal.ndjson")
+
+        # Действие
+        sync = DataManager(self.start_service.data, self.filename)
+        write_behind = DataManager(self.start_service.data, self.filename, flush_interval_ms=60000)
+        journaled = DataManager(self.start_service.data, self.filename, journal_filename=journal_filename)
+
+        # Проверка
+        assert isinstance(sync.persistence, SyncPersistence)
+        assert isinstance(write_behind.persistence, WriteBehindPersistence)
+        assert isinstance(journaled.persistence, JournalPersistence)
+        assert [sync.write_behind, sync.journaled] == [False, False]
+        assert [write_behind.write_behind, journaled.journaled] == [True, True]
+        write_behind.shutdown()
+        journaled.shutdown()
+
+    def test_without_observe_saves_only_on_flush(self):
+        # Подготовка
+        manager = DataManager(self.start_service.data, self.filename, observe=False)
+
+        # Действие
+        self.__change()
+        saved = os.path.exists(self.filename)
+        flushed = manager.flush()
+
+        # Проверка
+        assert manager not in ObserveService.handlers
+        assert not saved
+        assert flushed
+        assert os.path.exists(self.filename)
+
+    def test_burst_of_changes_is_coalesced_until_shutdown(self):
+        # Подготовка
+        manager = DataManager(self.start_service.data, self.filename, flush_interval_ms=60000)
+
+        # Действие
+        for _ in range(1000):
+            self.__change()
+        pending = manager.pending_changes
+        written_before_shutdown = os.path.exists(self.filename)
+        result = manager.shutdown()
+
+        # Проверка
+        assert pending == 1000
+        assert written_before_shutdown == False
+        assert result == True
+        assert os.path.exists(self.filename)
+        assert manager.metrics["flushes"] == 1
+        assert manager.metrics["pending_changes"] == 0
+
+    def test_flush_after_max_changes(self):
+        # Подготовка
+        manager = DataManager(self.start_service.data, self.filename, flush_interval_ms=60000, flush_max_changes=5)
+
+        # Действие
+        for _ in range(5):
+            self.__change()
+        self.__wait_flushes(manager, 1)
+
+        # Проверка
+        metrics = manager.metrics
+        assert metrics["flushes"] == 1
+        assert metrics["pending_changes"] == 0
+        assert metrics["last_flush_latency_ms"] > 0
+        manager.shutdown()
+
+    def test_flush_after_interval(self):
+        # Подготовка
+        manager = DataManager(self.start_service.data, self.filename, flush_interval_ms=50)
+
+        # Действие
+        self.__change()
+        self.__wait_flushes(manager, 1)
+
+        # Проверка
+        assert os.path.exists(self.filename)
+        assert manager.metrics["flushes"] == 1
+        manager.shutdown()
+
+
+    def test_worker_writes_records_captured_at_change(self):
+        # Подготовка
+        manager = DataManager(self.start_service.data, self.filename, flush_interval_ms=60000)
+        address = self.storage.address
+        self.__change()
+
+        # Действие - изменение в обход событий фоновый поток не видит
+        self.storage.address = "Изменено без события"
+        manager.persistence._WriteBehindPersistence__write()
+        with open(self.filename, 'r', encoding='utf-8') as file:
+            saved = json.load(file)
+        self.storage.address = address
+        manager.shutdown()
+
+        # Проверка
+        record = next(record for record in saved[Repository.storage_key] if record["id"] == self.storage.id)
+        assert record["address"] == address
+
+    def test_saved_file_contains_snapshot_of_the_same_changes(self):
+        # Подготовка
+        data = self.start_service.data
+        balances = BalancesManager(data, datetime.date(2025, 10, 28))
+        balances.calculation_balances_up_blocking_date()
+        manager = DataManager(data, self.filename, flush_interval_ms=60000)
+        manager.attach("balances_snapshot", balances.snapshot_content)
+        transaction = next(transaction for transaction in data[Repository.transaction_key].values()
+                           if transaction.date < balances.block_period)
+
+        # Действие
+        ReferenceService(data).update(Repository.transaction_key, transaction.id,
+                                      {"quantity": transaction.quantity + 1000})
+        manager.shutdown()
+        loaded = DataManager({}, self.filename, observe=False)
+        loaded.load()
+
+        # Проверка
+        assert manager in ObserveService.handlers[-1:]
+        snapshot = loaded.attachment("balances_snapshot")
+        restored = BalancesManager(loaded.data, balances.block_period)
+        assert restored.load_snapshot(snapshot)
+        assert restored.calculation_balances_by_date(balances.block_period) == \
+            balances.calculation_balances_by_date(balances.block_period)
+
+    def test_write_behind_is_off_by_default(self):
+        # Подготовка & Действие
+        settings = SettingsManager("settings.json").settings
+
+        # Проверка
+        assert settings.save_interval_ms in (None, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ from src.models.group_nomenclature_model import GroupNomenclatureModel
 from src.models.unit_measurement_model import UnitMeasurement
 from src.models.recipe_model import RecipeModel
 from src.logics.factory_convert import FactoryConvert
+from src.core.common import common
 
 
 class TestFactoryConvert(unittest.TestCase):
@@ -191,6 +192,39 @@ class TestFactoryConvert(unittest.TestCase):
         self.assertIn("coefficient", result)
         self.assertNotIn("base_unit", result)  # Не должно быть base_unit поля
 
+    # Схема полей строится один раз на класс и сбрасывается явно
+    def test_schema_is_cached_per_class(self):
+        # Подготовка
+        other = NomenclatureModel("Товар 2", "Полное название товара 2", self.group, self.unit)
+
+        # Действие
+        schema = common.get_schema(NomenclatureModel)
+        common.clear_schema(NomenclatureModel)
+        rebuilt = common.get_schema(other.__class__)
+
+        # Проверка
+        self.assertIs(common.get_schema(self.nomenclature.__class__), rebuilt)
+        self.assertIsNot(schema, rebuilt)
+        self.assertEqual(schema, rebuilt)
+        self.assertEqual([field for field, getter in schema], common.get_fields(self.nomenclature))
+
+    # Конвертация по схеме совпадает с выгрузкой свойств по именам
+    def test_convert_uses_schema_fields(self):
+        # Подготовка
+        expected = {
+            "id": self.nomenclature.id,
+            "name": self.nomenclature.name,
+            "full_name": self.nomenclature.full_name,
+            "group_nomenclature": self.group.id,
+            "unit_measurement": self.unit.id
+        }
+
+        # Действие
+        result = self.factory.convert(self.nomenclature)
+
+        # Проверка
+        self.assertEqual(result, expected)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import unittest
+import datetime
+from src.core.filter_compiler import FilterCompiler
+from src.core.prototype import Prototype
+from src.core.validator import ArgumentException
+from src.dtos.filter_sorting_dto import FilterSortingDto
+from tests.repository_fixture import RepositoryFixture
+
+
+class TestFilterCompiler(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        fixture = RepositoryFixture()
+        self.gramm = fixture.gramm
+        self.flour = fixture.flour
+        self.sugar = fixture.sugar
+        self.storage = fixture.first_storage
+
+        self.transactions = [
+            fixture.add_transaction(datetime.date(2025, 10, 1), self.flour, self.storage, 10.0),
+            fixture.add_transaction(datetime.date(2025, 10, 2), self.sugar, self.storage, 20.0),
+            fixture.add_transaction(datetime.date(2025, 10, 3), self.flour, self.storage, 30.0),
+        ]
+
+    def test_compile_same_shape_returns_cached_plan(self):
+        # Подготовка
+        first = FilterSortingDto([{"field_name": "date", "value": datetime.date(2025, 10, 2), "type": "less"}], [])
+        second = FilterSortingDto([{"field_name": "date", "value": datetime.date(2025, 10, 3), "type": "LESS"}], [])
+
+        # Действие
+        first_plan, first_values = FilterCompiler.compile(first)
+        second_plan, second_values = FilterCompiler.compile(second)
+
+        # Проверка
+        assert first_plan is second_plan
+        assert first_values != second_values
+
+    def test_compile_wrong_type_raises_exception(self):
+        # Подготовка
+        filters = FilterSortingDto([{"field_name": "date", "value": 1, "type": "between"}], [])
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            FilterCompiler.compile(filters)
+
+    def test_execute_nested_and_date_filters_matches_all_conditions(self):
+        # Подготовка
+        filters = FilterSortingDto([
+            {"field_name": "nomenclature/id", "value": self.flour.id, "type": "equals"},
+            {"field_name": "date", "value": datetime.date(2025, 10, 2), "type": "greater_or_equal"}
+        ], [])
+        plan, values = FilterCompiler.compile(filters)
+
+        # Действие
+        result = plan.execute(self.transactions, values)
+
+        # Проверка
+        assert result == [self.transactions[2]]
+
+    def test_execute_nested_less_compares_like_plain_field(self):
+        # Подготовка
+        filters = FilterSortingDto([{"field_name": "unit/coefficient", "value": 2, "type": "less"}], [])
+        plan, values = FilterCompiler.compile(filters)
+
+        # Действие
+        result = plan.execute(self.transactions, values)
+
+        # Проверка
+        assert len(result) == 3
+
+    def test_execute_wrong_field_raises_exception(self):
+        # Подготовка
+        filters = FilterSortingDto([{"field_name": "nomenclature/color", "value": "red", "type": "equals"}], [])
+        plan, values = FilterCompiler.compile(filters)
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            plan.execute(self.transactions, values)
+
+    def test_validate_model_checks_nested_fields_without_data(self):
+        # Подготовка
+        valid = FilterSortingDto([{"field_name": "nomenclature/unit_measurement/name", "value": "грамм", "type": "equals"},
+                                  {"field_name": "date", "value": datetime.date(2025, 10, 1), "type": "greater"}], [])
+        wrong = FilterSortingDto([{"field_name": "nomenclature/color", "value": "red", "type": "equals"}], [])
+
+        # Действие & Проверка
+        FilterCompiler.compile(valid)[0].validate_model(type(self.transactions[0]))
+        with self.assertRaises(ArgumentException):
+            FilterCompiler.compile(wrong)[0].validate_model(type(self.transactions[0]))
+
+    def test_iterate_lazy_evaluation_yields_matches_one_by_one(self):
+        # Подготовка
+        filters = FilterSortingDto([{"field_name": "nomenclature/id", "value": self.flour.id, "type": "equals"}], [])
+        plan, values = FilterCompiler.compile(filters)
+
+        # Действие
+        iterator = plan.iterate(iter(self.transactions), values)
+        first = next(iterator)
+
+        # Проверка
+        assert first is self.transactions[0]
+        assert list(iterator) == [self.transactions[2]]
+
+    def test_predicate_cheap_condition_short_circuits_expensive_one(self):
+        # Подготовка
+        # Условие like стоит первым в запросе, но должно проверяться после equals
+        class Item:
+            name = "flour"
+
+            @property
+            def full_name(self):
+                raise RuntimeError("Поле не должно читаться")
+
+        filters = FilterSortingDto([
+            {"field_name": "full_name", "value": "flour", "type": "like"},
+            {"field_name": "name", "value": "sugar", "type": "equals"}
+        ], [])
+        plan, values = FilterCompiler.compile(filters)
+        match = plan.predicate(values)
+
+        # Действие
+        result = match(Item())
+
+        # Проверка
+        assert result == False
+
+    def test_prototype_filter_like_returns_matching_items(self):
+        # Подготовка
+        prototype = Prototype([self.flour, self.sugar])
+        filters = FilterSortingDto([{"field_name": "full_name", "value": "wheat", "type": "like"}], [])
+
+        # Действие
+        result = Prototype.filter(prototype, filters)
+
+        # Проверка
+        assert result.data == [self.flour]
+        assert len(prototype.data) == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
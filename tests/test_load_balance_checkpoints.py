@@ -0,0 +1,83 @@
+import unittest
+import datetime
+import time
+from datetime import timedelta
+from src.logics.balances_manager import BalancesManager
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestBalanceCheckpointsPerformance(unittest.TestCase):
+    __start_service: StartService = None
+    # Транзакций в месяц: плотность истории не меняется, растет только ее длина
+    __transactions_per_month: int = 300
+    __queries_count: int = 20
+
+    def setUp(self):
+        """Подготовка справочников для нагрузочного тестирования"""
+        self.__start_service = StartService()
+        self.__start_service.start(True)
+
+    def __create_dataset(self, months_count):
+        """Создание истории транзакций заданной длины (в месяцах)"""
+        data = self.__start_service.data.copy()
+        data[Repository.transaction_key] = {}
+
+        nomenclatures = list(data[Repository.nomenclature_key].values())
+        storages = list(data[Repository.storage_key].values())
+
+        start_date = datetime.date(2020, 1, 1)
+        total = months_count * self.__transactions_per_month
+        for i in range(total):
+            transaction_date = start_date + timedelta(days=(i * months_count * 30) // total)
+            nomenclature = nomenclatures[i % len(nomenclatures)]
+            quantity = 100.0 + (i * 10) % 500
+            if i % 3 == 0:
+                quantity = -quantity
+
+            transaction = TransactionModel(
+                transaction_date,
+                nomenclature,
+                storages[i % len(storages)],
+                quantity,
+                nomenclature.unit_measurement
+            )
+            data[Repository.transaction_key][transaction.id] = transaction
+
+        return data, transaction_date
+
+    def __measure(self, balances_manager, target_date):
+        """Среднее время calculation_balances_by_date"""
+        start_time = time.time()
+        for _ in range(self.__queries_count):
+            balances_manager.calculation_balances_by_date(target_date)
+        return (time.time() - start_time) / self.__queries_count
+
+    def test_performance_balances_by_date_flat_with_growing_history(self):
+        """Время расчета остатков на последнюю дату не должно расти вместе с длиной истории"""
+        results = []
+
+        print(f"\nТранзакций в месяц: {self.__transactions_per_month}")
+        for months_count in [3, 12, 48]:
+            data, last_date = self.__create_dataset(months_count)
+
+            # Дата блокировки в начале истории: после нее вся история
+            balances_manager = BalancesManager(data, datetime.date(2020, 1, 1))
+            balances_manager.calculation_balances_up_blocking_date()
+            balances_manager.calculation_balances_by_date(last_date)
+
+            query_time = self.__measure(balances_manager, last_date)
+            results.append(query_time)
+
+            print(f"  Месяцев истории: {months_count}, транзакций: {len(data[Repository.transaction_key])}")
+            print(f"  calculation_balances_by_date({last_date}): {query_time:.6f} сек")
+
+        # История выросла в 16 раз, время запроса - с запасом на шум не больше чем в 4 раза
+        self.assertLess(results[-1], max(results[0], 0.001) * 4)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBalanceCheckpointsPerformance)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,85 @@
+import unittest
+import datetime
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from src.binary_snapshot import BinarySnapshot
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.core.reference_dict import ReferenceDict
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestBinarySnapshotPerformance(unittest.TestCase):
+    __start_service: StartService = None
+    __transactions_count: int = 2000000
+
+    def setUp(self):
+        """Подготовка репозитория для нагрузочного тестирования"""
+        Logger.configure("ERROR", "console")
+        ObserveService.handlers.clear()
+        self.__start_service = StartService()
+        self.__start_service.start(True)
+
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.bin")
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __create_data(self) -> dict:
+        """Репозиторий с большим числом транзакций"""
+        data = self.__start_service.data.copy()
+        nomenclatures = list(data[Repository.nomenclature_key].values())
+        storages = list(data[Repository.storage_key].values())
+
+        start_date = datetime.date(2024, 1, 1)
+        transactions = ReferenceDict()
+        for i in range(self.__transactions_count):
+            nomenclature = nomenclatures[i % len(nomenclatures)]
+            transactions[f"transaction-{i}"] = TransactionModel.restore(
+                f"transaction-{i}",
+                start_date + timedelta(days=(i * 365) // self.__transactions_count),
+                nomenclature,
+                storages[i % len(storages)],
+                100.0 + i % 500,
+                nomenclature.unit_measurement
+            )
+
+        data[Repository.transaction_key] = transactions
+        return data
+
+    def test_performance_save_and_load(self):
+        """Сохранение и загрузка двоичного снимка"""
+        data = self.__create_data()
+        print(f"\nТранзакций: {self.__transactions_count}")
+
+        start_time = time.time()
+        BinarySnapshot.save(data, self.filename)
+        save_time = time.time() - start_time
+
+        restored = {}
+        start_time = time.time()
+        BinarySnapshot.load(restored, self.filename)
+        load_time = time.time() - start_time
+
+        print(f"  Сохранение: {save_time:.4f} сек")
+        print(f"  Загрузка: {load_time:.4f} сек")
+        print(f"  Размер: {os.path.getsize(self.filename) / 1024 / 1024:.1f} МБ")
+
+        self.assertEqual(len(restored[Repository.transaction_key]), self.__transactions_count)
+        transaction = restored[Repository.transaction_key]["transaction-1"]
+        self.assertEqual(transaction.quantity, 101.0)
+        self.assertIs(transaction.storage, restored[Repository.storage_key][transaction.storage.id])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestBinarySnapshotPerformance)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,78 @@
+import unittest
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.data_manager import DataManager
+from src.logics.factory_entities import FactoryEntities
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestRepositoryLoaderPerformance(unittest.TestCase):
+    __start_service: StartService = None
+    __transactions_count: int = 1000000
+
+    def setUp(self):
+        """Подготовка файла data.json для нагрузочного тестирования"""
+        Logger.configure("ERROR", "console")
+        ObserveService.handlers.clear()
+        self.__start_service = StartService()
+        self.__start_service.start(True)
+
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "data.json")
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __create_file(self):
+        """Снимок репозитория в формате DataManager с большим числом транзакций"""
+        data = self.__start_service.data
+        prepared = DataManager(data, self.filename).prepare_data(data, FactoryEntities())
+        nomenclatures = prepared[Repository.nomenclature_key]
+        storages = prepared[Repository.storage_key]
+
+        start_date = datetime.date(2024, 1, 1)
+        prepared[Repository.transaction_key] = [{
+            "id": f"transaction-{i}",
+            "date": (start_date + timedelta(days=(i * 365) // self.__transactions_count)).isoformat(),
+            "nomenclature": nomenclatures[i % len(nomenclatures)]["id"],
+            "storage": storages[i % len(storages)]["id"],
+            "quantity": 100.0 + i % 500,
+            "unit": nomenclatures[i % len(nomenclatures)]["unit_measurement"]
+        } for i in range(self.__transactions_count)]
+
+        with open(self.filename, 'w', encoding='utf-8') as file:
+            json.dump(prepared, file)
+
+    def test_performance_cold_start_from_file(self):
+        """Холодный старт: чтение data.json и построение графа объектов"""
+        self.__create_file()
+        print(f"\nТранзакций: {self.__transactions_count}")
+
+        data = {}
+        start_time = time.time()
+        loaded = DataManager(data, self.filename).load()
+        load_time = time.time() - start_time
+
+        print(f"  Загрузка: {load_time:.4f} сек ({self.__transactions_count / load_time:.0f} транзакций/сек)")
+
+        self.assertTrue(loaded)
+        self.assertEqual(len(data[Repository.transaction_key]), self.__transactions_count)
+        transaction = data[Repository.transaction_key]["transaction-0"]
+        self.assertIs(transaction.nomenclature, data[Repository.nomenclature_key][transaction.nomenclature.id])
+        self.assertIs(transaction.storage, data[Repository.storage_key][transaction.storage.id])
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestRepositoryLoaderPerformance)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,86 @@
+import unittest
+import json
+import time
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.logics.factory_convert import FactoryConvert
+from src.logics.serializer_generator import SerializerGenerator
+from src.models.company_model import CompanyModel
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestSerializersPerformance(unittest.TestCase):
+    __start_service: StartService = None
+    __rows_count: int = 20000
+
+    def setUp(self):
+        """Подготовка моделей для нагрузочного тестирования"""
+        Logger.configure("ERROR", "console")
+        self.__start_service = StartService()
+        self.__start_service.start(True)
+        SerializerGenerator.clear()
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def __create_models(self) -> dict:
+        """Объекты каждой модели из src/models: имя модели -> объекты"""
+        data = self.__start_service.data
+        company = CompanyModel()
+        company.name = "Ромашка"
+        company.INN = 123456789012
+        company.account = "40702810000"
+        company.correspondent_account = "30101810000"
+        company.BIK = "044525225"
+        company.ownership_type = "ООО"
+
+        recipe = list(data[Repository.recipe_key].values())[0]
+        models = {
+            "CompanyModel": [company],
+            "GroupNomenclatureModel": list(data[Repository.group_nomenclature_key].values()),
+            "IngredientModel": list(recipe.ingredients),
+            "NomenclatureModel": list(data[Repository.nomenclature_key].values()),
+            "RecipeModel": list(data[Repository.recipe_key].values()),
+            "StorageModel": list(data[Repository.storage_key].values()),
+            "TransactionModel": list(data[Repository.transaction_key].values()),
+            "UnitMeasurement": list(data[Repository.unit_measure_key].values())
+        }
+
+        # Одинаковое число строк для каждой модели
+        return {name: (items * (self.__rows_count // len(items) + 1))[:self.__rows_count]
+                for name, items in models.items()}
+
+    def test_performance_generated_serializers_faster_than_generic(self):
+        """Сгенерированные сериализаторы быстрее общего пути и дают тот же json"""
+        factory = FactoryConvert()
+        print(f"\nСтрок каждой модели: {self.__rows_count}")
+
+        generic_total = 0
+        generated_total = 0
+        for name, items in self.__create_models().items():
+            start_time = time.time()
+            generic = [factory.convert_generic(item) for item in items]
+            generic_time = time.time() - start_time
+
+            start_time = time.time()
+            generated = [factory.convert(item) for item in items]
+            generated_time = time.time() - start_time
+
+            generic_total += generic_time
+            generated_total += generated_time
+            print(f"  {name}: общий {generic_time:.4f} сек, сгенерированный {generated_time:.4f} сек "
+                  f"(x{generic_time / generated_time:.1f})")
+
+            self.assertEqual(json.dumps(generated, ensure_ascii=False, indent=4),
+                             json.dumps(generic, ensure_ascii=False, indent=4))
+
+        print(f"  Всего: общий {generic_total:.4f} сек, сгенерированный {generated_total:.4f} сек")
+        self.assertLess(generated_total, generic_total)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestSerializersPerformance)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,94 @@
+import unittest
+import datetime
+import json
+import time
+from datetime import timedelta
+from src.balance_checkpoints import BalanceCheckpoints
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.logics.reference_service import ReferenceService
+from src.logics.transaction_ingest import TransactionIngest
+from src.reference_graph import ReferenceGraph
+from src.repository import Repository
+from src.start_service import StartService
+from src.transaction_index import TransactionIndex
+
+
+class TestTransactionIngestPerformance(unittest.TestCase):
+    __start_service: StartService = None
+    __transactions_count: int = 20000
+
+    def setUp(self):
+        """Подготовка справочников для нагрузочного тестирования"""
+        Logger.configure("ERROR", "console")
+        self.__start_service = StartService()
+        self.__start_service.start(True)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def __create_service(self) -> ReferenceService:
+        """Репозиторий без транзакций с подписанными индексами"""
+        data = self.__start_service.data.copy()
+        data[Repository.transaction_key] = {}
+
+        # Обработчики от других наборов данных (например, сохранение в файл) не участвуют в замере
+        ObserveService.handlers.clear()
+        service = ReferenceService(data)
+        TransactionIndex.get(data)
+        BalanceCheckpoints.get(data)
+        ReferenceGraph.get(data)
+        return service
+
+    def __create_rows(self) -> list:
+        """Строки транзакций NDJSON"""
+        data = self.__start_service.data
+        nomenclatures = list(data[Repository.nomenclature_key].values())
+        storages = list(data[Repository.storage_key].values())
+
+        start_date = datetime.date(2024, 1, 1)
+        rows = []
+        for i in range(self.__transactions_count):
+            nomenclature = nomenclatures[i % len(nomenclatures)]
+            rows.append(json.dumps({
+                "date": (start_date + timedelta(days=(i * 365) // self.__transactions_count)).isoformat(),
+                "nomenclature_id": nomenclature.id,
+                "storage_id": storages[i % len(storages)].id,
+                "quantity": 100.0 + i % 500,
+                "unit_id": nomenclature.unit_measurement.id
+            }))
+
+        return rows
+
+    def test_performance_stream_ingest_faster_than_single_adds(self):
+        """Потоковая загрузка пакетами быстрее добавления транзакций по одной"""
+        rows = self.__create_rows()
+        print(f"\nТранзакций: {self.__transactions_count}")
+
+        # По одной: событие и обновление индексов на каждую транзакцию
+        service = self.__create_service()
+        start_time = time.time()
+        for row in rows:
+            item = service.create_item_from_data(Repository.transaction_key, json.loads(row))
+            service.add(Repository.transaction_key, item)
+        single_time = time.time() - start_time
+
+        # Потоком: разбор по строкам, вставка пакетами
+        service = self.__create_service()
+        start_time = time.time()
+        count = TransactionIngest(service).ingest_ndjson(rows)
+        stream_time = time.time() - start_time
+
+        print(f"  По одной: {single_time:.4f} сек ({self.__transactions_count / single_time:.0f} транзакций/сек)")
+        print(f"  Потоком: {stream_time:.4f} сек ({count / stream_time:.0f} транзакций/сек)")
+
+        self.assertEqual(count, self.__transactions_count)
+        self.assertEqual(len(service.data[Repository.transaction_key]), self.__transactions_count)
+        self.assertLess(stream_time, single_time)
+
+
+if __name__ == '__main__':
+    suite = unittest.TestLoader().loadTestsFromTestCase(TestTransactionIngestPerformance)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -26,6 +26,9 @@ class TestLogger(unittest.TestCase):
         
     # Очистка после тестов
     def tearDown(self):
+        # Убираем обработчики, которые пишут во временную директорию
+        Logger.handlers.clear()
+
         # Удаляем временную директорию
         if os.path.exists(self.test_output_dir):
             shutil.rmtree(self.test_output_dir)
@@ -0,0 +1,124 @@
+import unittest
+from src.core.reference_dict import ReferenceDict
+from src.models.storage_model import StorageModel
+from src.start_service import StartService
+
+
+class TestReferenceDict(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        self.first = StorageModel("Первый склад", "Улица Мира 1")
+        self.second = StorageModel("Второй склад", "Улица Мира 2")
+
+    def test_setitem_by_name_stores_by_id(self):
+        # Подготовка
+        storages = ReferenceDict()
+
+        # Действие
+        storages["first"] = self.first
+
+        # Проверка
+        assert list(storages.keys()) == [self.first.id]
+        assert storages["first"] is self.first
+        assert storages[self.first.id] is self.first
+        assert "first" in storages
+        assert storages.names == {"first": self.first.id}
+
+    def test_setitem_same_name_replaces_previous_item(self):
+        # Подготовка
+        storages = ReferenceDict()
+        storages["storage"] = self.first
+
+        # Действие
+        storages["storage"] = self.second
+
+        # Проверка
+        assert len(storages) == 1
+        assert storages["storage"] is self.second
+        assert self.first.id not in storages
+
+    def test_pop_by_name_removes_item_and_name(self):
+        # Подготовка
+        storages = ReferenceDict({"first": self.first, self.second.id: self.second})
+
+        # Действие
+        result = storages.pop("first")
+
+        # Проверка
+        assert result is self.first
+        assert "first" not in storages
+        assert storages.get("first") is None
+        assert storages.names == {}
+        with self.assertRaises(KeyError):
+            storages["first"]
+
+    def test_setdefault_by_name_stores_by_id(self):
+        # Подготовка
+        storages = ReferenceDict({"first": self.first})
+
+        # Действие
+        existing = storages.setdefault("first", self.second)
+        added = storages.setdefault("second", self.second)
+
+        # Проверка
+        assert existing is self.first
+        assert added is self.second
+        assert set(storages.keys()) == {self.first.id, self.second.id}
+        assert storages.names == {"first": self.first.id, "second": self.second.id}
+
+    def test_copy_keeps_name_index(self):
+        # Подготовка
+        storages = ReferenceDict({"first": self.first})
+
+        # Действие
+        result = storages.copy()
+        result["second"] = self.second
+
+        # Проверка
+        assert isinstance(result, ReferenceDict)
+        assert result["first"] is self.first
+        assert result.names == {"first": self.first.id, "second": self.second.id}
+        assert "second" not in storages
+
+    def test_merge_operators_store_by_id(self):
+        # Подготовка
+        storages = ReferenceDict({"first": self.first})
+
+        # Действие
+        merged = storages | {"second": self.second}
+        storages |= {"second": self.second}
+
+        # Проверка
+        for result in [merged, storages]:
+            assert isinstance(result, ReferenceDict)
+            assert set(result.keys()) == {self.first.id, self.second.id}
+            assert result["second"] is self.second
+
+    def test_normalize_plain_dict_keys_by_id(self):
+        # Подготовка
+        plain = {"first": self.first, self.second.id: self.second}
+
+        # Действие
+        result = ReferenceDict.normalize(plain)
+
+        # Проверка
+        assert isinstance(result, ReferenceDict)
+        assert set(result.keys()) == {self.first.id, self.second.id}
+        assert ReferenceDict.normalize(result) is result
+
+    def test_start_service_seed_data_keyed_by_id(self):
+        # Подготовка
+        service = StartService()
+
+        # Действие
+        service.start(True)
+
+        # Проверка
+        wheat_flour = service.nomenclatures["wheat_flour"]
+        assert service.nomenclatures.get(wheat_flour.id) is wheat_flour
+        assert all(key == item.id for key, item in service.nomenclatures.items())
+
+
+if __name__ == "__main__":
+    unittest.main()
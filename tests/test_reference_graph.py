@@ -0,0 +1,95 @@
+import unittest
+import datetime
+from src.core.event_type import EventType
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.core.validator import OperationException
+from src.logics.reference_service import ReferenceService
+from src.reference_graph import ReferenceGraph
+from src.transaction_index import TransactionIndex
+from src.repository import Repository
+from tests.repository_fixture import RepositoryFixture
+
+
+class TestReferenceGraph(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        fixture = RepositoryFixture()
+        self.group = fixture.group
+        self.gramm = fixture.gramm
+        self.kilogramm = fixture.kilogramm
+        self.flour = fixture.flour
+        self.sugar = fixture.sugar
+        self.storage = fixture.first_storage
+        self.empty_storage = fixture.second_storage
+        self.data = fixture.data
+        self.transaction = fixture.add_transaction(datetime.date(2025, 10, 1), self.flour, self.storage, 10.0, self.kilogramm)
+        self.service = ReferenceService(self.data)
+        self.graph = ReferenceGraph.get(self.data)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def test_referrers_returns_items_by_type(self):
+        # Подготовка
+
+        # Действие
+        transactions = self.graph.referrers(self.storage.id, Repository.transaction_key)
+        nomenclatures = self.graph.referrers(self.gramm.id, Repository.nomenclature_key)
+        units = self.graph.referrers(self.gramm.id, Repository.unit_measure_key)
+
+        # Проверка
+        assert transactions == {self.transaction.id}
+        assert nomenclatures == {self.flour.id, self.sugar.id}
+        assert units == {self.kilogramm.id}
+        assert self.graph.referrers(self.empty_storage.id, Repository.transaction_key) == set()
+
+    def test_update_moves_reference_to_new_target(self):
+        # Подготовка
+
+        # Действие
+        self.transaction.storage = self.empty_storage
+        ObserveService.create_event(EventType.change_reference_type_key(), {
+            "reference_type": Repository.transaction_key, "item": self.transaction
+        })
+
+        # Проверка
+        assert self.graph.referrers(self.storage.id, Repository.transaction_key) == set()
+        assert self.graph.first_referrer(self.empty_storage.id, Repository.transaction_key) is self.transaction
+
+    def test_delete_referenced_storage_raises_exception(self):
+        # Подготовка
+
+        # Действие & Проверка
+        with self.assertRaises(OperationException):
+            self.service.delete(Repository.storage_key, self.storage.id)
+
+    def test_delete_refused_keeps_stores_actual(self):
+        # Подготовка
+        index = TransactionIndex.get(self.data)
+
+        # Действие
+        with self.assertRaises(OperationException):
+            self.service.delete(Repository.storage_key, self.storage.id)
+
+        # Проверка
+        assert not self.graph.outdated()
+        assert not index.outdated()
+
+    def test_delete_after_referrer_removed_succeeds(self):
+        # Подготовка
+        self.service.delete(Repository.transaction_key, self.transaction.id)
+
+        # Действие
+        result = self.service.delete(Repository.storage_key, self.storage.id)
+
+        # Проверка
+        assert result == True
+        assert self.graph.referrers(self.storage.id, Repository.transaction_key) == set()
+
+
+if __name__ == "__main__":
+    unittest.main()
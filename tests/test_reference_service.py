@@ -203,6 +203,23 @@ class TestReferenceService(unittest.TestCase):
         self.assertTrue(result)
         self.assertNotIn("to-delete", self.mock_repository_data[Repository.group_nomenclature_key])
     
+    def test_name_keyed_reference_normalized_to_id_keys(self):
+        """Справочник, заполненный по именам, переводится на хранение по коду"""
+        # Подготовка
+        storage = StorageModel("Склад по имени", "ул. Мира 1")
+        self.mock_repository_data[Repository.storage_key] = {"by_name": storage}
+        service = ReferenceService(self.mock_repository_data)
+
+        # Действие
+        found = service.get_by_id(Repository.storage_key, storage.id)
+        deleted = service.delete(Repository.storage_key, storage.id)
+
+        # Проверка
+        self.assertIs(found, storage)
+        self.assertTrue(deleted)
+        self.assertNotIn("by_name", self.mock_repository_data[Repository.storage_key])
+        self.assertEqual(len(self.mock_repository_data[Repository.storage_key]), 0)
+
     def test_delete_nonexistent_item_returns_false(self):
         """Удаление несуществующего элемента возвращает False"""
         # Действие
@@ -227,6 +244,37 @@ class TestReferenceService(unittest.TestCase):
         with self.assertRaises(OperationException):
             self.service.delete(Repository.nomenclature_key, "nomenclature-1")
     
+    def test_delete_item_by_name_with_dependencies_raises_exception(self):
+        """Удаление элемента по имени проверяет зависимости по его коду"""
+        # Подготовка
+        flour = NomenclatureModel("Пшеничная мука", "Мука высшего сорта", self.group, self.unit)
+        self.mock_repository_data[Repository.nomenclature_key]["wheat_flour"] = flour
+
+        recipe = RecipeModel("Печенье", "Вкусное печенье")
+        recipe.id = "recipe-1"
+        recipe.ingredients.append(IngredientModel("Мука для печенья", flour, 100))
+        self.mock_repository_data[Repository.recipe_key][recipe.id] = recipe
+
+        # Действие
+        with self.assertRaises(OperationException):
+            self.service.delete(Repository.nomenclature_key, "wheat_flour")
+
+        # Проверка
+        self.assertIn(flour.id, self.mock_repository_data[Repository.nomenclature_key])
+    
+    def test_delete_item_by_name_success(self):
+        """Удаление элемента по имени удаляет его по коду"""
+        # Подготовка
+        flour = NomenclatureModel("Пшеничная мука", "Мука высшего сорта", self.group, self.unit)
+        self.mock_repository_data[Repository.nomenclature_key]["wheat_flour"] = flour
+
+        # Действие
+        result = self.service.delete(Repository.nomenclature_key, "wheat_flour")
+
+        # Проверка
+        self.assertTrue(result)
+        self.assertNotIn(flour.id, self.mock_repository_data[Repository.nomenclature_key])
+    
     
     def test_create_item_from_data_nomenclature_success(self):
         """Создание номенклатуры из данных JSON успешно"""
@@ -549,5 +597,102 @@ class TestReferenceService(unittest.TestCase):
         self.assertEqual(updated_item.unit_measurement.id, "unit-1")
 
 
+    @patch('src.core.observe_service.ObserveService.create_event')
+    def test_add_bulk_inserts_items_with_single_event(self, mock_create_event):
+        """Пакетное добавление вставляет все элементы и создает одно событие"""
+        # Подготовка
+        items_data = [
+            {"id": "storage-2", "name": "Второй склад", "address": "ул. Мира 2"},
+            {"id": "storage-3", "name": "Третий склад", "address": "ул. Мира 3"}
+        ]
+        
+        # Действие
+        result = self.service.add_bulk(Repository.storage_key, items_data)
+        
+        # Проверка
+        assert result == ["storage-2", "storage-3"]
+        assert self.service.get_by_id(Repository.storage_key, "storage-3").name == "Третий склад"
+        mock_create_event.assert_called_once()
+        assert mock_create_event.call_args[0][0] == EventType.bulk_change_reference_type_key()
+        assert len(mock_create_event.call_args[0][1]["items"]) == 2
+    
+    def test_add_bulk_invalid_item_inserts_nothing(self):
+        """Ошибка в одном элементе пакета отменяет вставку всего пакета"""
+        # Подготовка
+        items_data = [
+            {"id": "storage-2", "name": "Второй склад", "address": "ул. Мира 2"},
+            {"id": "storage-1", "name": "Дубликат", "address": "ул. Мира 3"}
+        ]
+        
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            self.service.add_bulk(Repository.storage_key, items_data)
+        
+        assert self.service.get_by_id(Repository.storage_key, "storage-2") is None
+        assert len(self.mock_repository_data[Repository.storage_key]) == 1
+    
+    def test_add_bulk_resolves_references_inside_batch(self):
+        """Элементы пакета могут ссылаться на ранее добавленные элементы того же пакета"""
+        # Подготовка
+        items_data = [
+            {"id": "unit-gramm", "name": "грамм", "coefficient": 1},
+            {"id": "unit-kilo", "name": "килограмм", "coefficient": 1000, "base_unit_id": "unit-gramm"}
+        ]
+        
+        # Действие
+        self.service.add_bulk(Repository.unit_measure_key, items_data)
+        
+        # Проверка
+        gramm = self.service.get_by_id(Repository.unit_measure_key, "unit-gramm")
+        kilo = self.service.get_by_id(Repository.unit_measure_key, "unit-kilo")
+        assert kilo.base_unit is gramm
+    
+    def test_create_transaction_from_data_resolves_references(self):
+        """Транзакция создается из данных JSON через фабрику транзакций"""
+        # Подготовка
+        data = {
+            "date": "2025-03-15",
+            "nomenclature_id": "nomenclature-1",
+            "storage_id": "storage-1",
+            "quantity": 250,
+            "unit_id": "unit-1"
+        }
+        
+        # Действие
+        item = self.service.create_item_from_data(Repository.transaction_key, data)
+        
+        # Проверка
+        assert item.date == datetime.date(2025, 3, 15)
+        assert item.nomenclature is self.nomenclature
+        assert item.storage is self.storage
+        assert item.quantity == 250.0
+        with self.assertRaises(ArgumentException):
+            self.service.create_item_from_data(Repository.transaction_key, dict(data, date="15.03.2025"))
+        with self.assertRaises(ArgumentException):
+            self.service.create_item_from_data(Repository.transaction_key, dict(data, quantity=float("inf")))
+
+    @patch('src.core.observe_service.ObserveService.create_event')
+    def test_update_transaction_with_missing_dependency_keeps_transaction(self, mock_create_event):
+        """Ошибка в одном поле не меняет остальные поля транзакции"""
+        # Подготовка
+        item = self.service.create_item_from_data(Repository.transaction_key, {
+            "date": "2025-03-15",
+            "nomenclature_id": "nomenclature-1",
+            "storage_id": "storage-1",
+            "quantity": 250,
+            "unit_id": "unit-1"
+        })
+        self.mock_repository_data[Repository.transaction_key][item.id] = item
+
+        # Действие
+        with self.assertRaises(ArgumentException):
+            self.service.update(Repository.transaction_key, item.id, {"date": "2020-01-01", "storage_id": "nope"})
+
+        # Проверка - хранилища все равно получают событие изменения элемента
+        assert item.date == datetime.date(2025, 3, 15)
+        assert item.storage is self.storage
+        assert mock_create_event.call_args[0][0] == EventType.change_reference_type_key()
+        assert mock_create_event.call_args[0][1]["item"] is item
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,7 @@
 # test_report.py
 import unittest
 import datetime
+from unittest.mock import patch
 from src.logics.report import Report
 from src.models.storage_model import StorageModel
 from src.models.nomenclature_model import NomenclatureModel
@@ -8,6 +9,9 @@ from src.models.transaction_model import TransactionModel
 from src.models.unit_measurement_model import UnitMeasurement
 from src.models.group_nomenclature_model import GroupNomenclatureModel
 from src.repository import Repository
+from src.core.validator import ArgumentException
+from src.dtos.filter_sorting_dto import FilterSortingDto
+from src.transaction_columns import TransactionColumns
 from src.start_service import StartService
 
 
@@ -205,4 +209,51 @@ class TestReport(unittest.TestCase):
             assert isinstance(result1, list)
             assert isinstance(result2, list)
             # Количество номенклатур должно быть одинаковым
-            assert len(result1) == len(result2)
\ No newline at end of file
+            assert len(result1) == len(result2)
+
+    def test_generate_report_rows_match_calculate_balance(self):
+        # Подготовка
+        nomenclatures = list(self.__start_service.nomenclatures.values())
+
+        # Действие
+        result = self.__report.generateReport(self.storage, self.start_date, self.end_date)
+
+        # Проверка - однопроходная агрегация дает те же значения, что и расчет по одной номенклатуре
+        for row, nomenclature in zip(result, nomenclatures):
+            balance = self.__report.calculateBalance(nomenclature, self.storage, self.start_date, self.end_date)
+            assert row["nomenclature"]["id"] == nomenclature.id
+            assert [row["start_balance"], row["income"], row["outcome"]] == balance
+
+    def test_calculate_balances_wrong_filter_field_on_empty_storage_raises_exception(self):
+        # Подготовка - на складе нет транзакций, фильтр не с чем сверить по данным
+        storage = StorageModel("Пустой склад", "Улица Мира 1")
+        filters = FilterSortingDto([{"field_name": "nomenclature/color", "value": "red", "type": "equals"}], [])
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            self.__report.calculateBalances(storage, self.start_date, self.end_date, filters, "transaction")
+        with self.assertRaises(ArgumentException):
+            self.__report.generateReport(storage, self.start_date, self.end_date, filters, "nomenclature")
+
+    def test_calculate_balances_paths_agree_regardless_of_summation_order(self):
+        # Подготовка - транзакции добавлены в обратном порядке дат: расчет по складу
+        # складывает их в порядке добавления, расчет по номенклатуре - в порядке дат
+        data = dict(self.__start_service.data)
+        data[Repository.transaction_key] = dict(self.__start_service.transactions)
+        nomenclature = list(self.__start_service.nomenclatures.values())[0]
+        gramm = next(unit for unit in data[Repository.unit_measure_key].values() if unit.base_unit is None)
+        for day, quantity in zip(range(30, 2, -1), [0.1, 0.7, 0.2, 1e8, 0.3, -0.1, 0.6] * 4):
+            transaction = TransactionModel(datetime.date(2025, 9, day), nomenclature, self.storage, quantity, gramm)
+            data[Repository.transaction_key][transaction.id] = transaction
+        report = Report(data)
+        start_date = datetime.date(2025, 9, 10)
+
+        # Действие
+        result = report.calculateBalances(self.storage, start_date, self.end_date)
+        with patch.object(TransactionColumns, "available", return_value=False):
+            by_rows = report.calculateBalances(self.storage, start_date, self.end_date)
+        by_nomenclature = report.calculateBalance(nomenclature, self.storage, start_date, self.end_date)
+
+        # Проверка - все пути дают одинаковые числа, а не только близкие
+        assert result == by_rows
+        assert result[nomenclature.id] == by_nomenclature
@@ -0,0 +1,68 @@
+import unittest
+import datetime
+from src.core.observe_service import ObserveService
+from src.core.validator import ArgumentException
+from src.data_manager import DataManager
+from src.logics.factory_entities import FactoryEntities
+from src.repository import Repository
+from src.repository_loader import RepositoryLoader
+from src.start_service import StartService
+
+
+class TestRepositoryLoader(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.prepared = DataManager(self.start_service.data).prepare_data(self.start_service.data, FactoryEntities())
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def test_load_rebuilds_object_graph(self):
+        # Подготовка
+        data = {}
+
+        # Действие
+        RepositoryLoader.load(data, self.prepared)
+
+        # Проверка
+        for reference_type in [Repository.nomenclature_key, Repository.storage_key, Repository.transaction_key]:
+            assert set(data[reference_type].keys()) == {item.id for item in self.start_service.data[reference_type].values()}
+
+        for transaction in data[Repository.transaction_key].values():
+            assert transaction.nomenclature is data[Repository.nomenclature_key][transaction.nomenclature.id]
+            assert transaction.unit is data[Repository.unit_measure_key][transaction.unit.id]
+            assert isinstance(transaction.date, datetime.date)
+
+        recipe = list(data[Repository.recipe_key].values())[0]
+        assert all(ingredient.nomenclature is data[Repository.nomenclature_key][ingredient.nomenclature.id]
+                   for ingredient in recipe.ingredients)
+
+    def test_apply_update_keeps_references(self):
+        # Подготовка
+        data = {}
+        RepositoryLoader.load(data, self.prepared)
+        nomenclature = list(data[Repository.nomenclature_key].values())[0]
+        record = {"op": "put", "type": Repository.nomenclature_key, "item": {"id": nomenclature.id, "full_name": "Новое имя"}}
+
+        # Действие
+        result = RepositoryLoader.apply(data, record)
+
+        # Проверка
+        assert result is nomenclature
+        assert nomenclature.full_name == "Новое имя"
+
+    def test_load_unknown_reference_raises_exception(self):
+        # Подготовка
+        self.prepared[Repository.transaction_key][0]["storage"] = "unknown"
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            RepositoryLoader.load({}, self.prepared)
+
+
+if __name__ == "__main__":
+    unittest.main()
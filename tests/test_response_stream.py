@@ -0,0 +1,190 @@
+import unittest
+import json
+import csv
+import io
+import xml.etree.ElementTree as ET
+from src.core.observe_service import ObserveService
+from src.core.validator import OperationException
+from src.logics.response_csv import ResponseCsv
+from src.logics.response_json import ResponseJson
+from src.logics.response_markdown import ResponseMarkdown
+from src.logics.response_xml import ResponseXml
+from src.models.group_nomenclature_model import GroupNomenclatureModel
+from src.models.nomenclature_model import NomenclatureModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestResponseStream(unittest.TestCase):
+
+    # Ответы по номенклатурам с постоянными кодами в формате прежних построчных реализаций
+    __csv_header = "full_name;group_nomenclature;id;name;unit_measurement\n"
+    __csv_rows = [
+        "Мука <высший сорт>;Бакалея & специи;nom-1;flour;грамм\n",
+        "Соль;Бакалея & специи;nom-2;salt;грамм\n"
+    ]
+    __markdown_header = "| full_name | group_nomenclature | id | name | unit_measurement |\n" \
+                        "| --- | --- | --- | --- | --- |\n"
+    __markdown_rows = [
+        "| Мука <высший сорт> | Бакалея & специи | nom-1 | flour | грамм |\n",
+        "| Соль | Бакалея & специи | nom-2 | salt | грамм |\n"
+    ]
+
+    # Элементы XML в формате прежней реализации на ElementTree
+    __xml_items = (
+        "  <item>\n"
+        "    <full_name>Мука &lt;высший сорт&gt;</full_name>\n"
+        "    <group_nomenclature>\n"
+        "      <id>group-1</id>\n"
+        "      <name>Бакалея &amp; специи</name>\n"
+        "    </group_nomenclature>\n"
+        "    <id>nom-1</id>\n"
+        "    <name>flour</name>\n"
+        "    <unit_measurement>\n"
+        "      <base_unit>None</base_unit>\n"
+        "      <coefficient>1</coefficient>\n"
+        "      <id>unit-1</id>\n"
+        "      <name>грамм</name>\n"
+        "    </unit_measurement>\n"
+        "  </item>\n"
+        "  <item>\n"
+        "    <full_name>Соль</full_name>\n"
+        "    <group_nomenclature>\n"
+        "      <id>group-1</id>\n"
+        "      <name>Бакалея &amp; специи</name>\n"
+        "    </group_nomenclature>\n"
+        "    <id>nom-2</id>\n"
+        "    <name>salt</name>\n"
+        "    <unit_measurement>\n"
+        "      <base_unit>None</base_unit>\n"
+        "      <coefficient>1</coefficient>\n"
+        "      <id>unit-1</id>\n"
+        "      <name>грамм</name>\n"
+        "    </unit_measurement>\n"
+        "  </item>\n"
+    )
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.data = self.start_service.data
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def __nomenclatures(self) -> list:
+        gramm = UnitMeasurement.create_gramm()
+        gramm.id = "unit-1"
+        group = GroupNomenclatureModel()
+        group.name = "Бакалея & специи"
+        group.id = "group-1"
+        flour = NomenclatureModel("flour", "Мука <высший сорт>", group, gramm)
+        flour.id = "nom-1"
+        salt = NomenclatureModel("salt", "Соль", group, gramm)
+        salt.id = "nom-2"
+        return [flour, salt]
+
+    def test_json_stream_matches_build(self):
+        # Подготовка
+        response = ResponseJson()
+        response.chunk_size = 256
+
+        for reference_type in [Repository.transaction_key, Repository.nomenclature_key]:
+            data = list(self.data[reference_type].values())
+
+            # Действие
+            chunks = list(response.stream("json", data))
+
+            # Проверка
+            assert len(chunks) > 1
+            assert "".join(chunks) == json.dumps(response.build("json", data))
+
+    def test_json_stream_empty_data_raises_exception_on_first_chunk(self):
+        # Подготовка
+        chunks = ResponseJson().stream("json", [])
+
+        # Действие & Проверка
+        with self.assertRaises(OperationException):
+            next(chunks)
+
+    def test_text_responses_match_fixed_text(self):
+        # Подготовка
+        data = self.__nomenclatures()
+
+        for response, format, expected in [
+            (ResponseCsv(), "csv", self.__csv_header + "".join(self.__csv_rows)),
+            (ResponseMarkdown(), "markdown", self.__markdown_header + "".join(self.__markdown_rows))
+        ]:
+            # Действие
+            result = response.build(format, data)
+
+            # Проверка
+            assert result == expected
+
+    def test_text_streams_are_split_into_chunks(self):
+        # Подготовка
+        data = self.__nomenclatures() * 50
+
+        for response, format, expected in [
+            (ResponseCsv(), "csv", self.__csv_header + "".join(self.__csv_rows) * 50),
+            (ResponseMarkdown(), "markdown", self.__markdown_header + "".join(self.__markdown_rows) * 50)
+        ]:
+            response.chunk_size = 256
+
+            # Действие
+            chunks = list(response.stream(format, data))
+
+            # Проверка
+            assert len(chunks) > 1
+            assert "".join(chunks) == expected
+
+    def test_csv_values_with_line_breaks_are_quoted(self):
+        # Подготовка
+        data = list(self.data[Repository.recipe_key].values())
+
+        # Действие
+        result = ResponseCsv().build("csv", data)
+        rows = list(csv.reader(io.StringIO(result), delimiter=";"))
+
+        # Проверка
+        assert len(rows) == len(data) + 1
+        assert rows[1][rows[0].index("description")] == data[0].description
+
+    def test_xml_response_matches_element_tree_output(self):
+        # Подготовка
+        data = self.__nomenclatures() * 20
+        expected = '<?xml version="1.0" encoding="UTF-8"?>\n<items>\n' + self.__xml_items * 20 + "</items>\n"
+        response = ResponseXml()
+        response.chunk_size = 256
+
+        # Действие
+        result = response.build("xml", data)
+        chunks = list(response.stream("xml", data))
+
+        # Проверка
+        assert len(chunks) > 1
+        assert result.encode("utf-8") == expected.encode("utf-8")
+        assert "".join(chunks).encode("utf-8") == expected.encode("utf-8")
+
+    def test_xml_stream_is_split_into_chunks_of_one_document(self):
+        # Подготовка
+        data = list(self.data[Repository.nomenclature_key].values()) * 20
+        response = ResponseXml()
+        response.chunk_size = 256
+
+        # Действие
+        chunks = list(response.stream("xml", data))
+        root = ET.fromstring("".join(chunks).split("\n", 1)[1])
+
+        # Проверка
+        assert len(chunks) > 1
+        assert len(root) == len(data)
+        assert root[0].find("name").text == data[0].name
+        assert root[0].find("group_nomenclature/name").text == data[0].group_nomenclature.name
+
+
+if __name__ == "__main__":
+    unittest.main()
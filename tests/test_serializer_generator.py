@@ -0,0 +1,88 @@
+import unittest
+import datetime
+import json
+from src.core.observe_service import ObserveService
+from src.core.validator import ArgumentException
+from src.logics.factory_convert import FactoryConvert
+from src.logics.serializer_generator import SerializerGenerator
+from src.models.recipe_model import RecipeModel
+from src.models.transaction_model import TransactionModel
+from src.models.unit_measurement_model import UnitMeasurement
+from src.repository import Repository
+from src.start_service import StartService
+
+
+class TestSerializerGenerator(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.factory = FactoryConvert()
+        SerializerGenerator.clear()
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        SerializerGenerator.clear()
+        ObserveService.handlers.clear()
+
+    def __dump(self, items: list, convert) -> str:
+        return json.dumps([convert(item) for item in items], ensure_ascii=False, indent=4)
+
+    def test_generated_output_matches_generic_path(self):
+        # Подготовка
+        items = []
+        for reference_type in [Repository.unit_measure_key, Repository.group_nomenclature_key,
+                               Repository.nomenclature_key, Repository.storage_key,
+                               Repository.recipe_key, Repository.transaction_key]:
+            items.extend(self.start_service.data[reference_type].values())
+
+        # Действие
+        generated = self.__dump(items, self.factory.convert)
+        generic = self.__dump(items, self.factory.convert_generic)
+
+        # Проверка
+        assert generated == generic
+
+    def test_value_of_other_type_falls_back_to_generic_path(self):
+        # Подготовка - сериализатор сгенерирован по единице без базовой
+        gramm = UnitMeasurement("грамм", 1)
+        kilogramm = UnitMeasurement("кг", 1000, gramm)
+        SerializerGenerator.convert(gramm)
+
+        # Действие
+        result = SerializerGenerator.convert(kilogramm)
+
+        # Проверка
+        assert "base_unit" not in SerializerGenerator.convert(gramm)
+        assert result == self.factory.convert_generic(kilogramm)
+        assert result["base_unit"] == gramm.id
+
+    def test_datetime_values_keep_format(self):
+        # Подготовка
+        seed = list(self.start_service.transactions.values())[0]
+        transaction = TransactionModel(datetime.date(2025, 10, 28), seed.nomenclature, seed.storage,
+                                       seed.quantity, seed.unit)
+
+        # Действие
+        result = SerializerGenerator.convert(transaction)
+        transaction.date = datetime.datetime(2025, 10, 28, 12, 30, 15)
+        with_time = SerializerGenerator.convert(transaction)
+
+        # Проверка
+        assert result["date"] == "2025-10-28"
+        assert with_time["date"] == "2025-10-28 12:30:15"
+
+    def test_empty_string_raises_exception_as_generic_path(self):
+        # Подготовка
+        recipe = RecipeModel("Рецепт", "Описание")
+        SerializerGenerator.convert(recipe)
+        recipe._RecipeModel__description = ""
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException):
+            SerializerGenerator.convert(recipe)
+
+
+if __name__ == "__main__":
+    unittest.main()
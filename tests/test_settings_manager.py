@@ -69,6 +69,21 @@ class TestSettingsManager(unittest.TestCase):
         # Проверка
         assert manager.settings.company is None
 
+    def test_set_save_interval_zero_or_none_means_synchronous_save(self):
+        # Подготовка
+        manager = SettingsManager("settings.json")
+        interval = manager.settings.save_interval_ms
+
+        # Действие & Проверка
+        manager.settings.save_interval_ms = 0
+        assert manager.settings.save_interval_ms == 0
+        manager.settings.save_interval_ms = None
+        assert manager.settings.save_interval_ms is None
+        with self.assertRaises(ArgumentException):
+            manager.settings.save_interval_ms = -1
+
+        manager.settings.save_interval_ms = interval
+
     def test_create_settings_manager_wrong_file_throws_argument_exception(self):
         # Подготовка
         filename = "settings.jsen"
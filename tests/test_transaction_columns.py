@@ -0,0 +1,83 @@
+import unittest
+import datetime
+from src.core.observe_service import ObserveService
+from src.repository import Repository
+from src.transaction_columns import TransactionColumns
+from tests.repository_fixture import RepositoryFixture
+
+
+@unittest.skipUnless(TransactionColumns.available(), "numpy не установлен")
+class TestTransactionColumns(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        fixture = RepositoryFixture()
+        self.gramm = fixture.gramm
+        self.kilo = fixture.kilogramm
+        self.flour = fixture.flour
+        self.sugar = fixture.sugar
+        self.storage = fixture.first_storage
+        self.other_storage = fixture.second_storage
+        self.data = fixture.data
+
+        self.transactions = [
+            fixture.add_transaction(datetime.date(2025, 10, 1), self.flour, self.storage, 2.0, self.kilo),
+            fixture.add_transaction(datetime.date(2025, 10, 2), self.flour, self.storage, -500.0),
+            fixture.add_transaction(datetime.date(2025, 10, 3), self.sugar, self.storage, 300.0),
+            fixture.add_transaction(datetime.date(2025, 10, 3), self.sugar, self.other_storage, 100.0),
+        ]
+
+        self.columns = TransactionColumns(self.data)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def test_totals_before_date_sums_root_units(self):
+        # Подготовка
+        mask = self.columns.mask(end_date=datetime.date(2025, 10, 3), include_end=False)
+
+        # Действие
+        result = self.columns.totals(mask)
+
+        # Проверка
+        assert result == [(self.flour, 1500.0)]
+
+    def test_turnover_storage_period_splits_income_and_outcome(self):
+        # Подготовка
+
+        # Действие
+        result = self.columns.turnover(self.storage.id, datetime.date(2025, 10, 2), datetime.date(2025, 10, 3))
+
+        # Проверка
+        assert result[self.flour.id] == [2000.0, 0, 500.0]
+        assert result[self.sugar.id] == [0, 300.0, 0]
+
+    def test_remove_last_row_moved_into_gap(self):
+        # Подготовка
+        removed = self.transactions[0]
+
+        # Действие
+        del self.data[Repository.transaction_key][removed.id]
+        self.columns.remove(removed.id)
+        result = self.columns.totals(self.columns.mask())
+
+        # Проверка
+        assert self.columns.size == 3
+        assert dict((nomenclature.id, quantity) for nomenclature, quantity in result) == {
+            self.flour.id: -500.0,
+            self.sugar.id: 400.0
+        }
+
+    def test_mask_unknown_storage_returns_empty(self):
+        # Подготовка
+
+        # Действие
+        result = self.columns.mask(storage_id="unknown")
+
+        # Проверка
+        assert not result.any()
+
+
+if __name__ == "__main__":
+    unittest.main()
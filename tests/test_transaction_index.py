@@ -0,0 +1,119 @@
+import unittest
+import datetime
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.logics.reference_service import ReferenceService
+from src.models.transaction_model import TransactionModel
+from src.repository import Repository
+from src.transaction_index import TransactionIndex
+from tests.repository_fixture import RepositoryFixture
+
+
+class TestTransactionIndex(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        fixture = RepositoryFixture()
+        self.gramm = fixture.gramm
+        self.flour = fixture.flour
+        self.sugar = fixture.sugar
+        self.first_storage = fixture.first_storage
+        self.second_storage = fixture.second_storage
+        self.data = fixture.data
+
+        for day, nomenclature, storage in [
+            (3, self.flour, self.first_storage),
+            (1, self.flour, self.first_storage),
+            (2, self.sugar, self.first_storage),
+            (2, self.flour, self.second_storage),
+        ]:
+            fixture.add_transaction(datetime.date(2025, 10, day), nomenclature, storage, 10.0)
+
+        self.index = TransactionIndex(self.data)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def test_between_pair_returns_sorted_by_date(self):
+        # Подготовка
+
+        # Действие
+        result = self.index.between(self.flour.id, self.first_storage.id)
+
+        # Проверка
+        assert [transaction.date.day for transaction in result] == [1, 3]
+
+    def test_before_pair_excludes_start_date(self):
+        # Подготовка
+
+        # Действие
+        result = self.index.before(self.flour.id, self.first_storage.id, datetime.date(2025, 10, 3))
+
+        # Проверка
+        assert len(result) == 1
+        assert result[0].date == datetime.date(2025, 10, 1)
+
+    def test_by_storage_and_nomenclature_returns_hash_buckets(self):
+        # Подготовка
+
+        # Действие
+        by_storage = self.index.by_storage(self.first_storage.id)
+        by_nomenclature = self.index.by_nomenclature(self.flour.id)
+
+        # Проверка
+        assert len(by_storage) == 3
+        assert len(by_nomenclature) == 3
+
+    def test_all_between_inclusive_bounds(self):
+        # Подготовка
+
+        # Действие
+        result = self.index.all_between(datetime.date(2025, 10, 2), datetime.date(2025, 10, 3))
+
+        # Проверка
+        assert len(result) == 3
+
+    def test_handle_reference_service_changes_updates_index(self):
+        # Подготовка
+        service = ReferenceService(self.data)
+        transaction = TransactionModel(datetime.date(2025, 10, 5), self.sugar, self.second_storage, 1.0, self.gramm)
+
+        # Действие
+        service.add(Repository.transaction_key, transaction)
+        added = self.index.between(self.sugar.id, self.second_storage.id)
+        service.delete(Repository.transaction_key, transaction.id)
+        deleted = self.index.between(self.sugar.id, self.second_storage.id)
+
+        # Проверка
+        assert added == [transaction]
+        assert deleted == []
+
+    def test_update_moved_transaction_reindexed(self):
+        # Подготовка
+        transaction = self.index.between(self.flour.id, self.first_storage.id)[0]
+
+        # Действие
+        transaction.storage = self.second_storage
+        transaction.date = datetime.date(2025, 10, 10)
+        self.index.update(transaction)
+
+        # Проверка
+        assert len(self.index.between(self.flour.id, self.first_storage.id)) == 1
+        assert self.index.between(self.flour.id, self.second_storage.id)[-1] is transaction
+
+    def test_ensure_actual_direct_dict_change_rebuilds(self):
+        # Подготовка
+        transaction = TransactionModel(datetime.date(2025, 10, 4), self.sugar, self.first_storage, 1.0, self.gramm)
+
+        # Действие
+        self.data[Repository.transaction_key][transaction.id] = transaction
+        result = self.index.between(self.sugar.id, self.first_storage.id)
+
+        # Проверка
+        assert len(result) == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+import datetime
+import json
+from unittest.mock import patch
+from src.core.event_type import EventType
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.core.validator import ArgumentException
+from src.logics.reference_service import ReferenceService
+from src.logics.transaction_ingest import TransactionIngest, TransactionIngestException
+from src.balance_checkpoints import BalanceCheckpoints
+from src.transaction_index import TransactionIndex
+from src.repository import Repository
+from tests.repository_fixture import RepositoryFixture
+
+
+class TestTransactionIngest(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        fixture = RepositoryFixture()
+        self.group = fixture.group
+        self.gramm = fixture.gramm
+        self.kilogramm = fixture.kilogramm
+        self.flour = fixture.flour
+        self.storage = fixture.first_storage
+        self.data = fixture.data
+        self.service = ReferenceService(self.data)
+        self.ingest = TransactionIngest(self.service, batch_size=2)
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        ObserveService.handlers.clear()
+
+    def __row(self, date: str, quantity, unit = None) -> dict:
+        return {
+            "date": date,
+            "nomenclature_id": self.flour.id,
+            "storage_id": self.storage.id,
+            "quantity": quantity,
+            "unit_id": (unit or self.gramm).id
+        }
+
+    def test_ingest_ndjson_adds_transactions(self):
+        # Подготовка
+        lines = [
+            json.dumps(self.__row("2025-01-10", 500)).encode("utf-8"),
+            b"\n",
+            json.dumps(self.__row("2025-01-05", 2, self.kilogramm)).encode("utf-8")
+        ]
+
+        # Действие
+        count = self.ingest.ingest_ndjson(lines)
+
+        # Проверка
+        transactions = list(self.data[Repository.transaction_key].values())
+        assert count == 2
+        assert len(transactions) == 2
+        assert transactions[1].date == datetime.date(2025, 1, 5)
+        assert transactions[1].unit is self.kilogramm
+        assert transactions[1].quantity == 2.0
+
+    def test_ingest_csv_adds_transactions(self):
+        # Подготовка
+        lines = [
+            "date,nomenclature_id,storage_id,quantity,unit_id\n",
+            f"2025-02-01,{self.flour.id},{self.storage.id},-150.5,{self.gramm.id}\n"
+        ]
+
+        # Действие
+        count = self.ingest.ingest_csv(lines)
+
+        # Проверка
+        transaction = list(self.data[Repository.transaction_key].values())[0]
+        assert count == 1
+        assert transaction.quantity == -150.5
+        assert transaction.nomenclature is self.flour
+
+    def test_ingest_unknown_reference_reports_line(self):
+        # Подготовка
+        row = self.__row("2025-01-10", 500)
+        row["storage_id"] = "unknown"
+
+        # Действие & Проверка
+        with self.assertRaises(ArgumentException) as context:
+            self.ingest.ingest([self.__row("2025-01-09", 1), row])
+
+        assert "строке 2" in str(context.exception)
+        assert len(self.data[Repository.transaction_key]) == 0
+
+    def test_ingest_error_reports_line_and_committed_count(self):
+        # Подготовка - пакеты по 2 строки, ошибка в пятой строке
+        lines = [json.dumps(self.__row(f"2025-01-{day:02d}", day)) for day in range(1, 5)]
+        lines.append("{broken")
+
+        # Действие
+        with self.assertRaises(TransactionIngestException) as context:
+            self.ingest.ingest_ndjson(lines)
+
+        # Проверка
+        assert context.exception.line == 5
+        assert context.exception.ingested == 4
+        assert "строке 5" in str(context.exception)
+        assert len(self.data[Repository.transaction_key]) == 4
+
+    def test_ingest_csv_error_reports_file_line(self):
+        # Подготовка - заголовок занимает первую строку файла
+        lines = [
+            "date,nomenclature_id,storage_id,quantity,unit_id\n",
+            f"2025-02-01,{self.flour.id},{self.storage.id},1,{self.gramm.id}\n",
+            f"2025-02-02,{self.flour.id},{self.storage.id},abc,{self.gramm.id}\n"
+        ]
+
+        # Действие
+        with self.assertRaises(TransactionIngestException) as context:
+            self.ingest.ingest_csv(lines)
+
+        # Проверка
+        assert context.exception.line == 3
+        assert context.exception.ingested == 0
+
+    def test_ingest_rejects_non_finite_quantity(self):
+        # Подготовка - NaN и бесконечность проходят разбор float и json.loads
+        csv_lines = [
+            "date,nomenclature_id,storage_id,quantity,unit_id\n",
+            f"2025-02-01,{self.flour.id},{self.storage.id},inf,{self.gramm.id}\n"
+        ]
+        ndjson_lines = [json.dumps(self.__row("2025-01-10", 1)), json.dumps(self.__row("2025-01-11", float("nan")))]
+
+        # Действие
+        with self.assertRaises(TransactionIngestException) as csv_context:
+            self.ingest.ingest_csv(csv_lines)
+        with self.assertRaises(TransactionIngestException) as ndjson_context:
+            self.ingest.ingest_ndjson(ndjson_lines)
+
+        # Проверка
+        assert csv_context.exception.line == 2
+        assert ndjson_context.exception.line == 2
+        assert len(self.data[Repository.transaction_key]) == 0
+
+    @patch('src.core.observe_service.ObserveService.create_event')
+    def test_ingest_creates_one_event_per_batch(self, mock_create_event):
+        # Подготовка
+        rows = [self.__row(f"2025-01-{day:02d}", day) for day in range(1, 6)]
+
+        # Действие
+        self.ingest.ingest(rows)
+
+        # Проверка
+        events = [call[0][0] for call in mock_create_event.call_args_list]
+        assert events == [EventType.bulk_change_reference_type_key()] * 3
+
+    def test_ingest_updates_indexes_in_date_order(self):
+        # Подготовка
+        index = TransactionIndex.get(self.data)
+        checkpoints = BalanceCheckpoints.get(self.data)
+        rows = [self.__row("2025-03-01", 1), self.__row("2025-01-01", 2), self.__row("2025-02-01", 4)]
+
+        # Действие
+        self.ingest.ingest(rows)
+
+        # Проверка
+        dates = [transaction.date for transaction in index.all_between()]
+        assert dates == [datetime.date(2025, 1, 1), datetime.date(2025, 2, 1), datetime.date(2025, 3, 1)]
+        assert checkpoints.balances(datetime.date(2025, 2, 15)) == {(self.flour.id, self.storage.id): 6.0}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,263 @@
+import unittest
+import datetime
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from src.core.logger import Logger
+from src.core.observe_service import ObserveService
+from src.core.validator import OperationException
+from src.dtos.filter_sorting_dto import FilterSortingDto
+from src.balance_checkpoints import BalanceCheckpoints
+from src.logics.balances_manager import BalancesManager
+from src.logics.reference_service import ReferenceService
+from src.logics.report import Report
+from src.reference_graph import ReferenceGraph
+from src.repository import Repository
+from src.start_service import StartService
+from src.transaction_index import TransactionIndex
+from src.transaction_segments import TransactionSegments
+
+
+@unittest.skipUnless(TransactionSegments.available(), "Для сегментов транзакций требуется numpy")
+class TestTransactionSegments(unittest.TestCase):
+
+    def setUp(self):
+        """Подготовка данных перед каждым тестом"""
+        Logger.configure("ERROR", "console")
+        ObserveService.handlers.clear()
+        self.start_service = StartService()
+        self.start_service.start(True)
+        self.data = self.start_service.data
+        self.block_period = datetime.date(2025, 10, 28)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Очистка после тестов"""
+        segments = TransactionSegments.find(self.data)
+        if segments is not None:
+            segments.close()
+        ObserveService.handlers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __seal(self, until: datetime.date = None) -> int:
+        return TransactionSegments.get(self.data, self.directory).seal(until or self.block_period)
+
+    def test_seal_moves_closed_period_to_segment(self):
+        # Подготовка
+        closed = [transaction.id for transaction in self.data[Repository.transaction_key].values()
+                  if transaction.date < self.block_period]
+
+        # Действие
+        sealed = self.__seal()
+
+        # Проверка
+        assert sealed == len(closed) > 0
+        assert all(transaction.date >= self.block_period
+                   for transaction in self.data[Repository.transaction_key].values())
+        assert len(os.listdir(self.directory)) == 1
+        assert TransactionSegments.find(self.data).count_before(self.block_period) == len(closed)
+
+    def test_seal_notifies_stores_without_rebuild(self):
+        # Подготовка
+        index = TransactionIndex.get(self.data)
+        checkpoints = BalanceCheckpoints.get(self.data)
+        graph = ReferenceGraph.get(self.data)
+        manager = BalancesManager(self.data, self.block_period)
+        expected = manager.calculation_balances_up_blocking_date()
+
+        # Действие
+        with patch.object(manager, "calculation_balances_up_blocking_date",
+                          wraps=manager.calculation_balances_up_blocking_date) as calculation:
+            self.__seal()
+
+        # Проверка
+        calculation.assert_not_called()
+        assert self.data[Repository.balances_key] == expected
+        for store in [index, checkpoints, graph]:
+            assert not store.outdated()
+        assert index.count_before(self.block_period) == 0
+        assert index.count_before(datetime.date.max) == len(self.data[Repository.transaction_key])
+
+    def test_seal_merges_small_segment_into_date_range_file(self):
+        # Подготовка
+        until = datetime.date(2025, 10, 30)
+        first = self.__seal()
+        dates = sorted(transaction.date for transaction in self.data[Repository.transaction_key].values()
+                       if transaction.date < until)
+
+        # Действие
+        sealed = self.__seal(until)
+        segments = TransactionSegments.find(self.data)
+
+        # Проверка
+        assert first > 0 and sealed == len(dates) > 0
+        assert os.listdir(self.directory) == [f"segment-20251027-{dates[-1]:%Y%m%d}.seg"]
+        assert segments.count == first + sealed
+        assert segments.count_before(until) == segments.count
+        assert segments.count_before(self.block_period) == first
+        assert segments.count_before(dates[-1]) == first + dates.index(dates[-1])
+
+    def test_seal_keeps_large_segment_separate(self):
+        # Подготовка
+        self.__seal()
+
+        # Действие
+        with patch.object(TransactionSegments, "merge_records", 0):
+            self.__seal(datetime.date(2025, 10, 30))
+
+        # Проверка
+        assert len(os.listdir(self.directory)) == 2
+
+    def test_transactions_restores_sealed_rows(self):
+        # Подготовка
+        closed = {transaction.id: transaction for transaction in self.data[Repository.transaction_key].values()
+                  if transaction.date < self.block_period}
+        self.__seal()
+
+        # Действие
+        restored = list(TransactionSegments.find(self.data).transactions())
+
+        # Проверка
+        assert {transaction.id for transaction in restored} == closed.keys()
+        for transaction in restored:
+            original = closed[transaction.id]
+            assert transaction.date == original.date
+            assert transaction.quantity == original.quantity
+            assert transaction.nomenclature is original.nomenclature
+            assert transaction.storage is original.storage
+            assert transaction.unit is original.unit
+
+    def test_balances_match_calculation_without_segments(self):
+        # Подготовка
+        date = datetime.date(2025, 10, 30)
+        expected_block = BalancesManager(self.data, self.block_period).calculation_balances_up_blocking_date()
+        expected_date = BalancesManager(self.data, self.block_period).calculation_balances_by_date(date)
+        self.__seal()
+
+        # Действие
+        manager = BalancesManager(self.data, self.block_period)
+        result_block = manager.calculation_balances_up_blocking_date()
+        result_date = manager.calculation_balances_by_date(date)
+
+        # Проверка
+        for expected, result in [(expected_block, result_block), (expected_date, result_date)]:
+            expected_by_id = {balance["nomenclature"]["id"]: balance["balance"] for balance in expected}
+            result_by_id = {balance["nomenclature"]["id"]: balance["balance"] for balance in result}
+            assert expected_by_id.keys() == result_by_id.keys()
+            for nomenclature_id, quantity in expected_by_id.items():
+                self.assertAlmostEqual(result_by_id[nomenclature_id], quantity)
+
+    def test_report_matches_calculation_without_segments(self):
+        # Подготовка
+        storage = list(self.start_service.storages.values())[0]
+        start_date = datetime.date(2025, 10, 29)
+        end_date = datetime.date(2025, 10, 30)
+        expected = Report(self.data).calculateBalances(storage, start_date, end_date)
+        self.__seal()
+
+        # Действие
+        result = Report(self.data).calculateBalances(storage, start_date, end_date)
+
+        # Проверка
+        assert expected.keys() == result.keys()
+        for nomenclature_id, values in expected.items():
+            for actual, value in zip(result[nomenclature_id], values):
+                self.assertAlmostEqual(actual, value)
+
+    def test_filtered_report_matches_calculation_without_segments(self):
+        # Подготовка
+        storage = list(self.start_service.storages.values())[0]
+        start_date = datetime.date(2025, 10, 29)
+        end_date = datetime.date(2025, 10, 30)
+        transaction = next(transaction for transaction in self.data[Repository.transaction_key].values()
+                           if transaction.date < self.block_period and transaction.storage.id == storage.id)
+        filters = FilterSortingDto([
+            {"field_name": "nomenclature/name", "value": transaction.nomenclature.name, "type": "EQUALS"},
+            {"field_name": "date", "value": self.block_period, "type": "LESS"}
+        ], [])
+        expected = Report(self.data).calculateBalances(storage, start_date, end_date, filters, "transaction")
+        self.__seal()
+
+        # Действие
+        result = Report(self.data).calculateBalances(storage, start_date, end_date, filters, "transaction")
+
+        # Проверка
+        assert len(expected) > 0
+        assert expected.keys() == result.keys()
+        for nomenclature_id, values in expected.items():
+            for actual, value in zip(result[nomenclature_id], values):
+                self.assertAlmostEqual(actual, value)
+
+    def test_filter_by_unsupported_field_with_segments_raises_exception(self):
+        # Подготовка
+        storage = list(self.start_service.storages.values())[0]
+        filters = FilterSortingDto([{"field_name": "id", "value": "1", "type": "EQUALS"}], [])
+        self.__seal()
+
+        # Действие & Проверка
+        with self.assertRaises(OperationException):
+            Report(self.data).calculateBalances(storage, self.block_period, self.block_period, filters, "transaction")
+
+    def test_calculate_balance_computes_segment_turnover_once_per_storage(self):
+        # Подготовка
+        storage = list(self.start_service.storages.values())[0]
+        self.__seal()
+        segments = TransactionSegments.find(self.data)
+        report = Report(self.data)
+
+        # Действие
+        with patch.object(segments, "turnover", wraps=segments.turnover) as turnover:
+            for nomenclature in self.data[Repository.nomenclature_key].values():
+                report.calculateBalance(nomenclature, storage, self.block_period, self.block_period)
+
+        # Проверка
+        assert turnover.call_count == 1
+
+    def test_open_maps_segments_and_drops_sealed_duplicates(self):
+        # Подготовка - сбой между записью сегмента и сохранением репозитория
+        transactions = dict(self.data[Repository.transaction_key])
+        sealed = self.__seal()
+        TransactionSegments.find(self.data).close()
+        self.data[Repository.transaction_key].update(transactions)
+
+        # Действие
+        count = TransactionSegments.get(self.data, self.directory).open()
+
+        # Проверка
+        assert count == sealed
+        assert len(self.data[Repository.transaction_key]) == len(transactions) - sealed
+
+    def test_open_finishes_interrupted_merge(self):
+        # Подготовка - сбой после записи слитого сегмента, до удаления прежнего
+        until = datetime.date(2025, 10, 30)
+        first = self.__seal()
+        previous = os.listdir(self.directory)[0]
+        closed = len([transaction for transaction in self.data[Repository.transaction_key].values()
+                      if transaction.date < until])
+        with patch.object(TransactionSegments, "_TransactionSegments__finish_merge", side_effect=OSError("Сбой")):
+            with self.assertRaises(OSError):
+                self.__seal(until)
+        TransactionSegments.find(self.data).close()
+
+        # Действие
+        count = TransactionSegments.get(self.data, self.directory).open()
+
+        # Проверка
+        names = os.listdir(self.directory)
+        assert len(names) == 1 and names[0].endswith(".seg") and names[0] != previous
+        assert count == first + closed
+        assert all(transaction.date >= until for transaction in self.data[Repository.transaction_key].values())
+
+    def test_delete_nomenclature_used_in_segment_raises_exception(self):
+        # Подготовка
+        self.__seal()
+        nomenclature_id, storage_id = next(iter(TransactionSegments.find(self.data).balances(self.block_period)))
+
+        # Действие & Проверка
+        with self.assertRaises(OperationException):
+            ReferenceService(self.data).delete(Repository.nomenclature_key, nomenclature_id)
+
+
+if __name__ == "__main__":
+    unittest.main()